@@ -0,0 +1 @@
+"""End-to-end load benchmarks for the task manager, run with 'manage.py benchmark'."""
@@ -0,0 +1,125 @@
+"""Throughput of concurrent SQLite writers and readers, with and without the tuning pragmas."""
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from django.conf import settings
+from tasks.sqlite import apply_pragmas
+
+# SQLite's own defaults: a rollback journal, and Python's five second busy timeout.
+PROFILES = {
+    'default': lambda: {},
+    'tuned': lambda: settings.SQLITE_PRAGMAS,
+}
+
+SCHEMA = """
+CREATE TABLE task (
+    id INTEGER PRIMARY KEY,
+    title VARCHAR(50) NOT NULL,
+    description TEXT NOT NULL,
+    due_date DATETIME NOT NULL
+);
+CREATE TABLE task_assignee (
+    id INTEGER PRIMARY KEY,
+    task_id INTEGER NOT NULL REFERENCES task (id),
+    user_id INTEGER NOT NULL
+);
+CREATE INDEX task_assignee_user_idx ON task_assignee (user_id, task_id);
+"""
+
+USERS = 50
+
+
+def sqlite_concurrency(duration, writers=4, readers=4):
+    """Return the writes and reads per second of parallel threads under each pragma profile.
+
+    Every profile runs against a fresh database file. Writers create a task
+    and assign it to two users in one transaction, as the task form does;
+    readers list a user's next tasks, as the dashboard does. Operations that
+    fail with "database is locked" are counted as errors.
+    """
+
+    results = {}
+    for profile, pragmas in PROFILES.items():
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'concurrency.sqlite3')
+            connection = _connect(path, pragmas())
+            connection.executescript(SCHEMA)
+            connection.close()
+            results[profile] = _run(path, pragmas(), duration, writers, readers)
+    return results
+
+
+def _connect(path, pragmas):
+    # Autocommit with explicit transactions, as Django uses sqlite3
+    connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+    apply_pragmas(connection, pragmas)
+    return connection
+
+
+def _run(path, pragmas, duration, writers, readers):
+    counts = {'writes': 0, 'reads': 0, 'errors': 0}
+    counts_lock = threading.Lock()
+    start_barrier = threading.Barrier(writers + readers + 1)
+    stop = threading.Event()
+
+    def worker(operation, seed):
+        connection = _connect(path, pragmas)
+        done = errors = 0
+        start_barrier.wait()
+        try:
+            while not stop.is_set():
+                try:
+                    operation(connection, seed + done)
+                    done += 1
+                except sqlite3.OperationalError:
+                    errors += 1
+                    if connection.in_transaction:
+                        connection.execute('ROLLBACK')
+        finally:
+            connection.close()
+        with counts_lock:
+            counts['writes' if operation is _write else 'reads'] += done
+            counts['errors'] += errors
+
+    threads = [threading.Thread(target=worker, args=(_write, number * 1000000)) for number in range(writers)]
+    threads += [threading.Thread(target=worker, args=(_read, number)) for number in range(readers)]
+    for thread in threads:
+        thread.start()
+    start_barrier.wait()
+    start = time.perf_counter()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return {
+        'writers': writers,
+        'readers': readers,
+        'writes_per_second': counts['writes'] / elapsed,
+        'reads_per_second': counts['reads'] / elapsed,
+        'errors': counts['errors'],
+    }
+
+
+def _write(connection, number):
+    connection.execute('BEGIN')
+    cursor = connection.execute(
+        "INSERT INTO task (title, description, due_date) VALUES (?, ?, datetime('now', ?))",
+        (f'Task {number}', 'Benchmark task ' * 10, f'+{number % 365} days'),
+    )
+    connection.executemany(
+        'INSERT INTO task_assignee (task_id, user_id) VALUES (?, ?)',
+        [(cursor.lastrowid, number % USERS), (cursor.lastrowid, (number + 1) % USERS)],
+    )
+    connection.execute('COMMIT')
+
+
+def _read(connection, number):
+    connection.execute(
+        'SELECT task.id, task.title, task.due_date FROM task '
+        'JOIN task_assignee ON task_assignee.task_id = task.id '
+        'WHERE task_assignee.user_id = ? ORDER BY task.due_date LIMIT 25',
+        (number % USERS,),
+    ).fetchall()
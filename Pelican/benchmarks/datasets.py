@@ -0,0 +1,55 @@
+"""Seeded data sets the benchmarks run against."""
+from io import StringIO
+from django.core.management import call_command
+from tasks.models import Invitation, Task, Team, User
+from tasks.outbox import drain
+
+BENCHMARK_USERNAME = '@johndoe'
+BENCHMARK_PASSWORD = 'Password123'
+
+# Options for the seed command, named after the number of tasks they create.
+SCALES = {
+    '10': {'users': 50, 'teams': 2, 'tasks_per_team': 5, 'notifications': 10, 'members_per_team': 10},
+    '1k': {'users': 1000, 'teams': 20, 'tasks_per_team': 50, 'notifications': 500, 'members_per_team': 25},
+    '100k': {'users': 10000, 'teams': 200, 'tasks_per_team': 500, 'notifications': 20000, 'members_per_team': 50},
+}
+
+# Number of the benchmark user's tasks and notifications, so the dashboard has full pages at every scale.
+USER_TASKS = 100
+USER_NOTIFICATIONS = 50
+
+
+class Dataset:
+    """The seeded rows that the benchmark scenarios refer to."""
+
+    def __init__(self, user, team, invitee_ids, search_terms):
+        self.user = user
+        self.team = team
+        self.invitee_ids = invitee_ids
+        self.search_terms = search_terms
+
+
+def build_dataset(scale, random_seed=0):
+    """Seed the current database at the given scale and return the rows the scenarios use."""
+
+    call_command('seed', random_seed=random_seed, stdout=StringIO(), **SCALES[scale])
+    user = User.objects.get(username=BENCHMARK_USERNAME)
+    # The benchmark user joins the largest team and is given some of its tasks and invitations
+    team = Team.objects.order_by('-pk').first()
+    team.members.add(user)
+    Assignment = Task.assigned_to.through
+    assigned = set(Assignment.objects.filter(user=user).values_list('task_id', flat=True))
+    Assignment.objects.bulk_create([
+        Assignment(task_id=task_id, user_id=user.pk)
+        for task_id in Task.objects.filter(team=team).values_list('pk', flat=True)[:USER_TASKS]
+        if task_id not in assigned
+    ])
+    for other_team in Team.objects.exclude(members=user).exclude(invitation__receiver=user)[:USER_NOTIFICATIONS]:
+        Invitation.objects.invite(team.members.exclude(pk=user.pk).first() or user, other_team, [user.pk])
+    # Drained here rather than by notification_worker, which needs a cache shared with the web server
+    drain('benchmarks')
+    invitee_ids = list(
+        User.objects.exclude(teams=team).exclude(received_invitations__team=team).values_list('pk', flat=True)
+    )
+    search_terms = [name[:3] for name in User.objects.values_list('last_name', flat=True)[:50]]
+    return Dataset(user, team, invitee_ids, search_terms)
@@ -0,0 +1,51 @@
+"""Login throughput of each password hasher profile."""
+import time
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import make_password
+from django.test.utils import override_settings
+from benchmarks.datasets import BENCHMARK_PASSWORD, BENCHMARK_USERNAME
+from task_manager.password_hashers import LEGACY_HASHERS, password_hashers
+from tasks.models import User
+
+PROFILES = ('production', 'fast')
+
+
+def login_throughput(duration):
+    """Return the logins per second one core manages under each hasher profile.
+
+    Each login authenticates the benchmark user against the database, as
+    LogInForm does. The first login of a user with a legacy PBKDF2 hash is
+    also timed, since it verifies the old hash and stores a new one.
+    """
+
+    user, _ = User.objects.get_or_create(
+        username=BENCHMARK_USERNAME,
+        defaults={'email': 'john.doe@example.org', 'first_name': 'John', 'last_name': 'Doe'},
+    )
+    results = {}
+    for profile in PROFILES:
+        hashers = password_hashers(profile)
+        with override_settings(PASSWORD_HASHERS=hashers):
+            User.objects.filter(pk=user.pk).update(password=make_password(BENCHMARK_PASSWORD))
+            logins = 0
+            start = time.perf_counter()
+            while time.perf_counter() - start < duration:
+                authenticate(username=BENCHMARK_USERNAME, password=BENCHMARK_PASSWORD)
+                logins += 1
+            elapsed = time.perf_counter() - start
+            results[profile] = {
+                'hasher': hashers[0].rsplit('.', 1)[1],
+                'logins_per_second_per_core': logins / elapsed,
+                'ms_per_login': elapsed / logins * 1000,
+                'legacy_rehash_ms': _legacy_rehash_ms(user),
+            }
+    return results
+
+
+def _legacy_rehash_ms(user):
+    with override_settings(PASSWORD_HASHERS=LEGACY_HASHERS):
+        legacy_password = make_password(BENCHMARK_PASSWORD)
+    User.objects.filter(pk=user.pk).update(password=legacy_password)
+    start = time.perf_counter()
+    authenticate(username=BENCHMARK_USERNAME, password=BENCHMARK_PASSWORD)
+    return (time.perf_counter() - start) * 1000
@@ -0,0 +1,131 @@
+"""Running the benchmark scenarios and comparing their results with a baseline."""
+import platform
+import sqlite3
+import time
+import tracemalloc
+import django
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from benchmarks.datasets import build_dataset
+from benchmarks.scenarios import SCENARIOS
+from tasks.request_metrics import percentile
+
+# Iterations traced for peak memory, after the timed ones, since tracing slows requests down.
+MEMORY_ITERATIONS = 3
+
+
+def run_scale(scale, scenario_names, iterations, warmup, random_seed=0):
+    """Seed the current database at a scale and return the results of each scenario."""
+
+    dataset = build_dataset(scale, random_seed)
+    client = Client()
+    client.force_login(dataset.user)
+    results = {}
+    for name in scenario_names:
+        scenario = SCENARIOS[name](client, Client(), dataset)
+        results[name] = run_scenario(scenario, iterations, warmup)
+    return results
+
+
+def run_scenario(scenario, iterations, warmup):
+    """Time a scenario's requests and return a summary of their latency, queries and memory."""
+
+    for iteration in range(warmup):
+        scenario.prepare(iteration)
+        scenario.request(iteration)
+    latencies = []
+    query_counts = []
+    errors = 0
+    for iteration in range(warmup, warmup + iterations):
+        scenario.prepare(iteration)
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = scenario.request(iteration)
+            latencies.append((time.perf_counter() - start) * 1000)
+        query_counts.append(len(queries))
+        errors += response.status_code >= 400
+    peak = 0
+    tracemalloc.start()
+    try:
+        for iteration in range(warmup + iterations, warmup + iterations + MEMORY_ITERATIONS):
+            scenario.prepare(iteration)
+            tracemalloc.reset_peak()
+            current = tracemalloc.get_traced_memory()[0]
+            scenario.request(iteration)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - current)
+    finally:
+        tracemalloc.stop()
+    latencies.sort()
+    return {
+        'iterations': iterations,
+        'errors': errors,
+        'latency_ms': {
+            'mean': sum(latencies) / len(latencies),
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99),
+            'max': latencies[-1],
+        },
+        'queries': {'mean': sum(query_counts) / len(query_counts), 'max': max(query_counts)},
+        'peak_memory_kib': peak / 1024,
+    }
+
+
+def environment():
+    """Return the versions the results were measured with."""
+
+    return {
+        'created_at': timezone.now().isoformat(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'machine': platform.machine(),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Return descriptions of the regressions in `results` against `baseline`.
+
+    Latency regresses when its p95 exceeds the baseline's by more than the
+    tolerance fraction, and login and SQLite throughput when they fall by
+    more than it.
+    Queries regress as soon as their maximum per request grows, since query
+    counts do not vary between runs.
+    """
+
+    regressions = []
+    for scale, scenarios in results['scales'].items():
+        for name, result in scenarios.items():
+            previous = baseline.get('scales', {}).get(scale, {}).get(name)
+            if previous is None:
+                continue
+            label = f'{name} at {scale}'
+            p95, previous_p95 = result['latency_ms']['p95'], previous['latency_ms']['p95']
+            if p95 > previous_p95 * (1 + tolerance):
+                regressions.append(f'{label}: p95 latency {p95:.1f}ms, baseline {previous_p95:.1f}ms')
+            queries, previous_queries = result['queries']['max'], previous['queries']['max']
+            if queries > previous_queries:
+                regressions.append(f'{label}: {queries} queries per request, baseline {previous_queries}')
+    for profile, result in results.get('logins', {}).items():
+        previous = baseline.get('logins', {}).get(profile)
+        # Only a like-for-like hasher is comparable, as the production one depends on what is installed
+        if previous is None or previous['hasher'] != result['hasher']:
+            continue
+        rate, previous_rate = result['logins_per_second_per_core'], previous['logins_per_second_per_core']
+        if rate < previous_rate * (1 - tolerance):
+            regressions.append(
+                f'{profile} logins: {rate:.1f} per second per core, baseline {previous_rate:.1f}'
+            )
+    for profile, result in results.get('concurrency', {}).items():
+        previous = baseline.get('concurrency', {}).get(profile)
+        if previous is None:
+            continue
+        for operation in ('writes', 'reads'):
+            rate, previous_rate = result[f'{operation}_per_second'], previous[f'{operation}_per_second']
+            if rate < previous_rate * (1 - tolerance):
+                regressions.append(
+                    f'{profile} SQLite {operation}: {rate:.1f} per second, baseline {previous_rate:.1f}'
+                )
+    return regressions
@@ -0,0 +1,95 @@
+"""The requests that the benchmarks time.
+
+A scenario makes exactly one request per iteration. Anything it needs to
+reset between iterations happens in prepare(), which is not timed.
+"""
+from django.core.cache import cache
+from django.urls import reverse
+from benchmarks.datasets import BENCHMARK_PASSWORD
+from tasks.models import Invitation
+from tasks.throttle import reset_login_throttle
+
+
+class Scenario:
+    """A request made by a logged-in user against a data set."""
+
+    def __init__(self, client, anonymous_client, dataset):
+        self.client = client
+        self.anonymous_client = anonymous_client
+        self.dataset = dataset
+
+    def prepare(self, iteration):
+        """Get ready for an iteration, outside the timed section."""
+
+    def request(self, iteration):
+        """Make the timed request and return its response."""
+        raise NotImplementedError
+
+
+class Dashboard(Scenario):
+    """The dashboard, with its fragments cached after the first request."""
+
+    def request(self, iteration):
+        return self.client.get(reverse('dashboard'))
+
+
+class DashboardUncached(Dashboard):
+    """The dashboard, with every fragment rendered from the database."""
+
+    def prepare(self, iteration):
+        cache.clear()
+
+
+class TeamDetail(Scenario):
+    """The team page of the benchmark user's team."""
+
+    def request(self, iteration):
+        return self.client.get(reverse('team_detail', args=[self.dataset.team.pk]))
+
+
+class SendInvitations(Scenario):
+    """Inviting a batch of users to the benchmark user's team."""
+
+    INVITATIONS_PER_REQUEST = 20
+
+    def prepare(self, iteration):
+        # Small data sets run out of users to invite, so the same ones are invited again
+        Invitation.objects.filter(team=self.dataset.team, status=Invitation.PENDING).delete()
+
+    def request(self, iteration):
+        invitee_ids = self.dataset.invitee_ids
+        start = iteration * self.INVITATIONS_PER_REQUEST % max(len(invitee_ids), 1)
+        selected = invitee_ids[start:start + self.INVITATIONS_PER_REQUEST]
+        return self.client.post(reverse('send_invitations', args=[self.dataset.team.pk]), {'selected_users': selected})
+
+
+class TeamSearch(Scenario):
+    """Searching for members on the create team page."""
+
+    def request(self, iteration):
+        terms = self.dataset.search_terms
+        return self.client.get(reverse('team'), {'userSearch': terms[iteration % len(terms)]})
+
+
+class LogIn(Scenario):
+    """Logging in with a username and password."""
+
+    def prepare(self, iteration):
+        self.anonymous_client.cookies.clear()
+        # Measure logins themselves rather than the throttle turning them away
+        reset_login_throttle('127.0.0.1', self.dataset.user.username)
+
+    def request(self, iteration):
+        return self.anonymous_client.post(
+            reverse('log_in'), {'username': self.dataset.user.username, 'password': BENCHMARK_PASSWORD}
+        )
+
+
+SCENARIOS = {
+    'dashboard': Dashboard,
+    'dashboard_uncached': DashboardUncached,
+    'team_detail': TeamDetail,
+    'send_invitations': SendInvitations,
+    'team_search': TeamSearch,
+    'log_in': LogIn,
+}
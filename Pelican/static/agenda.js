@@ -0,0 +1,47 @@
+// Load the tasks due on a calendar day when its count is clicked, a page at a time.
+(function () {
+  const list = document.getElementById('agenda-tasks');
+  if (!list) {
+    return;
+  }
+
+  document.addEventListener('click', function (event) {
+    const day = event.target.closest('a.agenda-day');
+    const more = event.target.closest('a.agenda-more');
+    if (!day && !more) {
+      return;
+    }
+    event.preventDefault();
+    if (day) {
+      list.replaceChildren();
+      load(day.dataset.url);
+    } else {
+      more.parentElement.remove();
+      load(more.href);
+    }
+  });
+
+  function load(url) {
+    fetch(url, { credentials: 'same-origin' })
+      .then(function (response) { return response.json(); })
+      .then(function (page) {
+        page.tasks.forEach(function (task) { list.append(render(task)); });
+        if (page.next) {
+          const item = document.createElement('li');
+          const link = document.createElement('a');
+          link.href = page.next;
+          link.className = 'agenda-more';
+          link.textContent = 'Load more';
+          item.append(link);
+          list.append(item);
+        }
+      });
+  }
+
+  function render(task) {
+    const item = document.createElement('li');
+    item.textContent = task.description + ' - Due: ' + task.due_date + ' - Team: ' + task.team.name +
+      (task.assigned_to.length ? ' - Assigned to: ' + task.assigned_to.join(', ') : '');
+    return item;
+  }
+})();
@@ -0,0 +1,11 @@
+// Replace a feed's "Load more" link with the next page fragment it points to.
+document.addEventListener('click', function (event) {
+  const link = event.target.closest('a.load-more-link');
+  if (!link) {
+    return;
+  }
+  event.preventDefault();
+  fetch(link.href, { credentials: 'same-origin' })
+    .then(function (response) { return response.text(); })
+    .then(function (html) { link.parentElement.outerHTML = html; });
+});
@@ -0,0 +1,39 @@
+// Show new notifications on the dashboard as they arrive, without reloading the page.
+// The browser reconnects on its own and resumes after the last event it received.
+// The page only sets a stream URL when it is served over ASGI.
+(function () {
+  const container = document.getElementById('notifications');
+  if (!container || !container.dataset.streamUrl || !window.EventSource) {
+    return;
+  }
+  const header = container.querySelector('.notifications-header');
+  const source = new EventSource(container.dataset.streamUrl);
+
+  source.addEventListener('notification', function (event) {
+    const notification = JSON.parse(event.data);
+    const empty = container.querySelector('.no-notifications');
+    if (empty) {
+      empty.remove();
+    }
+    header.after(render(notification));
+  });
+
+  function render(notification) {
+    const item = document.createElement('div');
+    const title = document.createElement('p');
+    if (notification.url) {
+      title.textContent = 'Invitation to join Team: ' + notification.team;
+      const link = document.createElement('a');
+      link.href = notification.url;
+      link.className = 'confirm-invitation';
+      link.textContent = notification.message;
+      item.append(title, link);
+    } else {
+      title.textContent = 'No Associated Invitation';
+      const message = document.createElement('p');
+      message.textContent = notification.message;
+      item.append(title, message);
+    }
+    return item;
+  }
+})();
@@ -0,0 +1,23 @@
+// Keep the navbar's unread notifications badge current by polling the unread count.
+(function () {
+  const badge = document.getElementById('unread-notifications-badge');
+  if (!badge) {
+    return;
+  }
+  const POLL_INTERVAL = 30000;
+
+  function refresh() {
+    if (document.hidden) {
+      return;
+    }
+    fetch(badge.dataset.url, { credentials: 'same-origin' })
+      .then(function (response) { return response.json(); })
+      .then(function (data) {
+        badge.textContent = data.unread;
+        badge.hidden = data.unread === 0;
+      });
+  }
+
+  setInterval(refresh, POLL_INTERVAL);
+  document.addEventListener('visibilitychange', refresh);
+})();
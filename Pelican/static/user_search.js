@@ -0,0 +1,64 @@
+// Typeahead for the team member picker. Matches come from the user search
+// endpoint; members that are already ticked stay in the list between searches.
+(function () {
+  const input = document.getElementById('user-search');
+  const members = document.getElementById('id_members');
+  if (!input || !members) {
+    return;
+  }
+  let timer = null;
+  let latestRequest = 0;
+
+  input.form.addEventListener('submit', function (event) {
+    event.preventDefault();
+  });
+  input.addEventListener('input', function () {
+    clearTimeout(timer);
+    timer = setTimeout(search, 150);
+  });
+
+  function search() {
+    const query = input.value.trim();
+    const requestId = ++latestRequest;
+    if (!query) {
+      render([]);
+      return;
+    }
+    fetch(input.dataset.url + '?q=' + encodeURIComponent(query), { credentials: 'same-origin' })
+      .then(function (response) { return response.json(); })
+      .then(function (data) {
+        if (requestId === latestRequest) {
+          render(data.results);
+        }
+      });
+  }
+
+  function render(users) {
+    const selected = Array.from(members.querySelectorAll('input:checked'))
+      .map(function (checkbox) { return checkbox.closest('.member-option'); });
+    const selectedIds = new Set(selected.map(function (option) { return option.dataset.userId; }));
+    members.replaceChildren.apply(members, selected);
+    users.forEach(function (user) {
+      if (!selectedIds.has(String(user.id))) {
+        members.appendChild(memberOption(user));
+      }
+    });
+  }
+
+  function memberOption(user) {
+    const option = document.createElement('span');
+    option.className = 'member-option';
+    option.dataset.userId = user.id;
+    const checkbox = document.createElement('input');
+    checkbox.type = 'checkbox';
+    checkbox.id = 'user_' + user.id;
+    checkbox.name = 'members';
+    checkbox.value = user.id;
+    const label = document.createElement('label');
+    label.htmlFor = checkbox.id;
+    label.title = user.full_name;
+    label.textContent = user.username;
+    option.append(checkbox, label, document.createElement('br'));
+    return option;
+  }
+})();
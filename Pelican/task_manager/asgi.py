@@ -12,5 +12,13 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'task_manager.settings')
+# Synchronous code runs on a new thread for every request, so connections cannot outlive it.
+os.environ.setdefault('DATABASE_CONNECTION_PROFILE', 'asgi')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported once Django is set up, as it loads models
+from tasks.notification_stream import cancel_on_disconnect  # noqa: E402
+
+# Django 4.2 does not notice clients that disconnect from a streamed response
+application = cancel_on_disconnect(django_application)
@@ -0,0 +1,38 @@
+"""Database connection profiles, selected with the DATABASE_CONNECTION_PROFILE setting.
+
+'persistent' suits WSGI servers, whose worker threads live as long as the
+process: each thread keeps its connection for up to ten minutes and checks
+it still works before a request reuses it. Under ASGI every request runs
+its synchronous code on a new thread, so 'asgi' closes connections after
+each request and relies on the pool of database threads for async views.
+'per_request' closes every connection after use and runs async views'
+queries on the thread Django shares for synchronous code, as tests need.
+"""
+
+PROFILES = {
+    'persistent': {'max_age': 600, 'health_checks': True, 'async_pool_size': 8},
+    'asgi': {'max_age': 0, 'health_checks': False, 'async_pool_size': 8},
+    'per_request': {'max_age': 0, 'health_checks': False, 'async_pool_size': 0},
+}
+
+
+def _profile(profile):
+    try:
+        return PROFILES[profile]
+    except KeyError:
+        raise ValueError(
+            f"Unknown database connection profile {profile!r}, expected one of {', '.join(map(repr, PROFILES))}"
+        ) from None
+
+
+def database_connection_settings(profile):
+    """Return the CONN_MAX_AGE and CONN_HEALTH_CHECKS database settings for a profile."""
+
+    options = _profile(profile)
+    return {'CONN_MAX_AGE': options['max_age'], 'CONN_HEALTH_CHECKS': options['health_checks']}
+
+
+def async_pool_size(profile):
+    """Return the number of database threads async views may use under a profile."""
+
+    return _profile(profile)['async_pool_size']
@@ -0,0 +1,44 @@
+"""Password hasher profiles, selected with the PASSWORD_HASHER_PROFILE setting.
+
+The first hasher of a profile hashes new passwords. The others only verify
+existing hashes, which Django rehashes with the first hasher at the next
+successful login, except under the fast profile, which never replaces a
+hash with a weaker one.
+"""
+from importlib.util import find_spec
+from django.contrib.auth.hashers import MD5PasswordHasher
+
+# Hashes from every earlier configuration, so existing users can still log in and be upgraded.
+LEGACY_HASHERS = [
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+
+
+class FastPasswordHasher(MD5PasswordHasher):
+    """A single salted MD5 round, used to hash new passwords under the fast profile.
+
+    Its hashes are plain 'md5' ones. User.check_password does not rehash
+    passwords at login while it is the preferred hasher.
+    """
+
+
+def password_hashers(profile):
+    """Return the PASSWORD_HASHERS setting for a profile.
+
+    'production' hashes with Argon2 when argon2-cffi is installed and with
+    scrypt otherwise. 'fast' hashes with FastPasswordHasher, which is only
+    fit for tests and throwaway databases: its hashes are not accepted by
+    the production profile.
+    """
+
+    if find_spec('argon2') is not None:
+        production = ['django.contrib.auth.hashers.Argon2PasswordHasher', 'django.contrib.auth.hashers.ScryptPasswordHasher']
+    else:
+        production = ['django.contrib.auth.hashers.ScryptPasswordHasher']
+    production += LEGACY_HASHERS
+    if profile == 'production':
+        return production
+    if profile == 'fast':
+        return ['task_manager.password_hashers.FastPasswordHasher'] + production
+    raise ValueError(f"Unknown password hasher profile {profile!r}, expected 'production' or 'fast'")
@@ -0,0 +1,49 @@
+"""Test runner that applies the settings the test suite runs with."""
+import os
+from django.conf import settings
+from django.db import connections
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+from task_manager.database_connections import async_pool_size, database_connection_settings
+from task_manager.password_hashers import password_hashers
+
+
+def test_settings(environ=os.environ):
+    """Return the settings the test runner overrides.
+
+    Tests cache in memory, so they never touch the cache directory, and hash
+    passwords with the fast profile unless PASSWORD_HASHER_PROFILE is set in
+    the environment. They use the per_request database connection profile
+    unless DATABASE_CONNECTION_PROFILE is set.
+    """
+
+    overrides = {'CACHES': {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}}
+    if 'PASSWORD_HASHER_PROFILE' not in environ:
+        overrides.update(PASSWORD_HASHER_PROFILE='fast', PASSWORD_HASHERS=password_hashers('fast'))
+    if 'DATABASE_CONNECTION_PROFILE' not in environ:
+        overrides.update(
+            DATABASE_CONNECTION_PROFILE='per_request', DATABASE_ASYNC_POOL_SIZE=async_pool_size('per_request')
+        )
+    return overrides
+
+
+class TestRunner(DiscoverRunner):
+    """Django's test runner, with the settings from test_settings applied."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._test_settings = override_settings(**test_settings())
+        self._test_settings.enable()
+        # Connections keep the settings they were configured with, so the profile is applied to them directly
+        profile_settings = database_connection_settings(settings.DATABASE_CONNECTION_PROFILE)
+        self._connection_settings = {}
+        for alias in connections:
+            settings_dict = connections[alias].settings_dict
+            self._connection_settings[alias] = {key: settings_dict[key] for key in profile_settings}
+            settings_dict.update(profile_settings)
+
+    def teardown_test_environment(self, **kwargs):
+        for alias, connection_settings in self._connection_settings.items():
+            connections[alias].settings_dict.update(connection_settings)
+        self._test_settings.disable()
+        super().teardown_test_environment(**kwargs)
@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 from django.contrib.messages import constants as messages
+from task_manager.database_connections import async_pool_size, database_connection_settings
+from task_manager.password_hashers import password_hashers
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -43,11 +46,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'tasks.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'tasks.middleware.ReadReplicaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -80,9 +85,94 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+    },
+    # A copy of the default database kept in sync with it by replication
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('REPLICA_DATABASE_NAME', BASE_DIR / 'db.sqlite3'),
+    },
+}
+
+# Database connections: 'persistent' (WSGI), 'asgi' or 'per_request'.
+# The test runner and asgi.py choose their profile unless told otherwise.
+DATABASE_CONNECTION_PROFILE = os.environ.get('DATABASE_CONNECTION_PROFILE', 'persistent')
+for database in DATABASES.values():
+    database.update(database_connection_settings(DATABASE_CONNECTION_PROFILE))
+
+# Threads async views run their queries on, each keeping its own connection
+# for up to DATABASE_ASYNC_POOL_MAX_AGE seconds; 0 runs them on the thread
+# Django shares for synchronous code
+DATABASE_ASYNC_POOL_SIZE = async_pool_size(DATABASE_CONNECTION_PROFILE)
+DATABASE_ASYNC_POOL_MAX_AGE = 600
+
+DATABASE_ROUTERS = ['tasks.routers.ReadReplicaRouter']
+
+# Read replica: set REPLICA_DATABASE_NAME to send the reads of these views
+# (by URL name) to it. Users who wrote within READ_YOUR_WRITES_WINDOW
+# seconds keep reading from the default database, so they see their changes.
+READ_REPLICA_ALIAS = 'replica'
+READ_REPLICA_ENABLED = 'REPLICA_DATABASE_NAME' in os.environ
+READ_REPLICA_VIEWS = (
+    'dashboard', 'dashboard_tasks', 'dashboard_notifications', 'team_detail', 'team_tasks', 'user_search',
+    'export_team_tasks', 'agenda', 'agenda_days', 'agenda_tasks', 'team_history', 'team_history_tasks',
+)
+READ_YOUR_WRITES_WINDOW = 10
+
+# Pragmas run on every new SQLite connection. WAL lets readers carry on while
+# a write is committed, and writers wait up to busy_timeout milliseconds for
+# the lock instead of failing with "database is locked". synchronous=NORMAL
+# is durable against application crashes, though not against power loss.
+# https://www.sqlite.org/pragma.html
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -20000,
+    'temp_store': 'MEMORY',
+}
+
+
+# Caches
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+# A file cache, shared by the web server processes and the management commands
+# that invalidate dashboard fragments (notification_worker, import_tasks).
+# Any cross-process backend (database, Redis) will do; LocMemCache will not.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('CACHE_LOCATION', BASE_DIR / 'cache'),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
     }
 }
 
+# Cache alias and lifetime (in seconds) of the per-user dashboard fragments.
+# notification_worker refuses to run unless this cache is shared between processes.
+DASHBOARD_CACHE_ALIAS = 'default'
+DASHBOARD_CACHE_TIMEOUT = 600
+
+# Login throttling: cache alias of the token buckets, and each bucket's
+# capacity (attempts allowed in a burst) and refill rate (attempts per second)
+LOGIN_THROTTLE_CACHE_ALIAS = 'default'
+LOGIN_THROTTLE_BUCKETS = {
+    'ip': {'capacity': 30, 'refill_rate': 0.5},
+    'username': {'capacity': 10, 'refill_rate': 1 / 30},
+}
+
+
+# Password hashing
+# https://docs.djangoproject.com/en/4.2/topics/auth/passwords/
+
+# 'production' (Argon2 or scrypt) or 'fast' (for tests and throwaway databases).
+# task_manager.runner.TestRunner uses the fast profile unless the environment sets one.
+PASSWORD_HASHER_PROFILE = os.environ.get('PASSWORD_HASHER_PROFILE', 'production')
+
+PASSWORD_HASHERS = password_hashers(PASSWORD_HASHER_PROFILE)
+
+# Test runner that overrides the settings above for the test suite
+TEST_RUNNER = 'task_manager.runner.TestRunner'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -139,6 +229,60 @@ LOGIN_URL = 'log_in'
 # URL where @login_prohibited redirects to
 REDIRECT_URL_WHEN_LOGGED_IN = 'dashboard'
 
+# Number of rows per page of the task and notification feeds
+FEED_PAGE_SIZE = 25
+
+# Number of tasks read per query, and written per chunk, by task exports.
+# Each chunk's assignees are loaded with one IN query, so keep it below 1000.
+EXPORT_CHUNK_SIZE = 500
+
+# Number of rows validated and written per transaction by task imports, and
+# the most skipped rows an import reports individually
+IMPORT_CHUNK_SIZE = 500
+IMPORT_MAX_REPORTED_ERRORS = 1000
+
+# Longest date range, in days, the agenda API answers in one request
+AGENDA_MAX_DAYS = 366
+
+# Maximum number of users returned by a member search
+USER_SEARCH_LIMIT = 20
+
+# Seconds between database polls of an open notification stream
+NOTIFICATION_STREAM_POLL_INTERVAL = 15
+
+# Seconds between checks of the shared cache for notifications created by other processes
+NOTIFICATION_STREAM_WAKE_INTERVAL = 1
+
+# Seconds a notification stream stays open before the browser is made to reconnect
+NOTIFICATION_STREAM_MAX_DURATION = 300
+
+# Per-view request metrics (queries, SQL, template and wall time), off unless enabled
+REQUEST_METRICS_ENABLED = False
+
+# Number of recent requests kept per view for the request metrics endpoint
+REQUEST_METRICS_HISTORY = 1000
+
+# Per-view limits, keyed by URL name; exceeding one logs a warning.
+# Limits can be set on 'queries', 'sql_ms', 'template_ms' and 'total_ms'.
+REQUEST_METRICS_BUDGETS = {
+    'dashboard': {'queries': 5, 'total_ms': 250},
+    'dashboard_tasks': {'queries': 3, 'total_ms': 150},
+    'dashboard_notifications': {'queries': 3, 'total_ms': 150},
+    'team_detail': {'queries': 6, 'total_ms': 250},
+    'team_tasks': {'queries': 4, 'total_ms': 150},
+    'send_invitations': {'queries': 12, 'total_ms': 500},
+    'user_search': {'queries': 3, 'total_ms': 100},
+}
+
+# Notification worker: messages claimed per batch, seconds a claim is held,
+# seconds to sleep when the outbox is empty, and retry policy for failures
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_LEASE = 60
+OUTBOX_POLL_INTERVAL = 1
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_DELAY = 5
+OUTBOX_MAX_RETRY_DELAY = 300
+
 # Convert Django ERROR messages to Bootstrap DANGER messages
 MESSAGE_TAGS = {
     messages.ERROR: 'danger',
@@ -23,13 +23,30 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('', views.home, name='home'),
     path('dashboard/', views.dashboard, name='dashboard'),
+    path('dashboard/tasks/', views.dashboard_tasks, name='dashboard_tasks'),
+    path('dashboard/notifications/', views.dashboard_notifications, name='dashboard_notifications'),
+    path('notifications/unread/', views.unread_notifications, name='unread_notifications'),
+    path('notifications/read/', views.mark_notifications_read, name='mark_notifications_read'),
+    path('notifications/stream/', views.notification_stream, name='notification_stream'),
+    path('dashboard/cache-stats/', views.dashboard_cache_stats, name='dashboard_cache_stats'),
+    path('metrics/requests/', views.request_metrics, name='request_metrics'),
     path('log_in/', views.LogInView.as_view(), name='log_in'),
     path('log_out/', views.log_out, name='log_out'),
     path('password/', views.PasswordView.as_view(), name='password'),
     path('profile/', views.ProfileUpdateView.as_view(), name='profile'),
     path('sign_up/', views.SignUpView.as_view(), name='sign_up'),
     path('team/', views.TeamCreateView.as_view(), name='team'),
+    path('agenda/', views.agenda, name='agenda'),
+    path('agenda/days/', views.agenda_days, name='agenda_days'),
+    path('agenda/tasks/', views.agenda_tasks, name='agenda_tasks'),
+    path('users/search/', views.user_search, name='user_search'),
     path('team/<int:team_id>/', views.team_detail, name='team_detail'),
+    path('team/<int:team_id>/tasks/', views.team_tasks, name='team_tasks'),
+    path('team/<int:team_id>/history/', views.team_history, name='team_history'),
+    path('team/<int:team_id>/history/tasks/', views.team_history_tasks, name='team_history_tasks'),
+    path('task/<int:task_id>/complete/', views.complete_task, name='complete_task'),
+    path('team/<int:team_id>/tasks/export/', views.export_team_tasks, name='export_team_tasks'),
+    path('team/<int:team_id>/tasks/import/', views.import_team_tasks, name='import_team_tasks'),
     path('team/<int:team_id>/invite/send/', views.send_invitations, name='send_invitations'),
     path('team/<int:team_id>/invitation/<int:invitation_id>/accept/', views.accept_invitation, name='accept_invitation'),
     path('team/<int:team_id>/invitation/<int:invitation_id>/reject/', views.reject_invitation, name='reject_invitation'),
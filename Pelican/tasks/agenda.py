@@ -0,0 +1,131 @@
+"""Date range queries over a user's tasks, for the agenda calendar and its JSON API.
+
+A user's agenda covers either the open tasks assigned to them or every open
+task of their teams. Month views need only the number of tasks due each
+day, which one GROUP BY query answers; the tasks themselves are fetched a
+page at a time, for the days the user opens.
+"""
+import calendar
+from datetime import date, timedelta
+from django.conf import settings
+from django.db.models import Count, Prefetch
+from tasks.models import Task, User
+
+SCOPES = ('assigned', 'teams')
+
+# The months whose calendars, and the months either side, lie within date.min and date.max
+FIRST_MONTH = date(1, 2, 1)
+LAST_MONTH = date(9999, 11, 1)
+
+
+def parse_scope(value):
+    """Return the agenda scope named by a query parameter, 'assigned' by default."""
+
+    scope = value or 'assigned'
+    if scope not in SCOPES:
+        raise ValueError(f"Unknown agenda scope {scope!r}, expected 'assigned' or 'teams'")
+    return scope
+
+
+def parse_month(value, today=None):
+    """Return the first day of the month given as YYYY-MM, or of the current month."""
+
+    if not value:
+        return (today or date.today()).replace(day=1)
+    year, month = value.split('-')
+    first_day = date(int(year), int(month), 1)
+    if not FIRST_MONTH <= first_day <= LAST_MONTH:
+        raise ValueError(f"Months must lie between {FIRST_MONTH:%Y-%m} and {LAST_MONTH:%Y-%m}")
+    return first_day
+
+
+def month_range(first_day):
+    """Return the first and last day of a month."""
+
+    return first_day, first_day.replace(day=calendar.monthrange(first_day.year, first_day.month)[1])
+
+
+def parse_date_range(start, end, today=None):
+    """Return the (start, end) dates of an inclusive range given as ISO dates.
+
+    Without a start the range begins on the first of the current month and,
+    without an end, ends on its start, or on the last of the current month.
+    The range may span at most AGENDA_MAX_DAYS days.
+    """
+
+    if start:
+        start = default_end = date.fromisoformat(start)
+    else:
+        start, default_end = month_range(parse_month(None, today))
+    end = date.fromisoformat(end) if end else default_end
+    if end < start:
+        raise ValueError("The end date is before the start date")
+    if (end - start).days >= settings.AGENDA_MAX_DAYS:
+        raise ValueError(f"Date ranges may span at most {settings.AGENDA_MAX_DAYS} days")
+    return start, end
+
+
+def agenda_queryset(user, scope):
+    """Return the open tasks in a user's agenda."""
+
+    if scope == 'assigned':
+        return Task.objects.open().filter(assigned_to=user)
+    return Task.objects.open().filter(team__members=user)
+
+
+def day_counts(tasks, start, end):
+    """Return the number of tasks due on each day of a range that has any, in one query."""
+
+    rows = (
+        tasks.filter(due_date__range=(start, end))
+        .order_by().values('due_date').annotate(count=Count('pk'))
+    )
+    return {row['due_date']: row['count'] for row in rows}
+
+
+def month_weeks(first_day, counts):
+    """Return the weeks of a month's calendar, as lists of (day, count) pairs."""
+
+    return [
+        [(day, counts.get(day, 0)) for day in week]
+        for week in calendar.Calendar().monthdatescalendar(first_day.year, first_day.month)
+    ]
+
+
+def calendar_range(first_day):
+    """Return the first and last day shown by a month's calendar, which may lie in the months either side."""
+
+    weeks = calendar.Calendar().monthdatescalendar(first_day.year, first_day.month)
+    return weeks[0][0], weeks[-1][-1]
+
+
+def neighbouring_months(first_day):
+    """Return the first days of the months before and after a month, or None for months parse_month rejects."""
+
+    previous_month = next_month = None
+    if first_day > FIRST_MONTH:
+        previous_month = (first_day - timedelta(days=1)).replace(day=1)
+    if first_day < LAST_MONTH:
+        next_month = month_range(first_day)[1] + timedelta(days=1)
+    return previous_month, next_month
+
+
+def tasks_in_range(tasks, start, end):
+    """Return the tasks due in a range, with their team and assignees' usernames loaded."""
+
+    return tasks.filter(due_date__range=(start, end)).select_related('team').prefetch_related(
+        Prefetch('assigned_to', queryset=User.objects.only('id', 'username').order_by('username'))
+    )
+
+
+def task_payload(task):
+    """Return the JSON-serialisable details of an agenda task."""
+
+    return {
+        'id': task.pk,
+        'name': task.name,
+        'description': task.description,
+        'due_date': task.due_date.isoformat(),
+        'team': {'id': task.team_id, 'name': task.team.name},
+        'assigned_to': [user.username for user in task.assigned_to.all()],
+    }
@@ -0,0 +1,115 @@
+"""Reuse of database connections, and a bounded pool of database threads for async views.
+
+Django keeps each thread's connection across requests for CONN_MAX_AGE
+seconds. Async views run their queries through run_in_database_pool, on at
+most DATABASE_ASYNC_POOL_SIZE threads that each keep their own connection
+for DATABASE_ASYNC_POOL_MAX_AGE seconds. Like a request, every call made in
+the pool first closes the thread's connection if it is too old or broken.
+
+Each process counts the connections it opens, and the requests and pool
+calls that found a connection already open and reused it.
+"""
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import close_old_connections, connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+_stats_lock = threading.Lock()
+_stats = defaultdict(lambda: {'opened': 0, 'reused': 0})
+
+_executor_lock = threading.Lock()
+_executor = None
+_executor_size = 0
+
+_pool_thread = threading.local()
+
+
+def _count(alias, event):
+    with _stats_lock:
+        _stats[alias][event] += 1
+
+
+def _count_reused():
+    for connection in connections.all(initialized_only=True):
+        if connection.connection is not None:
+            _count(connection.alias, 'reused')
+
+
+@receiver(connection_created)
+def connection_opened(sender, connection, **kwargs):
+    """Count a new connection, and give it the pool's lifetime if it belongs to a pool thread."""
+
+    _count(connection.alias, 'opened')
+    if getattr(_pool_thread, 'active', False):
+        connection.close_at = time.monotonic() + settings.DATABASE_ASYNC_POOL_MAX_AGE
+
+
+@receiver(request_started)
+def request_reused_connections(sender, **kwargs):
+    """Count the connections a request starts with, which Django has just checked are still fit for reuse."""
+
+    _count_reused()
+
+
+def connection_stats():
+    """Return this process's counts of opened and reused connections per database."""
+
+    with _stats_lock:
+        databases = {alias: dict(counts) for alias, counts in sorted(_stats.items())}
+    return {'pid': os.getpid(), 'async_pool_size': settings.DATABASE_ASYNC_POOL_SIZE, 'databases': databases}
+
+
+def reset_connection_stats():
+    """Reset this process's connection counters."""
+
+    with _stats_lock:
+        _stats.clear()
+
+
+def _mark_pool_thread():
+    _pool_thread.active = True
+
+
+def _database_executor():
+    global _executor, _executor_size
+    size = settings.DATABASE_ASYNC_POOL_SIZE
+    with _executor_lock:
+        if _executor is None or _executor_size != size:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ThreadPoolExecutor(size, thread_name_prefix='database', initializer=_mark_pool_thread)
+            _executor_size = size
+        return _executor
+
+
+def _call_with_connections(func, args, kwargs):
+    close_old_connections()
+    _count_reused()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_in_database_pool(func, *args, **kwargs):
+    """Call a function that queries the database from async code and return its result.
+
+    The call runs on one of the pool's threads, with the caller's context
+    variables, or on the thread Django shares for synchronous code when the
+    pool is disabled.
+    """
+
+    if not settings.DATABASE_ASYNC_POOL_SIZE:
+        return await sync_to_async(func)(*args, **kwargs)
+    call = functools.partial(contextvars.copy_context().run, _call_with_connections, func, args, kwargs)
+    return await asyncio.get_running_loop().run_in_executor(_database_executor(), call)
@@ -0,0 +1,134 @@
+"""Per-user caching of the dashboard's "Your Teams", "Your Tasks" and "Notifications" blocks.
+
+Every (user, block) pair has a version stored in the cache, and rendered
+fragments are cached under a key that includes it. Invalidating a block
+just stores a new version, so stale fragments are never read again and
+age out of the cache on their own. Versions come from a nanosecond clock,
+so they keep increasing even if a version key is evicted and recreated.
+
+Management commands such as notification_worker and import_tasks
+invalidate blocks from their own processes, so the cache must be shared
+with the web server: a file, database or Redis cache, not LocMemCache.
+"""
+import threading
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from tasks.routers import primary_reads
+
+DASHBOARD_BLOCKS = ('teams', 'tasks', 'notifications')
+
+_stats_lock = threading.Lock()
+_stats = {block: {'hits': 0, 'misses': 0} for block in DASHBOARD_BLOCKS}
+
+
+def _cache():
+    return caches[settings.DASHBOARD_CACHE_ALIAS]
+
+
+def dashboard_cache_is_shared():
+    """Return whether other processes see the dashboard cache, and with it invalidations made outside the web server."""
+
+    return not isinstance(_cache(), LocMemCache)
+
+
+def _version_key(user_id, block):
+    return f'dashboard:{block}:version:{user_id}'
+
+
+def _fragment_key(user_id, block, version):
+    return f'dashboard:{block}:fragment:{user_id}:{version}'
+
+
+def _new_version():
+    return time.time_ns()
+
+
+def render_dashboard_fragments(request, renderers):
+    """Return the rendered dashboard blocks for the request's user.
+
+    `renderers` maps each block name to a (template name, context factory)
+    pair. The context factory is only called when the block has to be
+    rendered, so cached blocks cost no database queries. Blocks are always
+    rendered from the default database, never from the read replica.
+    """
+
+    cache = _cache()
+    user_id = request.user.pk
+    version_keys = {block: _version_key(user_id, block) for block in renderers}
+    versions = cache.get_many(version_keys.values())
+    for block, key in version_keys.items():
+        if key not in versions:
+            cache.add(key, _new_version(), None)
+            versions[key] = cache.get(key, _new_version())
+    fragment_keys = {
+        block: _fragment_key(user_id, block, versions[version_keys[block]]) for block in renderers
+    }
+    cached_fragments = cache.get_many(fragment_keys.values())
+    fragments = {}
+    for block, (template_name, get_context) in renderers.items():
+        fragment = cached_fragments.get(fragment_keys[block])
+        _record(block, hit=fragment is not None)
+        if fragment is None:
+            # A fragment rendered from a lagging replica would be cached under the new version
+            with primary_reads():
+                fragment = render_to_string(template_name, get_context(), request=request)
+            cache.set(fragment_keys[block], fragment, settings.DASHBOARD_CACHE_TIMEOUT)
+        fragments[block] = mark_safe(fragment)
+    return fragments
+
+
+def invalidate_dashboard_fragments(user_ids, *blocks):
+    """Invalidate the given dashboard blocks of the given users.
+
+    The blocks are invalidated straight away and again once the current
+    transaction commits, so a fragment rendered from uncommitted data in
+    between cannot outlive the write.
+    """
+
+    user_ids = [user_id for user_id in set(user_ids) if user_id is not None]
+    if not user_ids:
+        return
+    _bump_versions(user_ids, blocks)
+    transaction.on_commit(lambda: _bump_versions(user_ids, blocks))
+
+
+def block_version(user_id, block):
+    """Return the current version of a user's dashboard block, or None if it has none yet.
+
+    The version changes whenever the block is invalidated, in any process
+    sharing the cache, so it doubles as a cheap "something changed" signal.
+    """
+
+    return _cache().get(_version_key(user_id, block))
+
+
+def _bump_versions(user_ids, blocks):
+    version = _new_version()
+    _cache().set_many(
+        {_version_key(user_id, block): version for user_id in user_ids for block in blocks}, None
+    )
+
+
+def _record(block, hit):
+    with _stats_lock:
+        _stats[block]['hits' if hit else 'misses'] += 1
+
+
+def fragment_cache_stats():
+    """Return the hit and miss counters of this process, per dashboard block."""
+
+    with _stats_lock:
+        return {block: dict(counters) for block, counters in _stats.items()}
+
+
+def reset_fragment_cache_stats():
+    """Reset the hit and miss counters of this process."""
+
+    with _stats_lock:
+        for counters in _stats.values():
+            counters.update(hits=0, misses=0)
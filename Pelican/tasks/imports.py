@@ -0,0 +1,157 @@
+"""Bulk import of tasks from CSV or newline-delimited JSON.
+
+Files are read a chunk of rows at a time, in the format task exports are
+written in. Each row is checked with the field rules of TaskForm, the
+assignees' usernames of a whole chunk are looked up with one query, and
+the chunk's valid rows are written in one transaction. Rows that fail
+validation are skipped and reported with their line number.
+"""
+import csv
+import json
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from tasks.forms import TaskForm
+from tasks.models import Task, User
+
+FORMATS = ('csv', 'ndjson')
+
+REQUIRED_COLUMNS = ('description', 'due_date', 'assigned_to')
+
+
+class ImportFormatError(ValueError):
+    """Raised when a file cannot be read as tasks at all, as opposed to having invalid rows."""
+
+
+class ImportResult:
+    """The number of tasks an import created, and the errors of the rows it skipped."""
+
+    def __init__(self):
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+
+    def add_error(self, line, errors):
+        """Record a skipped row; only the first IMPORT_MAX_REPORTED_ERRORS are kept."""
+
+        self.failed += 1
+        if len(self.errors) < settings.IMPORT_MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'errors': errors})
+
+    def as_dict(self):
+        return {'created': self.created, 'failed': self.failed, 'errors': self.errors}
+
+
+def format_for(filename):
+    """Return the import format named by a file's extension, or None."""
+
+    extension = filename.rsplit('.', 1)[-1].lower()
+    return extension if extension in FORMATS else None
+
+
+def _csv_rows(lines):
+    reader = csv.DictReader(lines)
+    missing = [column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or [])]
+    if missing:
+        raise ImportFormatError(f"Missing CSV columns: {', '.join(missing)}")
+    for row in reader:
+        row['assigned_to'] = (row['assigned_to'] or '').split()
+        yield reader.line_num, row
+
+
+def _ndjson_rows(lines):
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        if not isinstance(row, dict):
+            yield line_number, None
+            continue
+        if isinstance(row.get('assigned_to'), str):
+            row['assigned_to'] = row['assigned_to'].split()
+        yield line_number, row
+
+
+def _clean(row, fields):
+    """Return the cleaned task fields of a row, or raise ValidationError with each field's errors."""
+
+    cleaned = {}
+    errors = {}
+    for name in ('name', 'description', 'due_date'):
+        value = row.get(name)
+        # NDJSON values can be numbers, lists or objects, which the form fields cannot clean
+        if value is not None and not isinstance(value, str):
+            errors[name] = ['Enter a string.']
+            continue
+        try:
+            cleaned[name] = fields[name].clean(value)
+        except ValidationError as error:
+            errors[name] = error.messages
+    usernames = row.get('assigned_to') or []
+    if not isinstance(usernames, list) or not all(isinstance(username, str) for username in usernames):
+        errors['assigned_to'] = ['Enter a list of usernames.']
+    elif not usernames and fields['assigned_to'].required:
+        errors['assigned_to'] = [fields['assigned_to'].error_messages['required']]
+    if errors:
+        raise ValidationError(errors)
+    cleaned['assigned_to'] = list(dict.fromkeys(usernames))
+    return cleaned
+
+
+def _import_chunk(team, chunk, fields, result):
+    if not chunk:
+        return
+    valid = []
+    for line, row in chunk:
+        if row is None:
+            result.add_error(line, {'__all__': ['Each line must be a JSON object.']})
+            continue
+        try:
+            valid.append((line, _clean(row, fields)))
+        except ValidationError as error:
+            result.add_error(line, error.message_dict)
+    usernames = {username for _, cleaned in valid for username in cleaned['assigned_to']}
+    user_ids = dict(User.objects.filter(username__in=usernames).values_list('username', 'pk'))
+    tasks = []
+    assignee_ids = []
+    for line, cleaned in valid:
+        unknown = [username for username in cleaned['assigned_to'] if username not in user_ids]
+        if unknown:
+            result.add_error(line, {'assigned_to': [f"Unknown users: {', '.join(unknown)}"]})
+            continue
+        tasks.append(Task(
+            team=team, name=cleaned['name'], description=cleaned['description'], due_date=cleaned['due_date']
+        ))
+        assignee_ids.append([user_ids[username] for username in cleaned['assigned_to']])
+    if tasks:
+        Task.objects.bulk_create_assigned(tasks, assignee_ids)
+        result.created += len(tasks)
+
+
+def import_tasks(team, lines, import_format, chunk_size=None):
+    """Create a team's tasks from the lines of a CSV or NDJSON file, and return an ImportResult.
+
+    Each chunk of rows is committed on its own, so a file that turns out to
+    be malformed part way through keeps the tasks of the earlier chunks.
+    """
+
+    if import_format not in FORMATS:
+        raise ImportFormatError(f"Unknown import format {import_format!r}, expected 'csv' or 'ndjson'")
+    chunk_size = chunk_size or settings.IMPORT_CHUNK_SIZE
+    # The form's fields are built once and reused for every row
+    fields = TaskForm.base_fields
+    rows = _csv_rows(lines) if import_format == 'csv' else _ndjson_rows(lines)
+    result = ImportResult()
+    chunk = []
+    try:
+        for line, row in rows:
+            chunk.append((line, row))
+            if len(chunk) == chunk_size:
+                _import_chunk(team, chunk, fields, result)
+                chunk = []
+    except (csv.Error, UnicodeDecodeError) as error:
+        raise ImportFormatError(f"Cannot read the file: {error}") from error
+    _import_chunk(team, chunk, fields, result)
+    return result
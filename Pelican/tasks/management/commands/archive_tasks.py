@@ -0,0 +1,36 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from tasks.models import ArchivedTask, Task
+
+class Command(BaseCommand):
+    """Build automation command to move old completed tasks into the archive."""
+
+    BATCH_SIZE = 500
+    help = 'Moves tasks completed more than a number of days ago from the task table into the archive'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than', type=int, required=True, metavar='DAYS',
+            help='Archive tasks completed at least this many days ago.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=self.BATCH_SIZE,
+            help='Tasks moved per transaction (at most 999, the SQLite parameter limit). '
+                 'Each batch commits on its own, so an interrupted run can simply be restarted.'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if not 0 < batch_size <= 999:
+            raise CommandError('--batch-size must be between 1 and 999.')
+        if options['older_than'] < 0:
+            raise CommandError('--older-than must not be negative.')
+        cutoff = timezone.now() - timedelta(days=options['older_than'])
+        # Served by the partial index on completed_at, which holds only completed tasks
+        tasks = Task.objects.completed().filter(completed_at__lt=cutoff).order_by('completed_at', 'pk')
+        archived = 0
+        while task_ids := list(tasks.values_list('pk', flat=True)[:batch_size]):
+            archived += ArchivedTask.objects.archive(task_ids)
+            self.stdout.write(f"Archived {archived} tasks.", ending='\r')
+        self.stdout.write(f"Archived {archived} tasks completed before {cutoff:%Y-%m-%d %H:%M}.")
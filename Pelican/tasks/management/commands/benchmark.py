@@ -0,0 +1,124 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from benchmarks.datasets import SCALES
+from benchmarks.concurrency import sqlite_concurrency
+from benchmarks.logins import login_throughput
+from benchmarks.runner import compare, environment, run_scale
+from benchmarks.scenarios import SCENARIOS
+
+class Command(BaseCommand):
+    """Build automation command to run the load benchmarks against freshly seeded test databases."""
+
+    ITERATIONS = 30
+    WARMUP = 3
+    TOLERANCE = 0.25
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    LOGIN_DURATION = 2.0
+    CONCURRENCY_DURATION = 2.0
+    WRITERS = 4
+    READERS = 4
+    help = 'Runs the end-to-end benchmarks and reports latency, queries and memory per request'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', action='append', choices=list(SCALES), help='Data set scale, by number of tasks. Repeat for several; all by default.')
+        parser.add_argument('--scenario', action='append', choices=list(SCENARIOS), help='Scenario to run. Repeat for several; all by default.')
+        parser.add_argument('--iterations', type=int, default=self.ITERATIONS, help='Timed requests per scenario.')
+        parser.add_argument('--warmup', type=int, default=self.WARMUP, help='Untimed requests before the timed ones.')
+        parser.add_argument('--random-seed', type=int, default=0, help='Seed for the generated data sets.')
+        parser.add_argument('--output', default='benchmark-results.json', help='File the JSON results are written to.')
+        parser.add_argument('--baseline', help='JSON results of an earlier run to check for regressions.')
+        parser.add_argument('--login-duration', type=float, default=self.LOGIN_DURATION, help='Seconds spent measuring the logins per second of each password hasher profile; 0 to skip.')
+        parser.add_argument('--concurrency-duration', type=float, default=self.CONCURRENCY_DURATION, help='Seconds spent measuring concurrent SQLite writes and reads with and without the tuning pragmas; 0 to skip.')
+        parser.add_argument('--writers', type=int, default=self.WRITERS, help='Writer threads in the SQLite concurrency benchmark.')
+        parser.add_argument('--readers', type=int, default=self.READERS, help='Reader threads in the SQLite concurrency benchmark.')
+        parser.add_argument('--tolerance', type=float, default=self.TOLERANCE, help='Allowed p95 latency growth over the baseline, as a fraction.')
+
+    def handle(self, *args, **options):
+        scales = options['scale'] or list(SCALES)
+        scenario_names = options['scenario'] or list(SCENARIOS)
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be at least 1.')
+        if options['writers'] < 0 or options['readers'] < 0 or options['writers'] + options['readers'] < 1:
+            raise CommandError('--writers and --readers must add up to at least 1 thread.')
+        # The baseline is read first, so it may be the file the new results are written to.
+        baseline = self.load_baseline(options['baseline']) if options['baseline'] else None
+        results = {'environment': environment(), 'iterations': options['iterations'], 'scales': {}}
+        setup_test_environment()
+        # Scenarios clear the cache, which must not be the one the development server and its throttles use
+        benchmark_cache = override_settings(CACHES=self.CACHES)
+        benchmark_cache.enable()
+        try:
+            for scale in scales:
+                self.stdout.write(f"Seeding a test database with {scale} tasks...")
+                # Every scale runs against its own test database, never the development one.
+                old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+                try:
+                    results['scales'][scale] = run_scale(
+                        scale, scenario_names, options['iterations'], options['warmup'], options['random_seed']
+                    )
+                finally:
+                    connection.creation.destroy_test_db(old_name, verbosity=0)
+                self.report(scale, results['scales'][scale])
+            if options['login_duration'] > 0:
+                self.stdout.write("Measuring login throughput...")
+                old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+                try:
+                    results['logins'] = login_throughput(options['login_duration'])
+                finally:
+                    connection.creation.destroy_test_db(old_name, verbosity=0)
+                self.report_logins(results['logins'])
+            if options['concurrency_duration'] > 0:
+                self.stdout.write("Measuring concurrent SQLite writes and reads...")
+                results['concurrency'] = sqlite_concurrency(
+                    options['concurrency_duration'], options['writers'], options['readers']
+                )
+                self.report_concurrency(results['concurrency'])
+        finally:
+            benchmark_cache.disable()
+            teardown_test_environment()
+        with open(options['output'], 'w') as output:
+            json.dump(results, output, indent=2)
+        self.stdout.write(f"Results written to {options['output']}.")
+        if baseline is not None:
+            self.check_baseline(results, baseline, options['baseline'], options['tolerance'])
+
+    def report(self, scale, results):
+        self.stdout.write(f"{'scenario':<20} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8} {'peak KiB':>9} {'errors':>7}")
+        for name, result in results.items():
+            latency = result['latency_ms']
+            self.stdout.write(
+                f"{name:<20} {latency['p50']:>9.1f} {latency['p95']:>9.1f} {latency['p99']:>9.1f} "
+                f"{result['queries']['max']:>8} {result['peak_memory_kib']:>9.0f} {result['errors']:>7}"
+            )
+
+    def report_logins(self, results):
+        self.stdout.write(f"{'profile':<12} {'hasher':<24} {'logins/s/core':>14} {'ms/login':>9} {'legacy ms':>10}")
+        for profile, result in results.items():
+            self.stdout.write(
+                f"{profile:<12} {result['hasher']:<24} {result['logins_per_second_per_core']:>14.1f} "
+                f"{result['ms_per_login']:>9.2f} {result['legacy_rehash_ms']:>10.1f}"
+            )
+
+    def report_concurrency(self, results):
+        self.stdout.write(f"{'pragmas':<12} {'writes/s':>10} {'reads/s':>10} {'errors':>7}")
+        for profile, result in results.items():
+            self.stdout.write(
+                f"{profile:<12} {result['writes_per_second']:>10.1f} {result['reads_per_second']:>10.1f} {result['errors']:>7}"
+            )
+
+    def load_baseline(self, baseline_path):
+        try:
+            with open(baseline_path) as baseline_file:
+                return json.load(baseline_file)
+        except (OSError, ValueError) as error:
+            raise CommandError(f'Cannot read baseline {baseline_path}: {error}')
+
+    def check_baseline(self, results, baseline, baseline_path, tolerance):
+        regressions = compare(results, baseline, tolerance)
+        if regressions:
+            for regression in regressions:
+                self.stderr.write(regression)
+            raise CommandError(f'{len(regressions)} regressions against {baseline_path}.')
+        self.stdout.write(self.style.SUCCESS(f"No regressions against {baseline_path}."))
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from tasks.exports import CONTENT_TYPES, export_tasks, tasks_to_export
+from tasks.models import Team
+
+class Command(BaseCommand):
+    """Build automation command to export tasks as CSV or NDJSON."""
+
+    help = "Writes a team's tasks, or every team's, as CSV or newline-delimited JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--team', type=int, help='Id of the team whose tasks are exported; all teams by default.')
+        parser.add_argument('--format', choices=list(CONTENT_TYPES), default='csv', help='Output format.')
+        parser.add_argument('--output', help='File the tasks are written to; standard output by default.')
+        parser.add_argument('--chunk-size', type=int, default=settings.EXPORT_CHUNK_SIZE, help='Tasks read per query (at most 999, the SQLite parameter limit).')
+
+    def handle(self, *args, **options):
+        if not 0 < options['chunk_size'] <= 999:
+            raise CommandError('--chunk-size must be between 1 and 999.')
+        team = None
+        if options['team'] is not None:
+            try:
+                team = Team.objects.get(pk=options['team'])
+            except Team.DoesNotExist:
+                raise CommandError(f"Team {options['team']} does not exist.")
+        chunks = export_tasks(tasks_to_export(team), options['format'], options['chunk_size'])
+        if options['output'] is None:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+        with open(options['output'], 'w', newline='') as output:
+            for chunk in chunks:
+                output.write(chunk)
@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from tasks.fragment_cache import dashboard_cache_is_shared
+from tasks.imports import FORMATS, ImportFormatError, format_for, import_tasks
+from tasks.models import Team
+
+class Command(BaseCommand):
+    """Build automation command to import a team's tasks from CSV or NDJSON."""
+
+    help = "Creates a team's tasks from a CSV or newline-delimited JSON file, as written by export_tasks"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import.')
+        parser.add_argument('--team', type=int, required=True, help='Id of the team the tasks are created for.')
+        parser.add_argument('--format', choices=FORMATS, help="Input format; taken from the file's extension by default.")
+        parser.add_argument('--chunk-size', type=int, default=settings.IMPORT_CHUNK_SIZE, help='Rows written per transaction.')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1.')
+        try:
+            team = Team.objects.get(pk=options['team'])
+        except Team.DoesNotExist:
+            raise CommandError(f"Team {options['team']} does not exist.")
+        if not dashboard_cache_is_shared():
+            self.stderr.write(
+                'Warning: the dashboard cache is local to each process, so dashboards may show '
+                'the old tasks until their cached blocks expire.'
+            )
+        import_format = options['format'] or format_for(options['path'])
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as lines:
+                result = import_tasks(team, lines, import_format, options['chunk_size'])
+        except (OSError, ImportFormatError) as error:
+            raise CommandError(f"Cannot import {options['path']}: {error}")
+        for error in result.errors:
+            messages = '; '.join(
+                f"{field}: {' '.join(field_errors)}" for field, field_errors in error['errors'].items()
+            )
+            self.stderr.write(f"Line {error['line']}: {messages}")
+        self.stdout.write(f"Imported {result.created} tasks into {team.name}.")
+        if result.failed:
+            raise CommandError(f"{result.failed} rows were not imported.")
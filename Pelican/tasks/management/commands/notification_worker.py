@@ -0,0 +1,39 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from tasks.fragment_cache import dashboard_cache_is_shared
+from tasks.outbox import default_worker_id, drain
+
+class Command(BaseCommand):
+    """Run a worker that carries out the work queued in the outbox, such as creating notifications."""
+
+    help = 'Drains the notification outbox in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit once no message is due instead of polling.')
+        parser.add_argument('--batch-size', type=int, default=settings.OUTBOX_BATCH_SIZE, help='Messages claimed at a time.')
+        parser.add_argument('--lease', type=int, default=settings.OUTBOX_LEASE, help='Seconds a claimed message is held before another worker may retry it.')
+        parser.add_argument('--poll-interval', type=float, default=settings.OUTBOX_POLL_INTERVAL, help='Seconds to wait when the outbox is empty.')
+
+    def handle(self, *args, **options):
+        if not dashboard_cache_is_shared():
+            raise CommandError(
+                'The dashboard cache is local to each process, so the web server would never see the '
+                'notifications this worker creates. Point DASHBOARD_CACHE_ALIAS at a shared cache.'
+            )
+        worker_id = default_worker_id()
+        self.stdout.write(f"Notification worker {worker_id} started.")
+        try:
+            while True:
+                # Like a request, each round drops a connection that is too old or broken
+                close_old_connections()
+                handled, failed = drain(worker_id, options['batch_size'], options['lease'])
+                if handled or failed:
+                    self.stdout.write(f"Handled {handled} outbox messages, {failed} failed.")
+                if options['once']:
+                    return
+                time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            # Messages still claimed are retried by another worker once their lease runs out.
+            self.stdout.write("Notification worker stopped.")
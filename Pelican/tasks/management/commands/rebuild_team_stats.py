@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from tasks.models import TEAM_STATS_FIELDS, Team, invalidate_team_cards, refresh_team_stats, team_stats_expressions
+
+class Command(BaseCommand):
+    """Build automation command to recount every team's denormalized statistics."""
+
+    help = "Recounts each team's members, tasks and next due date, repairing any drift"
+
+    def handle(self, *args, **options):
+        expressions = team_stats_expressions()
+        with transaction.atomic():
+            teams = Team.objects.annotate(**{
+                f'actual_{field}': expressions[field] for field in TEAM_STATS_FIELDS
+            }).values_list('pk', *TEAM_STATS_FIELDS, *(f'actual_{field}' for field in TEAM_STATS_FIELDS))
+            size = len(TEAM_STATS_FIELDS)
+            drifted = [row[0] for row in teams.iterator() if row[1:size + 1] != row[size + 1:]]
+            rebuilt = refresh_team_stats()
+            # The cards of the drifted teams showed the wrong statistics
+            invalidate_team_cards(drifted)
+        self.stdout.write(f"Rebuilt the statistics of {rebuilt} teams, {len(drifted)} of which had drifted.")
@@ -1,71 +1,222 @@
+import re
+from datetime import date, timedelta
+from random import Random
+from django.contrib.auth.hashers import make_password
 from django.core.management.base import BaseCommand
-from tasks.models import User
+from django.db import transaction
+from tasks.models import (
+    Invitation, Notification, Task, Team, User, invalidate_team_cards, refresh_team_stats,
+    refresh_unread_notification_counts
+)
 from faker import Faker
-from random import randint
- 
+
 user_fixtures = [
     {'username': '@johndoe', 'email': 'john.doe@example.org', 'first_name': 'John', 'last_name': 'Doe'},
     {'username': '@janedoe', 'email': 'jane.doe@example.org', 'first_name': 'Jane', 'last_name': 'Doe'},
     {'username': '@charlie', 'email': 'charlie.johnson@example.org', 'first_name': 'Charlie', 'last_name': 'Johnson'},
 ]
- 
+
 class Command(BaseCommand):
     """Build automation command to seed the database."""
- 
+
     USER_COUNT = 300
+    TEAM_COUNT = 10
+    TASKS_PER_TEAM = 10
+    NOTIFICATION_COUNT = 100
+    MEMBERS_PER_TEAM = 10
+    BATCH_SIZE = 5000
     DEFAULT_PASSWORD = 'Password123'
     help = 'Seeds the database with sample data'
- 
-    def __init__(self):
-        super().__init__()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
         self.faker = Faker('en_GB')
- 
+        self.random = Random()
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=self.USER_COUNT, help='Total number of users to reach.')
+        parser.add_argument('--teams', type=int, default=self.TEAM_COUNT, help='Number of teams to create.')
+        parser.add_argument('--tasks-per-team', type=int, default=self.TASKS_PER_TEAM, help='Number of tasks per team.')
+        parser.add_argument('--notifications', type=int, default=self.NOTIFICATION_COUNT, help='Number of invitations, each with a notification.')
+        parser.add_argument('--members-per-team', type=int, default=self.MEMBERS_PER_TEAM, help='Number of members per team.')
+        parser.add_argument('--batch-size', type=int, default=self.BATCH_SIZE, help='Number of rows written per transaction.')
+        parser.add_argument('--random-seed', type=int, default=None, help='Seed for reproducible data sets.')
+
     def handle(self, *args, **options):
-        self.create_users()
-        self.users = User.objects.all()
- 
-    def create_users(self):
+        self.batch_size = options['batch_size']
+        if options['random_seed'] is not None:
+            self.random.seed(options['random_seed'])
+            self.faker.seed_instance(options['random_seed'])
+        # Every seeded user shares one password, so it is hashed only once.
+        self.password = make_password(Command.DEFAULT_PASSWORD)
+        self.create_users(options['users'])
+        self.user_ids = list(User.objects.values_list('pk', flat=True))
+        self.create_teams(options['teams'], options['members_per_team'])
+        self.create_tasks(options['tasks_per_team'])
+        self.create_invitations(options['notifications'])
+
+    def create_users(self, user_count):
         self.generate_user_fixtures()
-        self.generate_random_users()
- 
+        self.generate_random_users(user_count)
+
     def generate_user_fixtures(self):
-        for data in user_fixtures:
-            self.try_create_user(data)
- 
-    def generate_random_users(self):
-        user_count = User.objects.count()
-        while user_count < self.USER_COUNT:
-            print(f"Seeding user {user_count}/{self.USER_COUNT}", end='\r')
-            self.generate_user()
-            user_count = User.objects.count()
-        print("User seeding complete.")
- 
-    def generate_user(self):
+        existing_usernames = set(User.objects.filter(
+            username__in=[data['username'] for data in user_fixtures]
+        ).values_list('username', flat=True))
+        User.objects.bulk_create([
+            self.build_user(data) for data in user_fixtures if data['username'] not in existing_usernames
+        ])
+
+    def generate_random_users(self, user_count):
+        missing = user_count - User.objects.count()
+        if missing <= 0:
+            return
+        usernames = set(User.objects.values_list('username', flat=True))
+        emails = set(User.objects.values_list('email', flat=True))
+        batch = []
+        for created in range(1, missing + 1):
+            batch.append(self.build_user(self.generate_user_data(usernames, emails)))
+            if len(batch) == self.batch_size:
+                self.write_batch(User, batch)
+                batch = []
+                self.stdout.write(f"Seeding user {created}/{missing}", ending='\r')
+        self.write_batch(User, batch)
+        self.stdout.write("User seeding complete.")
+
+    def generate_user_data(self, usernames, emails):
+        """Return data for a new user whose username and email are not yet taken."""
         first_name = self.faker.first_name()
         last_name = self.faker.last_name()
+        base_username = create_username(first_name, last_name)
+        username = base_username
         email = create_email(first_name, last_name)
-        username = create_username(first_name, last_name)
-        self.try_create_user({'username': username, 'email': email, 'first_name': first_name, 'last_name': last_name})
- 
-    def try_create_user(self, data):
-        try:
-            self.create_user(data)
-        except:
-            pass
- 
-    def create_user(self, data):
-        User.objects.create_user(
+        suffix = 1
+        while username in usernames or email in emails:
+            suffix += 1
+            username = f"{base_username[:30 - len(str(suffix))]}{suffix}"
+            email = create_email(first_name, last_name, suffix)
+        usernames.add(username)
+        emails.add(email)
+        return {'username': username, 'email': email, 'first_name': first_name, 'last_name': last_name}
+
+    def build_user(self, data):
+        return User(
             username=data['username'],
             email=data['email'],
-            password=Command.DEFAULT_PASSWORD,
+            password=self.password,
             first_name=data['first_name'],
             last_name=data['last_name'],
         )
- 
+
+    def create_teams(self, team_count, members_per_team):
+        team_names = set(Team.objects.values_list('name', flat=True))
+        teams = []
+        while len(teams) < team_count:
+            name = f"{self.faker.city()} {self.faker.color_name()}"
+            if name in team_names:
+                name = f"{name} {len(team_names)}"
+            if name not in team_names:
+                team_names.add(name)
+                teams.append(Team(name=name))
+        self.teams = []
+        for start in range(0, len(teams), self.batch_size):
+            self.teams += self.write_batch(Team, teams[start:start + self.batch_size])
+        self.team_members = {}
+        Membership = Team.members.through
+        memberships = []
+        for team in self.teams:
+            members = self.random.sample(self.user_ids, min(members_per_team, len(self.user_ids)))
+            self.team_members[team.pk] = members
+            memberships += [Membership(team_id=team.pk, user_id=user_id) for user_id in members]
+            if len(memberships) >= self.batch_size:
+                self.write_memberships(memberships)
+                memberships = []
+        self.write_memberships(memberships)
+        self.stdout.write(f"Seeded {len(self.teams)} teams.")
+
+    def write_memberships(self, memberships):
+        """Write a batch of memberships, and count them in their teams' statistics."""
+        with transaction.atomic():
+            Team.members.through.objects.bulk_create(memberships)
+            team_ids = {membership.team_id for membership in memberships}
+            refresh_team_stats(team_ids, fields=('member_count',))
+            invalidate_team_cards(team_ids)
+
+    def create_tasks(self, tasks_per_team):
+        descriptions = [self.faker.sentence(nb_words=6) for _ in range(200)]
+        today = date.today()
+        total = len(self.teams) * tasks_per_team
+        created = 0
+        batch = []
+        for team in self.teams:
+            for _ in range(tasks_per_team):
+                task = Task(
+                    name=f"Task {created + len(batch) + 1}",
+                    description=self.random.choice(descriptions),
+                    due_date=today + timedelta(days=self.random.randint(-30, 90)),
+                    team_id=team.pk,
+                )
+                batch.append(task)
+                if len(batch) == self.batch_size:
+                    created += self.write_tasks(batch)
+                    batch = []
+                    self.stdout.write(f"Seeding task {created}/{total}", ending='\r')
+        created += self.write_tasks(batch)
+        self.stdout.write(f"Seeded {created} tasks.")
+
+    def write_tasks(self, tasks):
+        """Write a batch of tasks with one or two assignees from each task's team."""
+        Assignment = Task.assigned_to.through
+        with transaction.atomic():
+            tasks = Task.objects.bulk_create(tasks)
+            assignments = []
+            for task in tasks:
+                members = self.team_members[task.team_id]
+                if members:
+                    assignees = self.random.sample(members, min(len(members), self.random.randint(1, 2)))
+                    assignments += [Assignment(task_id=task.pk, user_id=user_id) for user_id in assignees]
+            Assignment.objects.bulk_create(assignments)
+            team_ids = {task.team_id for task in tasks}
+            refresh_team_stats(team_ids, fields=('task_count', 'next_due_date'))
+            invalidate_team_cards(team_ids)
+        return len(tasks)
+
+    def create_invitations(self, invitation_count):
+        teams = [team for team in self.teams if self.team_members[team.pk]]
+        if not teams:
+            return
+        pending = set(Invitation.objects.filter(status=Invitation.PENDING).values_list('receiver_id', 'team_id'))
+        invitations = []
+        # Give up on pairs after enough misses, in case most users already belong to every team.
+        attempts = 0
+        while len(invitations) < invitation_count and attempts < invitation_count * 10:
+            attempts += 1
+            team = self.random.choice(teams)
+            receiver_id = self.random.choice(self.user_ids)
+            if receiver_id in self.team_members[team.pk] or (receiver_id, team.pk) in pending:
+                continue
+            pending.add((receiver_id, team.pk))
+            sender_id = self.random.choice(self.team_members[team.pk])
+            invitations.append(Invitation(sender_id=sender_id, receiver_id=receiver_id, team_id=team.pk))
+        for start in range(0, len(invitations), self.batch_size):
+            with transaction.atomic():
+                batch = Invitation.objects.bulk_create(invitations[start:start + self.batch_size])
+                Notification.objects.bulk_create([
+                    Notification(user_id=invitation.receiver_id, message="Click here to join ", invitation=invitation)
+                    for invitation in batch
+                ])
+                refresh_unread_notification_counts({invitation.receiver_id for invitation in batch})
+        self.stdout.write(f"Seeded {len(invitations)} invitations and notifications.")
+
+    def write_batch(self, model, objects):
+        with transaction.atomic():
+            return model.objects.bulk_create(objects)
+
 def create_username(first_name, last_name):
-    return '@' + first_name.lower() + last_name.lower()
- 
-def create_email(first_name, last_name):
-    return f"{first_name.lower()}.{last_name.lower()}@example.org"
+    return '@' + (normalise_name(first_name) + normalise_name(last_name))[:29]
 
+def create_email(first_name, last_name, suffix=''):
+    return f"{normalise_name(first_name)}.{normalise_name(last_name)}{suffix}@example.org"
 
+def normalise_name(name):
+    return re.sub(r'\W', '', name.lower())
@@ -1,12 +1,87 @@
 from django.core.management.base import BaseCommand, CommandError
-from tasks.models import User
+from django.db import connection, models, transaction
+from tasks.fragment_cache import DASHBOARD_BLOCKS, invalidate_dashboard_fragments
+from tasks.models import User, refresh_team_stats, refresh_unread_notification_counts
 
 class Command(BaseCommand):
     """Build automation command to unseed the database."""
-    
-    help = 'Seeds the database with sample data'
+
+    BATCH_SIZE = 500
+    help = 'Removes all non-staff users and the data that depends on them'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batched', action='store_true',
+            help='Delete in dependency order with fixed-size raw deletes. '
+                 'Each batch commits on its own, so an interrupted run can simply be restarted.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=self.BATCH_SIZE,
+            help='Rows removed per batch (at most 999, the SQLite parameter limit).'
+        )
 
     def handle(self, *args, **options):
         """Unseed the database."""
 
-        User.objects.filter(is_staff=False).delete()
\ No newline at end of file
+        users = User.objects.filter(is_staff=False)
+        if not options['batched']:
+            users.delete()
+            return
+        batch_size = options['batch_size']
+        if not 0 < batch_size <= 999:
+            raise CommandError('--batch-size must be between 1 and 999.')
+        for model, queryset in deletion_plan(User, users):
+            self.delete_in_batches(model, queryset, batch_size)
+        # The raw deletes send no signals, so the teams' member counts and the remaining users'
+        # unread notification counts are recounted. Recounting everyone also repairs the counts
+        # after a run that was interrupted and restarted.
+        refresh_team_stats(fields=('member_count',))
+        remaining = list(User.objects.values_list('pk', flat=True))
+        refresh_unread_notification_counts(remaining)
+        invalidate_dashboard_fragments(remaining, *DASHBOARD_BLOCKS)
+
+    def delete_in_batches(self, model, queryset, batch_size):
+        """Delete the rows of a queryset in batches, without loading them as objects."""
+
+        label = model._meta.label
+        remaining = queryset.count()
+        if not remaining:
+            return
+        table = connection.ops.quote_name(model._meta.db_table)
+        pk_column = connection.ops.quote_name(model._meta.pk.column)
+        deleted = 0
+        while True:
+            with transaction.atomic():
+                pks = list(queryset.order_by().values_list('pk', flat=True)[:batch_size])
+                if not pks:
+                    break
+                placeholders = ', '.join(['%s'] * len(pks))
+                with connection.cursor() as cursor:
+                    cursor.execute(f'DELETE FROM {table} WHERE {pk_column} IN ({placeholders})', pks)
+            deleted += len(pks)
+            self.stdout.write(f"Deleting {label}: {deleted}/{remaining}", ending='\r')
+        self.stdout.write(f"Deleted {deleted} {label} rows.")
+
+def deletion_plan(model, queryset):
+    """Return (model, queryset) pairs that delete a queryset and its dependents, dependents first."""
+
+    plan = []
+    for field in model._meta.many_to_many:
+        through = field.remote_field.through
+        plan.append((through, through._base_manager.filter(**{f'{field.m2m_field_name()}__in': queryset})))
+    for relation in model._meta.related_objects:
+        if relation.many_to_many:
+            through = relation.through
+            field_name = relation.field.m2m_reverse_field_name()
+            plan.append((through, through._base_manager.filter(**{f'{field_name}__in': queryset})))
+        elif relation.on_delete is models.CASCADE:
+            related_model = relation.related_model
+            related = related_model._base_manager.filter(**{f'{relation.field.name}__in': queryset})
+            plan += deletion_plan(related_model, related)
+        elif relation.on_delete is not models.DO_NOTHING:
+            raise CommandError(
+                f"Batched unseed cannot handle {relation.related_model._meta.label}.{relation.field.name}, "
+                f"which does not cascade."
+            )
+    plan.append((model, queryset))
+    return plan
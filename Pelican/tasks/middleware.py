@@ -0,0 +1,81 @@
+import logging
+import time
+from contextlib import ExitStack
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from tasks import routers
+from tasks.request_metrics import finish_request, install_template_timing, over_budget, record, start_request
+
+logger = logging.getLogger('tasks.request_metrics')
+
+
+class RequestMetricsMiddleware:
+    """Measure the queries, SQL time, template time and wall time of every request.
+
+    Enabled by the REQUEST_METRICS_ENABLED setting. The numbers are sent in a
+    Server-Timing header, kept per URL name for the request metrics endpoint,
+    and logged as a warning when they exceed the view's budget in
+    REQUEST_METRICS_BUDGETS.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        install_template_timing()
+
+    def __call__(self, request):
+        metrics, token = start_request()
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics.record_query))
+                response = self.get_response(request)
+        finally:
+            metrics.total_seconds = time.perf_counter() - start
+            finish_request(token)
+        response['Server-Timing'] = metrics.server_timing()
+        match = request.resolver_match
+        if match is not None and match.url_name:
+            record(match.url_name, metrics)
+            for metric, value, budget in over_budget(match.url_name, metrics):
+                logger.warning(
+                    '%s exceeded its %s budget: %s > %s (%s)',
+                    match.url_name, metric, round(value, 1), budget, request.path,
+                )
+        return response
+
+
+class ReadReplicaMiddleware:
+    """Route the reads of the views in READ_REPLICA_VIEWS to the read replica.
+
+    Enabled by the READ_REPLICA_ENABLED setting. Only GET and HEAD requests
+    read from the replica, and only for users who have not written within
+    READ_YOUR_WRITES_WINDOW seconds; requests that write record the time in
+    the session. Must come after SessionMiddleware.
+    """
+
+    def __init__(self, get_response):
+        if not settings.READ_REPLICA_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state, token = routers.start_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            routers.finish_request(token)
+        if state.wrote:
+            request.session[routers.LAST_WRITE_SESSION_KEY] = time.time()
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = routers.current_state()
+        state.use_replica = (
+            request.method in ('GET', 'HEAD')
+            and request.resolver_match.url_name in settings.READ_REPLICA_VIEWS
+            and not routers.recently_wrote(request.session)
+        )
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.6 on 2026-10-17 18:01
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def delete_duplicate_pending_invitations(apps, schema_editor):
+    """Keep only the oldest pending invitation per receiver and team."""
+    Invitation = apps.get_model('tasks', 'Invitation')
+    pending = Invitation.objects.filter(accepted=False)
+    keep_ids = pending.values('receiver', 'team').annotate(keep_id=Min('id')).values('keep_id')
+    pending.exclude(id__in=keep_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_invitation_alter_team_members_task_notification_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='invitation',
+            index=models.Index(fields=['receiver', 'team', 'accepted'], name='invitation_receiver_team_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'created_at'], name='notification_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['team', 'due_date'], name='task_team_due_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['last_name', 'first_name'], name='user_name_idx'),
+        ),
+        migrations.RunPython(delete_duplicate_pending_invitations, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='invitation',
+            constraint=models.UniqueConstraint(condition=models.Q(('accepted', False)), fields=('receiver', 'team'), name='unique_pending_invitation'),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 4.2.6 on 2026-10-17 18:20
+
+from django.db import migrations
+
+USER_SEARCH_TABLE = 'tasks_user_fts'
+
+# Copied rather than imported from tasks.search, so this migration keeps working as the app changes.
+# The index mirrors tasks_user as an external content table, and triggers keep it in step.
+USER_SEARCH_INDEX_SQL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {USER_SEARCH_TABLE} USING fts5(
+        username, first_name, last_name,
+        content='tasks_user', content_rowid='id', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {USER_SEARCH_TABLE}_insert AFTER INSERT ON tasks_user BEGIN
+        INSERT INTO {USER_SEARCH_TABLE}(rowid, username, first_name, last_name)
+        VALUES (new.id, new.username, new.first_name, new.last_name);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {USER_SEARCH_TABLE}_delete AFTER DELETE ON tasks_user BEGIN
+        INSERT INTO {USER_SEARCH_TABLE}({USER_SEARCH_TABLE}, rowid, username, first_name, last_name)
+        VALUES ('delete', old.id, old.username, old.first_name, old.last_name);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {USER_SEARCH_TABLE}_update
+    AFTER UPDATE OF username, first_name, last_name ON tasks_user BEGIN
+        INSERT INTO {USER_SEARCH_TABLE}({USER_SEARCH_TABLE}, rowid, username, first_name, last_name)
+        VALUES ('delete', old.id, old.username, old.first_name, old.last_name);
+        INSERT INTO {USER_SEARCH_TABLE}(rowid, username, first_name, last_name)
+        VALUES (new.id, new.username, new.first_name, new.last_name);
+    END""",
+    f"INSERT INTO {USER_SEARCH_TABLE}({USER_SEARCH_TABLE}) VALUES ('rebuild')",
+]
+
+DROP_USER_SEARCH_INDEX_SQL = [
+    f"DROP TRIGGER IF EXISTS {USER_SEARCH_TABLE}_insert",
+    f"DROP TRIGGER IF EXISTS {USER_SEARCH_TABLE}_delete",
+    f"DROP TRIGGER IF EXISTS {USER_SEARCH_TABLE}_update",
+    f"DROP TABLE IF EXISTS {USER_SEARCH_TABLE}",
+]
+
+
+def fts5_available(schema_editor):
+    """Return whether the database is SQLite built with FTS5; other databases search without an index."""
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def install_index(apps, schema_editor):
+    if not fts5_available(schema_editor):
+        return
+    for statement in USER_SEARCH_INDEX_SQL:
+        schema_editor.execute(statement)
+
+
+def uninstall_index(apps, schema_editor):
+    if not fts5_available(schema_editor):
+        return
+    for statement in DROP_USER_SEARCH_INDEX_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_index, uninstall_index),
+    ]
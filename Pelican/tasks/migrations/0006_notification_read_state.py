@@ -0,0 +1,84 @@
+# Generated by Django 4.2.6 on 2026-10-17 18:16
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+USER_SEARCH_TABLE = 'tasks_user_fts'
+
+# Copied rather than imported from tasks.search, so this migration keeps working as the app changes.
+# The index mirrors tasks_user as an external content table, and triggers keep it in step.
+USER_SEARCH_INDEX_SQL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {USER_SEARCH_TABLE} USING fts5(
+        username, first_name, last_name,
+        content='tasks_user', content_rowid='id', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {USER_SEARCH_TABLE}_insert AFTER INSERT ON tasks_user BEGIN
+        INSERT INTO {USER_SEARCH_TABLE}(rowid, username, first_name, last_name)
+        VALUES (new.id, new.username, new.first_name, new.last_name);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {USER_SEARCH_TABLE}_delete AFTER DELETE ON tasks_user BEGIN
+        INSERT INTO {USER_SEARCH_TABLE}({USER_SEARCH_TABLE}, rowid, username, first_name, last_name)
+        VALUES ('delete', old.id, old.username, old.first_name, old.last_name);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {USER_SEARCH_TABLE}_update
+    AFTER UPDATE OF username, first_name, last_name ON tasks_user BEGIN
+        INSERT INTO {USER_SEARCH_TABLE}({USER_SEARCH_TABLE}, rowid, username, first_name, last_name)
+        VALUES ('delete', old.id, old.username, old.first_name, old.last_name);
+        INSERT INTO {USER_SEARCH_TABLE}(rowid, username, first_name, last_name)
+        VALUES (new.id, new.username, new.first_name, new.last_name);
+    END""",
+    f"INSERT INTO {USER_SEARCH_TABLE}({USER_SEARCH_TABLE}) VALUES ('rebuild')",
+]
+
+
+def fts5_available(schema_editor):
+    """Return whether the database is SQLite built with FTS5; other databases search without an index."""
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def reinstall_user_search_index(apps, schema_editor):
+    if not fts5_available(schema_editor):
+        return
+    for statement in USER_SEARCH_INDEX_SQL:
+        schema_editor.execute(statement)
+
+
+def count_unread_notifications(apps, schema_editor):
+    """Start every user's unread counter at their number of notifications, all of which are unread."""
+    User = apps.get_model('tasks', 'User')
+    Notification = apps.get_model('tasks', 'Notification')
+    unread = (
+        Notification.objects.filter(user=models.OuterRef('pk'), read_at__isnull=True)
+        .order_by().values('user').annotate(count=models.Count('pk')).values('count')
+    )
+    User.objects.update(unread_notification_count=Coalesce(models.Subquery(unread), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_user_search_index'),
+    ]
+
+    operations = [
+        # Adding a column with a default rebuilds tasks_user on SQLite, which drops the
+        # search index triggers; they are reinstalled afterwards in both directions.
+        migrations.RunPython(migrations.RunPython.noop, reinstall_user_search_index),
+        migrations.AddField(
+            model_name='notification',
+            name='read_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='unread_notification_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(reinstall_user_search_index, migrations.RunPython.noop),
+        migrations.RunPython(count_unread_notifications, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.6 on 2026-10-17 19:02
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """Covering indexes for looking up a user's assigned tasks and teams.
+
+    The through tables of the assigned_to and members fields are created by
+    Django, so their indexes cannot be declared in a model's Meta. Django's
+    own index on user_id alone makes every lookup read the table as well.
+    """
+
+    dependencies = [
+        ('tasks', '0007_notification_outbox'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX "task_assignee_user_task_idx" ON "tasks_task_assigned_to" ("user_id", "task_id");',
+            'DROP INDEX "task_assignee_user_task_idx";',
+        ),
+        migrations.RunSQL(
+            'CREATE INDEX "team_member_user_team_idx" ON "tasks_team_members" ("user_id", "team_id");',
+            'DROP INDEX "team_member_user_team_idx";',
+        ),
+    ]
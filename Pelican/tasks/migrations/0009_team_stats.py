@@ -0,0 +1,46 @@
+# Generated by Django 4.2.6 on 2026-10-17 18:46
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def count_team_stats(apps, schema_editor):
+    """Fill in every team's statistics from its current members and tasks."""
+    Team = apps.get_model('tasks', 'Team')
+    Task = apps.get_model('tasks', 'Task')
+    members = (
+        Team.members.through.objects.filter(team=models.OuterRef('pk'))
+        .order_by().values('team').annotate(count=models.Count('pk')).values('count')
+    )
+    tasks = Task.objects.filter(team=models.OuterRef('pk')).order_by().values('team')
+    Team.objects.update(
+        member_count=Coalesce(models.Subquery(members), 0),
+        task_count=Coalesce(models.Subquery(tasks.annotate(count=models.Count('pk')).values('count')), 0),
+        next_due_date=models.Subquery(tasks.annotate(first=models.Min('due_date')).values('first')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0008_agenda_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='team',
+            name='member_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='next_due_date',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='task_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_team_stats, migrations.RunPython.noop),
+    ]
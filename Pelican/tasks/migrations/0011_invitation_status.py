@@ -0,0 +1,52 @@
+# Generated by Django 4.2.6 on 2026-10-17 19:13
+
+from django.db import migrations, models
+
+
+def status_from_accepted(apps, schema_editor):
+    """Mark accepted invitations as such; declined ones cannot be told from pending ones, which they stay."""
+    Invitation = apps.get_model('tasks', 'Invitation')
+    Invitation.objects.filter(accepted=True).update(status='accepted')
+
+
+def accepted_from_status(apps, schema_editor):
+    Invitation = apps.get_model('tasks', 'Invitation')
+    Invitation.objects.filter(status='accepted').update(accepted=True)
+    # Only one invitation per receiver and team may be unaccepted again, so the declined ones go
+    Invitation.objects.filter(status='declined').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0010_task_completion_and_archive'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='invitation',
+            name='unique_pending_invitation',
+        ),
+        migrations.AddField(
+            model_name='invitation',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('accepted', 'Accepted'), ('declined', 'Declined')], default='pending', max_length=8),
+        ),
+        migrations.RunPython(status_from_accepted, accepted_from_status),
+        migrations.RemoveIndex(
+            model_name='invitation',
+            name='invitation_receiver_team_idx',
+        ),
+        migrations.RemoveField(
+            model_name='invitation',
+            name='accepted',
+        ),
+        migrations.AddIndex(
+            model_name='invitation',
+            index=models.Index(fields=['receiver', 'team', 'status'], name='invitation_receiver_team_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='invitation',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'pending')), fields=('receiver', 'team'), name='unique_pending_invitation'),
+        ),
+    ]
@@ -1,8 +1,29 @@
+from functools import lru_cache
 from django.core.validators import RegexValidator
+from django.contrib.auth.hashers import check_password, get_hasher
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import connection, models, transaction
+from django.db.models.functions import Coalesce
 from libgravatar import Gravatar
 from django.conf import settings
+from django.urls import reverse
+from django.utils import timezone
+from task_manager.password_hashers import FastPasswordHasher
+from tasks.fragment_cache import invalidate_dashboard_fragments
+from tasks.pagination import KeysetPaginator
+from tasks.pubsub import publish_notifications
+
+GRAVATAR_CACHE_SIZE = 4096
+
+@lru_cache(maxsize=GRAVATAR_CACHE_SIZE)
+def _gravatar_for_email(email):
+    """Return a Gravatar for an email, so its hash is computed once per email."""
+    return Gravatar(email)
+
+@lru_cache(maxsize=GRAVATAR_CACHE_SIZE)
+def _gravatar_url(email, size):
+    """Return the URL of an email's gravatar at the given size."""
+    return _gravatar_for_email(email).get_image(size=size, default='mp')
 
 class User(AbstractUser):
     """Model used for user authentication, and team member related information."""
@@ -18,20 +39,34 @@ class User(AbstractUser):
     first_name = models.CharField(max_length=50, blank=False)
     last_name = models.CharField(max_length=50, blank=False)
     email = models.EmailField(unique=True, blank=False)
+    # Denormalized count of notifications with no read_at, kept up to date by tasks.signals
+    unread_notification_count = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         """Model options."""
         ordering = ['last_name', 'first_name']
+        indexes = [
+            models.Index(fields=['last_name', 'first_name'], name='user_name_idx'),
+        ]
 
     def full_name(self):
         """Return a string containing the user's full name."""
         return f'{self.first_name} {self.last_name}'
 
+    def check_password(self, raw_password):
+        """Return whether raw_password is the user's password.
+
+        Django rehashes a correct password with the preferred hasher. Under the
+        fast profile that hasher is weaker than any other, so the stored hash
+        is left as it is.
+        """
+        if isinstance(get_hasher(), FastPasswordHasher):
+            return check_password(raw_password, self.password)
+        return super().check_password(raw_password)
+
     def gravatar(self, size=120):
         """Return a URL to the user's gravatar."""
-        gravatar_object = Gravatar(self.email)
-        gravatar_url = gravatar_object.get_image(size=size, default='mp')
-        return gravatar_url
+        return _gravatar_url(self.email, size)
 
     def mini_gravatar(self):
         """Return a URL to a miniature version of the user's gravatar."""
@@ -40,40 +75,385 @@ class User(AbstractUser):
 class Team(models.Model):
     name = models.CharField(max_length=100, unique=True)
     members = models.ManyToManyField(User, related_name='teams', null=True)
+    # Denormalized statistics for the dashboard's team cards, kept up to date by tasks.signals
+    member_count = models.PositiveIntegerField(default=0, editable=False)
+    # Open tasks only, as completed tasks are no longer due
+    task_count = models.PositiveIntegerField(default=0, editable=False)
+    next_due_date = models.DateField(null=True, blank=True, editable=False)
 
     def __str__(self):
         return self.name
 
+class TaskQuerySet(models.QuerySet):
+    """Query set for tasks."""
+
+    def open(self):
+        """Return the tasks that have not been completed."""
+        return self.filter(completed_at__isnull=True)
+
+    def completed(self):
+        """Return the tasks that have been completed."""
+        return self.filter(completed_at__isnull=False)
+
+class TaskManager(models.Manager.from_queryset(TaskQuerySet)):
+    """Manager for tasks."""
+
+    def bulk_create_assigned(self, tasks, assignee_ids):
+        """Create tasks with their assignees in one transaction, and return the tasks.
+
+        `assignee_ids` holds the ids of the users assigned to each task, in
+        the same order as `tasks`. The tasks and the assigned_to rows are
+        each written with one bulk insert per batch.
+        """
+
+        Assignment = self.model.assigned_to.through
+        with transaction.atomic():
+            tasks = self.bulk_create(tasks)
+            Assignment.objects.bulk_create([
+                Assignment(task_id=task.pk, user_id=user_id)
+                for task, user_ids in zip(tasks, assignee_ids) for user_id in user_ids
+            ])
+            # bulk_create sends no signals, so the teams' statistics are recounted here
+            team_ids = {task.team_id for task in tasks}
+            refresh_team_stats(team_ids, fields=('task_count', 'next_due_date'))
+            invalidate_team_cards(team_ids)
+        # The assignees' dashboards are refreshed here for the same reason
+        invalidate_dashboard_fragments([user_id for user_ids in assignee_ids for user_id in user_ids], 'tasks')
+        return tasks
+
 class Task(models.Model):
     description = models.CharField(max_length=255)
     due_date = models.DateField()
     team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='tasks')
     assigned_to = models.ManyToManyField(User, related_name='assigned_tasks')
     name = models.CharField(max_length=100, null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    objects = TaskManager()
+
+    class Meta:
+        """Model options."""
+        indexes = [
+            models.Index(fields=['team', 'due_date'], name='task_team_due_date_idx'),
+            # Only completed tasks are indexed, and they are archived, so the index stays small
+            models.Index(
+                fields=['completed_at'],
+                condition=models.Q(completed_at__isnull=False),
+                name='task_completed_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.description
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the team the task was loaded with, so moving it can recount the team it left."""
+        task = super().from_db(db, field_names, values)
+        task._loaded_team_id = task.__dict__.get('team_id')
+        return task
+
+    def complete(self):
+        """Mark the task as completed, unless it already is."""
+        if self.completed_at is None:
+            self.completed_at = timezone.now()
+            self.save(update_fields=['completed_at'])
+
+def _delete_where_in(model, column, values):
+    """Delete a model's rows whose column holds one of the values, with one raw DELETE."""
+    table = connection.ops.quote_name(model._meta.db_table)
+    placeholders = ', '.join(['%s'] * len(values))
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table} WHERE {connection.ops.quote_name(column)} IN ({placeholders})', values)
+
+class ArchivedTaskManager(models.Manager):
+    """Manager for archived tasks."""
+
+    def archive(self, task_ids):
+        """Move the completed tasks with the given ids, and their assignees, out of the task table.
+
+        Archived tasks keep their ids. The tasks and their assignments are
+        deleted with raw DELETEs, without loading them as objects or sending
+        signals; neither the team statistics nor the dashboard include
+        completed tasks, so nothing needs updating. Returns the number of
+        tasks archived.
+        """
+
+        Assignment = Task.assigned_to.through
+        ArchivedAssignment = self.model.assigned_to.through
+        with transaction.atomic():
+            tasks = list(
+                Task.objects.completed().filter(pk__in=task_ids)
+                .values_list('pk', 'team_id', 'name', 'description', 'due_date', 'completed_at')
+            )
+            if not tasks:
+                return 0
+            archived_ids = [task[0] for task in tasks]
+            self.bulk_create([
+                self.model(
+                    id=pk, team_id=team_id, name=name, description=description,
+                    due_date=due_date, completed_at=completed_at,
+                )
+                for pk, team_id, name, description, due_date, completed_at in tasks
+            ])
+            assignments = Assignment.objects.filter(task_id__in=archived_ids)
+            ArchivedAssignment.objects.bulk_create([
+                ArchivedAssignment(archivedtask_id=task_id, user_id=user_id)
+                for task_id, user_id in assignments.values_list('task_id', 'user_id')
+            ])
+            _delete_where_in(Assignment, 'task_id', archived_ids)
+            _delete_where_in(Task, 'id', archived_ids)
+        return len(tasks)
+
+class ArchivedTask(models.Model):
+    """A completed task that has been moved out of the task table by the archive_tasks command."""
+
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='archived_tasks')
+    name = models.CharField(max_length=100, null=True, blank=True)
+    description = models.CharField(max_length=255)
+    due_date = models.DateField()
+    assigned_to = models.ManyToManyField(User, related_name='archived_tasks')
+    completed_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    objects = ArchivedTaskManager()
+
+    class Meta:
+        """Model options."""
+        indexes = [
+            models.Index(fields=['team', 'completed_at'], name='archived_task_team_done_idx'),
+        ]
+
+    def __str__(self):
+        return self.description
+
+TEAM_STATS_FIELDS = ('member_count', 'task_count', 'next_due_date')
+
+def team_stats_expressions():
+    """Return expressions that recount each statistic of the team in the outer query."""
+
+    members = (
+        Team.members.through.objects.filter(team=models.OuterRef('pk'))
+        .order_by().values('team').annotate(count=models.Count('pk')).values('count')
+    )
+    tasks = Task.objects.open().filter(team=models.OuterRef('pk')).order_by().values('team')
+    return {
+        'member_count': Coalesce(models.Subquery(members), 0),
+        'task_count': Coalesce(models.Subquery(tasks.annotate(count=models.Count('pk')).values('count')), 0),
+        'next_due_date': models.Subquery(tasks.annotate(first=models.Min('due_date')).values('first')),
+    }
+
+def invalidate_team_cards(team_ids):
+    """Refresh the teams block of every member of the given teams, as their cards show the teams' statistics."""
+
+    member_ids = Team.members.through.objects.filter(team_id__in=team_ids).values_list('user_id', flat=True)
+    invalidate_dashboard_fragments(list(member_ids), 'teams')
+
+def refresh_team_stats(team_ids=None, fields=TEAM_STATS_FIELDS):
+    """Recount the given statistics of the given teams, or of every team, in one UPDATE."""
+
+    teams = Team.objects.all() if team_ids is None else Team.objects.filter(pk__in=team_ids)
+    expressions = team_stats_expressions()
+    return teams.update(**{field: expressions[field] for field in fields})
+
+class InvitationManager(models.Manager):
+    """Manager for team invitations."""
+
+    def invite(self, sender, team, receiver_ids):
+        """Invite users to a team in bulk, and queue their notifications in the same transaction.
+
+        Users that already have a pending invitation to the team are skipped.
+        Returns the new invitations.
+        """
+
+        pending_invitations = self.filter(receiver=models.OuterRef('pk'), team=team, status=Invitation.PENDING)
+        with transaction.atomic():
+            new_receiver_ids = list(
+                User.objects.filter(pk__in=receiver_ids)
+                .exclude(models.Exists(pending_invitations))
+                .values_list('pk', flat=True)
+            )
+            invitations = self.bulk_create([
+                self.model(sender=sender, receiver_id=receiver_id, team=team)
+                for receiver_id in new_receiver_ids
+            ])
+            # The notifications are written by the notification worker, so the
+            # request only pays for one outbox row however many users are invited
+            if invitations:
+                OutboxMessage.objects.enqueue(
+                    OutboxMessage.INVITATION_NOTIFICATIONS,
+                    {'invitation_ids': [invitation.pk for invitation in invitations]},
+                )
+        return invitations
+
+    def notify(self, invitation_ids):
+        """Create the notifications of the given invitations, skipping any that already have one.
+
+        Returns the new notifications.
+        """
+
+        has_notification = Notification.objects.filter(invitation=models.OuterRef('pk'))
+        with transaction.atomic():
+            invitations = list(
+                self.filter(pk__in=invitation_ids).exclude(models.Exists(has_notification))
+                .values_list('pk', 'receiver_id')
+            )
+            notifications = Notification.objects.bulk_create([
+                Notification(user_id=receiver_id, message="Click here to join ", invitation_id=invitation_id)
+                for invitation_id, receiver_id in invitations
+            ])
+            receiver_ids = [receiver_id for _, receiver_id in invitations]
+            # bulk_create sends no post_save signals, so the unread counters are bumped here
+            User.objects.filter(pk__in=receiver_ids).update(
+                unread_notification_count=models.F('unread_notification_count') + 1
+            )
+        invalidate_dashboard_fragments(receiver_ids, 'notifications')
+        transaction.on_commit(lambda: publish_notifications(notifications))
+        return notifications
+
 class Invitation(models.Model):
+    PENDING = 'pending'
+    ACCEPTED = 'accepted'
+    DECLINED = 'declined'
+    STATUSES = [(PENDING, 'Pending'), (ACCEPTED, 'Accepted'), (DECLINED, 'Declined')]
+
     sender = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='sent_invitations')
     receiver = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='received_invitations')
     team = models.ForeignKey(Team, on_delete=models.CASCADE)
-    accepted = models.BooleanField(default=False)
+    # Only pending invitations block new ones, so declined users can be invited again
+    status = models.CharField(max_length=8, choices=STATUSES, default=PENDING)
+
+    objects = InvitationManager()
+
+    class Meta:
+        """Model options."""
+        indexes = [
+            models.Index(fields=['receiver', 'team', 'status'], name='invitation_receiver_team_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['receiver', 'team'],
+                condition=models.Q(status='pending'),
+                name='unique_pending_invitation',
+            ),
+        ]
 
     def accept(self):
         self.receiver.teams.add(self.team)
-        self.accepted = True
+        self.status = self.ACCEPTED
         self.save()
 
     def decline(self):
-        self.accepted = False
+        self.status = self.DECLINED
         self.save()
 
+def refresh_unread_notification_counts(user_ids):
+    """Recount the unread notifications of the given users, in one UPDATE."""
+
+    unread = (
+        Notification.objects.filter(user=models.OuterRef('pk'), read_at__isnull=True)
+        .order_by().values('user').annotate(count=models.Count('pk')).values('count')
+    )
+    User.objects.filter(pk__in=user_ids).update(
+        unread_notification_count=Coalesce(models.Subquery(unread), 0)
+    )
+
+class NotificationQuerySet(models.QuerySet):
+    """Query set for notifications."""
+
+    def unread(self):
+        """Return the notifications that have not been read."""
+        return self.filter(read_at__isnull=True)
+
+    def mark_read(self):
+        """Mark the unread notifications in this query set as read.
+
+        The affected users' unread counters are recounted in the same
+        transaction rather than decremented, so concurrent calls cannot
+        drive them below the true count. Returns the number of notifications
+        marked as read.
+        """
+
+        unread = self.unread()
+        with transaction.atomic():
+            user_ids = set(unread.values_list('user_id', flat=True))
+            if not user_ids:
+                return 0
+            marked = unread.update(read_at=timezone.now())
+            refresh_unread_notification_counts(user_ids)
+        invalidate_dashboard_fragments(user_ids, 'notifications')
+        return marked
+
 class Notification(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
     message = models.CharField(max_length=255)
     created_at = models.DateTimeField(auto_now_add=True)
+    read_at = models.DateTimeField(null=True, blank=True)
     invitation = models.ForeignKey(Invitation, on_delete=models.CASCADE, related_name='related_notification', null=True, blank=True)
 
+    objects = NotificationQuerySet.as_manager()
+
+    class Meta:
+        """Model options."""
+        indexes = [
+            models.Index(fields=['user', 'created_at'], name='notification_user_created_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user.username}: {self.message}"
+
+    def event_payload(self):
+        """Return the data sent to the user's notification stream."""
+        payload = {
+            'id': self.pk,
+            'cursor': KeysetPaginator.cursor_for(self.created_at, self.pk),
+            'message': self.message,
+            'created_at': self.created_at.isoformat(),
+            'team': None,
+            'url': None,
+        }
+        if self.invitation_id is not None:
+            payload['team'] = self.invitation.team.name
+            payload['url'] = reverse('confirm_invitation', args=[self.invitation_id])
+        return payload
+
+class OutboxManager(models.Manager):
+    """Manager for outbox messages."""
+
+    def enqueue(self, kind, payload):
+        """Queue a message for the notification worker, as part of the current transaction."""
+        return self.create(kind=kind, payload=payload, available_at=timezone.now())
+
+class OutboxMessage(models.Model):
+    """Work queued by a request for the notification worker to carry out later.
+
+    A worker claims a message by moving its available_at past a lease. If the
+    worker dies, the lease runs out and another worker claims it again.
+    """
+
+    INVITATION_NOTIFICATIONS = 'invitation_notifications'
+
+    kind = models.CharField(max_length=50)
+    payload = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    available_at = models.DateTimeField()
+    attempts = models.PositiveIntegerField(default=0)
+    claimed_by = models.CharField(max_length=100, blank=True)
+    last_error = models.TextField(blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    failed_at = models.DateTimeField(null=True, blank=True)
+
+    objects = OutboxManager()
+
+    class Meta:
+        """Model options."""
+        indexes = [
+            models.Index(
+                fields=['available_at', 'id'],
+                condition=models.Q(processed_at__isnull=True, failed_at__isnull=True),
+                name='outbox_pending_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk}"
@@ -0,0 +1,153 @@
+"""Server-Sent Events stream of a user's new notifications."""
+import asyncio
+import contextlib
+import json
+from datetime import datetime
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+from tasks.db_connections import run_in_database_pool
+from tasks.fragment_cache import block_version
+from tasks.models import Notification
+from tasks.pagination import InvalidCursor, KeysetPaginator
+from tasks.pubsub import notification_broker
+
+# Milliseconds a disconnected browser waits before reconnecting.
+RECONNECT_DELAY = 5000
+
+# Maximum number of notifications read by one database poll.
+POLL_BATCH_SIZE = 100
+
+
+def format_event(payload):
+    """Return a notification payload as a Server-Sent Events message."""
+
+    return f"id: {payload['cursor']}\nevent: notification\ndata: {json.dumps(payload)}\n\n"
+
+
+def _paginator(user_id):
+    notifications = Notification.objects.filter(user_id=user_id).select_related('invitation__team')
+    return KeysetPaginator(notifications, 'created_at', POLL_BATCH_SIZE)
+
+
+def _notifications_after(user_id, high_water):
+    """Return the payloads of the user's notifications created after the high-water mark."""
+
+    page = _paginator(user_id).page(KeysetPaginator.cursor_for(*high_water))
+    return [notification.event_payload() for notification in page]
+
+
+async def _notifications_version(user_id):
+    return await sync_to_async(block_version, thread_sensitive=False)(user_id, 'notifications')
+
+
+def _payload_key(payload):
+    return datetime.fromisoformat(payload['created_at']), payload['id']
+
+
+async def notification_events(
+    user_id, cursor=None, poll_interval=None, max_duration=None, wake_interval=None, broker=notification_broker
+):
+    """Yield Server-Sent Events for the user's notifications created after the cursor.
+
+    Without a cursor only notifications created from now on are streamed.
+    Notifications published in this process arrive through the broker
+    straight away. The database is also polled every `poll_interval`
+    seconds from a (created_at, id) high-water mark. Polling picks up
+    notifications written by other processes and any the broker dropped.
+
+    Notifications created by another process, such as notification_worker,
+    invalidate the user's dashboard notifications block in the shared
+    cache. Its version is checked every `wake_interval` seconds and the
+    database is polled as soon as it changes, rather than at the next poll.
+
+    The stream ends after `max_duration` seconds with the high-water mark
+    as its last event id, so the browser reconnects and resumes from there
+    and no connection is held open indefinitely.
+    """
+
+    poll_interval = poll_interval or settings.NOTIFICATION_STREAM_POLL_INTERVAL
+    max_duration = max_duration or settings.NOTIFICATION_STREAM_MAX_DURATION
+    wake_interval = wake_interval or settings.NOTIFICATION_STREAM_WAKE_INTERVAL
+    high_water = (timezone.now(), 0)
+    if cursor:
+        try:
+            high_water = _paginator(user_id).decode_cursor(cursor)
+        except InvalidCursor:
+            pass
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_duration
+    queue = broker.subscribe(user_id)
+    try:
+        yield f"retry: {RECONNECT_DELAY}\n\n"
+        version = await _notifications_version(user_id)
+        next_poll = loop.time()
+        next_wake_check = loop.time() + wake_interval
+        while loop.time() < deadline:
+            if loop.time() >= next_poll:
+                payloads = await run_in_database_pool(_notifications_after, user_id, high_water)
+                for payload in payloads:
+                    high_water = _payload_key(payload)
+                    yield format_event(payload)
+                # A full batch means there may be more to catch up on straight away.
+                if len(payloads) < POLL_BATCH_SIZE:
+                    next_poll = loop.time() + poll_interval
+                continue
+            if loop.time() >= next_wake_check:
+                next_wake_check = loop.time() + wake_interval
+                latest_version = await _notifications_version(user_id)
+                if latest_version != version:
+                    version = latest_version
+                    next_poll = loop.time()
+                continue
+            timeout = min(next_poll, next_wake_check, deadline) - loop.time()
+            try:
+                payload = await asyncio.wait_for(queue.get(), timeout=timeout)
+            except asyncio.TimeoutError:
+                if loop.time() >= next_poll:
+                    yield ": keep-alive\n\n"
+                continue
+            if _payload_key(payload) > high_water:
+                high_water = _payload_key(payload)
+                yield format_event(payload)
+        # An event with only an id sets the cursor the browser sends back when it reconnects
+        yield f"id: {KeysetPaginator.cursor_for(*high_water)}\n\n"
+    finally:
+        broker.unsubscribe(user_id, queue)
+
+
+def cancel_on_disconnect(application):
+    """Wrap an ASGI application so that a request is cancelled when its client disconnects.
+
+    Django 4.2 stops reading from the connection once it has the request
+    body, so it never notices a client that goes away while a response is
+    streamed, and would keep polling for a closed notification stream. The
+    wrapper goes on reading and cancels the request on http.disconnect.
+    """
+
+    async def wrapper(scope, receive, send):
+        if scope['type'] != 'http':
+            return await application(scope, receive, send)
+        messages = asyncio.Queue()
+
+        async def listen():
+            while (message := await receive())['type'] != 'http.disconnect':
+                await messages.put(message)
+            await messages.put(message)
+
+        listener = asyncio.ensure_future(listen())
+        handler = asyncio.ensure_future(application(scope, messages.get, send))
+        try:
+            await asyncio.wait({listener, handler}, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            listener.cancel()
+            handler.cancel()
+            raise
+        listener.cancel()
+        if handler.done():
+            return handler.result()
+        handler.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await handler
+
+    return wrapper
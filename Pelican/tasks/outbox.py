@@ -0,0 +1,115 @@
+"""Draining the outbox of work queued by requests for the notification worker.
+
+Messages are claimed in batches with a lease, handled one transaction per
+message, and retried with a growing delay if their handler fails. Claiming
+is a conditional UPDATE rather than a row lock, so it works on SQLite and
+two workers can never hold the same message at once.
+"""
+import logging
+import os
+import socket
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from tasks.models import Invitation, OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+
+class LeaseLost(Exception):
+    """Raised when a worker's claim on a message has expired and been taken over."""
+
+
+def deliver_invitation_notifications(payload):
+    Invitation.objects.notify(payload['invitation_ids'])
+
+
+HANDLERS = {
+    OutboxMessage.INVITATION_NOTIFICATIONS: deliver_invitation_notifications,
+}
+
+
+def default_worker_id():
+    """Return an id naming this worker process in the messages it claims."""
+
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def claim_messages(worker_id, batch_size, lease):
+    """Claim up to `batch_size` due messages for `lease` seconds and return them, oldest first."""
+
+    now = timezone.now()
+    due = OutboxMessage.objects.filter(processed_at__isnull=True, failed_at__isnull=True, available_at__lte=now)
+    candidate_ids = list(due.order_by('available_at', 'id').values_list('pk', flat=True)[:batch_size])
+    if not candidate_ids:
+        return []
+    # Re-checking the due condition in the UPDATE means a message another worker
+    # claimed after it was read above is left alone.
+    due.filter(pk__in=candidate_ids).update(
+        claimed_by=worker_id,
+        available_at=now + timedelta(seconds=lease),
+        attempts=F('attempts') + 1,
+    )
+    return list(OutboxMessage.objects.filter(pk__in=candidate_ids, claimed_by=worker_id, processed_at__isnull=True)
+                .order_by('id'))
+
+
+def process_message(message, worker_id):
+    """Handle one claimed message and record the outcome. Returns True if it was handled."""
+
+    try:
+        with transaction.atomic():
+            HANDLERS[message.kind](message.payload)
+            # Marking the message done in the handler's transaction means a worker
+            # whose lease ran out cannot commit work that another worker also does.
+            marked = OutboxMessage.objects.filter(pk=message.pk, claimed_by=worker_id).update(
+                processed_at=timezone.now(), last_error=''
+            )
+            if not marked:
+                raise LeaseLost(f'Lease on outbox message {message.pk} was lost')
+        return True
+    except LeaseLost:
+        logger.warning('Lease on outbox message %s was lost to another worker', message.pk)
+        return False
+    except Exception as error:
+        logger.exception('Outbox message %s failed on attempt %s', message.pk, message.attempts)
+        _record_failure(message, worker_id, error)
+        return False
+
+
+def _record_failure(message, worker_id, error):
+    """Schedule a failed message for a retry, or give up on it after too many attempts."""
+
+    now = timezone.now()
+    changes = {'last_error': f'{type(error).__name__}: {error}', 'claimed_by': ''}
+    if message.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        changes['failed_at'] = now
+    else:
+        changes['available_at'] = now + timedelta(seconds=retry_delay(message.attempts))
+    OutboxMessage.objects.filter(pk=message.pk, claimed_by=worker_id).update(**changes)
+
+
+def retry_delay(attempts):
+    """Return the seconds to wait before retrying a message that has failed `attempts` times."""
+
+    return min(settings.OUTBOX_RETRY_DELAY * 2 ** (attempts - 1), settings.OUTBOX_MAX_RETRY_DELAY)
+
+
+def drain(worker_id=None, batch_size=None, lease=None):
+    """Claim and handle batches until no message is due. Returns the (handled, failed) counts."""
+
+    worker_id = worker_id or default_worker_id()
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    lease = lease or settings.OUTBOX_LEASE
+    handled = failed = 0
+    while True:
+        messages = claim_messages(worker_id, batch_size, lease)
+        if not messages:
+            return handled, failed
+        for message in messages:
+            if process_message(message, worker_id):
+                handled += 1
+            else:
+                failed += 1
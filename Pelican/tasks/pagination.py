@@ -0,0 +1,85 @@
+"""Keyset (cursor) pagination for long task and notification feeds."""
+import base64
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+class KeysetPage:
+    """One page of a keyset paginated feed."""
+
+    def __init__(self, items, next_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __bool__(self):
+        return bool(self.items)
+
+    @property
+    def has_next(self):
+        """Return True if there is a page after this one."""
+        return self.next_cursor is not None
+
+
+class KeysetPaginator:
+    """Paginate a queryset on a (key, id) pair without using OFFSET.
+
+    Each page continues strictly after the last row of the previous page,
+    so fetching page N costs the same as fetching page 1 provided an index
+    covers the filter and the (key, id) ordering.
+    """
+
+    def __init__(self, queryset, key, per_page, descending=False):
+        self.queryset = queryset
+        self.key = key
+        self.per_page = per_page
+        self.descending = descending
+        self.key_field = queryset.model._meta.get_field(key)
+
+    def page(self, cursor=None):
+        """Return the page that follows the given cursor, or the first page."""
+        queryset = self.queryset
+        if cursor:
+            key_value, pk = self.decode_cursor(cursor)
+            lookup = 'lt' if self.descending else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'{self.key}__{lookup}': key_value}) |
+                Q(**{self.key: key_value, f'pk__{lookup}': pk})
+            )
+        prefix = '-' if self.descending else ''
+        queryset = queryset.order_by(f'{prefix}{self.key}', f'{prefix}pk')
+        items = list(queryset[:self.per_page + 1])
+        next_cursor = None
+        if len(items) > self.per_page:
+            items = items[:self.per_page]
+            next_cursor = self.encode_cursor(items[-1])
+        return KeysetPage(items, next_cursor)
+
+    def encode_cursor(self, obj):
+        """Return an opaque cursor pointing just after the given object."""
+        return self.cursor_for(getattr(obj, self.key), obj.pk)
+
+    @staticmethod
+    def cursor_for(key_value, pk):
+        """Return an opaque cursor pointing just after the given (key, id) pair."""
+        raw = f'{key_value.isoformat()}|{pk}'
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """Return the (key, id) pair encoded in a cursor."""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            raw = base64.urlsafe_b64decode(padded.encode()).decode()
+            key_value, pk = raw.rsplit('|', 1)
+            return self.key_field.to_python(key_value), int(pk)
+        except (ValueError, UnicodeDecodeError, ValidationError) as error:
+            raise InvalidCursor(f'Invalid cursor: {cursor!r}') from error
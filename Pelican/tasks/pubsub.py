@@ -0,0 +1,78 @@
+"""In-process publish/subscribe for pushing new notifications to open event streams."""
+import asyncio
+import threading
+
+
+class NotificationBroker:
+    """Deliver notification payloads to the event streams subscribed to a user.
+
+    Subscribers are asyncio queues owned by the event loop serving each
+    stream, so an idle connection costs a queue rather than a thread.
+    Publishing is thread-safe and never blocks: payloads for a full queue
+    are dropped, and the stream's database polling fallback catches up.
+    """
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def subscribe(self, user_id):
+        """Return a new queue receiving the user's notifications, on the running event loop."""
+
+        queue = asyncio.Queue(self.queue_size)
+        subscriber = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscriber)
+        return queue
+
+    def unsubscribe(self, user_id, queue):
+        """Stop delivering the user's notifications to a queue."""
+
+        with self._lock:
+            subscribers = self._subscribers.get(user_id, set())
+            subscribers.difference_update({subscriber for subscriber in subscribers if subscriber[1] is queue})
+            if not subscribers:
+                self._subscribers.pop(user_id, None)
+
+    def publish(self, user_id, payload):
+        """Hand a payload to every queue subscribed to the user, from any thread."""
+
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, payload)
+            except RuntimeError:
+                # The subscriber's event loop has already closed.
+                self.unsubscribe(user_id, queue)
+
+    def has_subscribers(self, user_id):
+        """Return True if the user has at least one open subscription."""
+
+        with self._lock:
+            return bool(self._subscribers.get(user_id))
+
+    def subscriber_count(self):
+        """Return the number of open subscriptions."""
+
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+
+def _offer(queue, payload):
+    try:
+        queue.put_nowait(payload)
+    except asyncio.QueueFull:
+        pass
+
+
+notification_broker = NotificationBroker()
+
+
+def publish_notifications(notifications):
+    """Publish notifications to their users' open event streams."""
+
+    for notification in notifications:
+        if notification_broker.has_subscribers(notification.user_id):
+            notification_broker.publish(notification.user_id, notification.event_payload())
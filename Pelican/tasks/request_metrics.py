@@ -0,0 +1,166 @@
+"""Per-view request metrics: query count, SQL time, template time and wall time.
+
+Measurements for the request being served are collected in a context
+variable, so concurrent requests on other threads never mix. Finished
+requests are kept in a rolling window per URL name, which the staff-only
+metrics endpoint summarises as percentiles and a latency histogram.
+"""
+import threading
+import time
+from collections import defaultdict, deque
+from contextvars import ContextVar
+from django.conf import settings
+from django.template.backends.django import Template as DjangoBackendTemplate
+
+# Upper bounds, in milliseconds, of the wall time histogram buckets.
+HISTOGRAM_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+METRICS = ('queries', 'sql_ms', 'template_ms', 'total_ms')
+
+_current = ContextVar('request_metrics', default=None)
+
+_history_lock = threading.Lock()
+_history = defaultdict(lambda: deque(maxlen=settings.REQUEST_METRICS_HISTORY))
+
+_template_patch_lock = threading.Lock()
+_template_patched = False
+
+
+class RequestMetrics:
+    """The measurements of one request."""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.template_seconds = 0.0
+        self.template_depth = 0
+        self.total_seconds = 0.0
+
+    def record_query(self, execute, sql, params, many, context):
+        """Database execute wrapper that times every query of the request."""
+
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_seconds += time.perf_counter() - start
+            self.queries += 1
+
+    def as_dict(self):
+        """Return the measurements, with times in milliseconds."""
+
+        return {
+            'queries': self.queries,
+            'sql_ms': self.sql_seconds * 1000,
+            'template_ms': self.template_seconds * 1000,
+            'total_ms': self.total_seconds * 1000,
+        }
+
+    def server_timing(self):
+        """Return the measurements as a Server-Timing header value."""
+
+        return ', '.join([
+            f'db;dur={self.sql_seconds * 1000:.1f};desc="{self.queries} queries"',
+            f'tpl;dur={self.template_seconds * 1000:.1f}',
+            f'total;dur={self.total_seconds * 1000:.1f}',
+        ])
+
+
+def start_request():
+    """Start collecting metrics for the current request and return them."""
+
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def finish_request(token):
+    """Stop collecting metrics for the current request."""
+
+    _current.reset(token)
+
+
+def install_template_timing():
+    """Time every template render made through Django's template backend.
+
+    Nested renders, such as render_to_string called from a template tag,
+    are only counted once, by the outermost render.
+    """
+
+    global _template_patched
+    with _template_patch_lock:
+        if _template_patched:
+            return
+        render = DjangoBackendTemplate.render
+
+        def timed_render(self, context=None, request=None):
+            metrics = _current.get()
+            if metrics is None:
+                return render(self, context, request)
+            metrics.template_depth += 1
+            start = time.perf_counter()
+            try:
+                return render(self, context, request)
+            finally:
+                metrics.template_depth -= 1
+                if not metrics.template_depth:
+                    metrics.template_seconds += time.perf_counter() - start
+
+        DjangoBackendTemplate.render = timed_render
+        _template_patched = True
+
+
+def record(view_name, metrics):
+    """Add a finished request's metrics to its view's rolling window."""
+
+    with _history_lock:
+        _history[view_name].append(metrics.as_dict())
+
+
+def over_budget(view_name, metrics):
+    """Return the (metric, value, budget) triples of a request that exceeded its view's budget."""
+
+    budget = settings.REQUEST_METRICS_BUDGETS.get(view_name, {})
+    values = metrics.as_dict()
+    return [(metric, values[metric], limit) for metric, limit in budget.items() if values[metric] > limit]
+
+
+def request_metrics_summary():
+    """Return percentiles and a wall time histogram of each view's recent requests."""
+
+    with _history_lock:
+        history = {view_name: list(samples) for view_name, samples in _history.items()}
+    return {view_name: _summarise(samples) for view_name, samples in sorted(history.items()) if samples}
+
+
+def reset_request_metrics():
+    """Forget every recorded request."""
+
+    with _history_lock:
+        _history.clear()
+
+
+def _summarise(samples):
+    summary = {'count': len(samples)}
+    for metric in METRICS:
+        values = sorted(sample[metric] for sample in samples)
+        summary[metric] = {
+            'mean': sum(values) / len(values),
+            'p50': percentile(values, 50),
+            'p95': percentile(values, 95),
+            'p99': percentile(values, 99),
+            'max': values[-1],
+        }
+    histogram = {f'le_{bound}': 0 for bound in HISTOGRAM_BUCKETS}
+    histogram['inf'] = 0
+    for sample in samples:
+        bucket = next((f'le_{bound}' for bound in HISTOGRAM_BUCKETS if sample['total_ms'] <= bound), 'inf')
+        histogram[bucket] += 1
+    summary['total_ms_histogram'] = histogram
+    return summary
+
+
+def percentile(sorted_values, percent):
+    """Return the nearest-rank percentile of a sorted list."""
+
+    rank = max(1, -(-percent * len(sorted_values) // 100))
+    return sorted_values[int(rank) - 1]
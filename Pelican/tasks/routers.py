@@ -0,0 +1,107 @@
+"""Routing of the tasks app's reads to a read replica.
+
+Reads made while serving a GET or HEAD request for one of the views in
+READ_REPLICA_VIEWS go to the READ_REPLICA_ALIAS database; everything else,
+and every write, goes to the default database. A request that writes reads
+from the default database from then on, and its session remembers the
+write so that the user's next requests also stay on the default database
+for READ_YOUR_WRITES_WINDOW seconds, by which time the replica should have
+caught up. Other users may still see the replica's slightly older data,
+except in cached dashboard fragments, which are rendered inside
+primary_reads() so that they never outlive the replica's lag.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+LAST_WRITE_SESSION_KEY = '_last_write_at'
+
+_current = ContextVar('database_routing', default=None)
+
+
+class RoutingState:
+    """Whether the request being served may read from the replica, and whether it has written."""
+
+    def __init__(self, use_replica):
+        self.use_replica = use_replica
+        self.wrote = False
+
+
+def start_request(use_replica=False):
+    """Start routing the queries of the current request and return its state."""
+
+    state = RoutingState(use_replica)
+    return state, _current.set(state)
+
+
+def finish_request(token):
+    """Stop routing the queries of the current request."""
+
+    _current.reset(token)
+
+
+def current_state():
+    """Return the routing state of the request being served, or None outside requests."""
+
+    return _current.get()
+
+
+@contextmanager
+def primary_reads():
+    """Send the reads of the current request made inside the block to the default database."""
+
+    state = _current.get()
+    if state is None or not state.use_replica:
+        yield
+        return
+    state.use_replica = False
+    try:
+        yield
+    finally:
+        state.use_replica = True
+
+
+def recently_wrote(session, now=None):
+    """Return whether the session's user wrote within the read-your-writes window."""
+
+    last_write_at = session.get(LAST_WRITE_SESSION_KEY)
+    if last_write_at is None:
+        return False
+    return (now or time.time()) - last_write_at < settings.READ_YOUR_WRITES_WINDOW
+
+
+class ReadReplicaRouter:
+    """Send reads of the views in READ_REPLICA_VIEWS to the replica and all writes to the default database."""
+
+    route_app_labels = {'tasks'}
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label not in self.route_app_labels:
+            return None
+        state = _current.get()
+        if state is not None and state.use_replica and not state.wrote:
+            return settings.READ_REPLICA_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label not in self.route_app_labels:
+            return None
+        state = _current.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both databases hold the same rows, so objects read from either may be related
+        databases = {DEFAULT_DB_ALIAS, settings.READ_REPLICA_ALIAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica receives its schema from the default database by replication
+        if db == settings.READ_REPLICA_ALIAS:
+            return False
+        return None
@@ -0,0 +1,68 @@
+"""Full-text user search backed by an SQLite FTS5 index.
+
+The index, an external content table mirroring tasks_user, and the
+triggers that keep it in step with every write are created by migration
+0005. Migrations that rebuild tasks_user drop those triggers and must
+create them again, as 0006 does. Without FTS5, users are searched by
+substring instead.
+"""
+import re
+import sqlite3
+from contextlib import closing
+from functools import lru_cache
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from tasks.models import User
+
+USER_SEARCH_TABLE = 'tasks_user_fts'
+
+# Matches are ranked with bm25, weighting a username hit above a name hit.
+USER_SEARCH_SQL = f"""
+    SELECT tasks_user.* FROM tasks_user
+    JOIN {USER_SEARCH_TABLE} ON {USER_SEARCH_TABLE}.rowid = tasks_user.id
+    WHERE {USER_SEARCH_TABLE} MATCH %s
+    ORDER BY bm25({USER_SEARCH_TABLE}, 10.0, 5.0, 5.0), tasks_user.id
+    LIMIT %s
+"""
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+@lru_cache(maxsize=None)
+def sqlite_has_fts5():
+    """Return whether the SQLite library is built with FTS5, which migrations need to create the index."""
+
+    with closing(sqlite3.connect(':memory:')) as probe:
+        return bool(probe.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')").fetchone()[0])
+
+
+def build_match_query(search_term):
+    """Return an FTS5 query that matches every word of the term as a prefix."""
+
+    return ' '.join(f'"{token}"*' for token in TOKEN_PATTERN.findall(search_term))
+
+
+def search_users(search_term, limit=None):
+    """Return the users best matching the search term, best match first."""
+
+    limit = limit or settings.USER_SEARCH_LIMIT
+    match_query = build_match_query(search_term)
+    if not match_query:
+        return []
+    if connection.vendor != 'sqlite' or not sqlite_has_fts5():
+        return _search_users_without_index(TOKEN_PATTERN.findall(search_term), limit)
+    return list(User.objects.raw(USER_SEARCH_SQL, [match_query, limit]))
+
+
+def _search_users_without_index(tokens, limit):
+    """Return users matching every token as a substring, for databases without FTS5."""
+
+    users = User.objects.all()
+    for token in tokens:
+        users = users.filter(
+            Q(username__icontains=token) |
+            Q(first_name__icontains=token) |
+            Q(last_name__icontains=token)
+        )
+    return list(users[:limit])
@@ -0,0 +1,187 @@
+"""Signal receivers that keep cached dashboard fragments, unread counters, team statistics and notification streams up to date."""
+from django.db import transaction
+from django.db.models import Case, DateField, F, Value, When
+from django.db.models.functions import Coalesce, Greatest, Least
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from tasks.fragment_cache import invalidate_dashboard_fragments
+from tasks.models import (
+    Invitation, Notification, Task, Team, User, invalidate_team_cards, refresh_team_stats, team_stats_expressions
+)
+from tasks.pubsub import publish_notifications
+
+
+def _changed_user_ids(instance, action, pk_set, cleared_user_ids):
+    """Return the ids of the users affected by an m2m_changed signal."""
+
+    if isinstance(instance, User):
+        return [instance.pk]
+    if action == 'post_clear':
+        return cleared_user_ids
+    return pk_set or []
+
+
+@receiver(m2m_changed, sender=Team.members.through)
+def team_members_changed(sender, instance, action, pk_set, **kwargs):
+    """Refresh the teams block of users who joined or left a team."""
+
+    if action == 'pre_clear' and not isinstance(instance, User):
+        instance._cleared_member_ids = list(instance.members.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        user_ids = _changed_user_ids(instance, action, pk_set, getattr(instance, '_cleared_member_ids', []))
+        invalidate_dashboard_fragments(user_ids, 'teams')
+
+
+@receiver(m2m_changed, sender=Team.members.through)
+def team_member_count_changed(sender, instance, action, pk_set, **kwargs):
+    """Count the members who joined a team, recount the teams that members left, and refresh the teams' cards."""
+
+    if action == 'pre_clear' and isinstance(instance, User):
+        instance._cleared_team_ids = list(instance.teams.values_list('pk', flat=True))
+    elif action == 'post_add' and pk_set:
+        # pk_set only holds the rows that were actually added
+        if isinstance(instance, User):
+            team_ids = pk_set
+            Team.objects.filter(pk__in=pk_set).update(member_count=F('member_count') + 1)
+        else:
+            team_ids = [instance.pk]
+            Team.objects.filter(pk=instance.pk).update(member_count=F('member_count') + len(pk_set))
+        invalidate_team_cards(team_ids)
+    elif action in ('post_remove', 'post_clear'):
+        # pk_set of a removal also holds ids that were never members, so the teams are recounted
+        if not isinstance(instance, User):
+            team_ids = [instance.pk]
+        elif action == 'post_remove':
+            team_ids = pk_set
+        else:
+            team_ids = getattr(instance, '_cleared_team_ids', [])
+        refresh_team_stats(team_ids, fields=('member_count',))
+        invalidate_team_cards(team_ids)
+
+
+@receiver(pre_delete, sender=User)
+def member_deleted(sender, instance, **kwargs):
+    """Stop counting a deleted user as a member of their teams.
+
+    Deleting a user removes their memberships without sending m2m_changed.
+    """
+
+    team_ids = list(Team.objects.filter(members=instance).values_list('pk', flat=True))
+    Team.objects.filter(pk__in=team_ids, member_count__gt=0).update(member_count=F('member_count') - 1)
+    invalidate_team_cards(team_ids)
+
+
+@receiver(m2m_changed, sender=Task.assigned_to.through)
+def task_assignees_changed(sender, instance, action, pk_set, **kwargs):
+    """Refresh the tasks block of users who were assigned to or removed from a task."""
+
+    if action == 'pre_clear' and not isinstance(instance, User):
+        instance._cleared_assignee_ids = list(instance.assigned_to.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        user_ids = _changed_user_ids(instance, action, pk_set, getattr(instance, '_cleared_assignee_ids', []))
+        invalidate_dashboard_fragments(user_ids, 'tasks')
+
+
+@receiver(post_save, sender=Task)
+@receiver(pre_delete, sender=Task)
+def task_changed(sender, instance, **kwargs):
+    """Refresh the tasks block of a task's assignees."""
+
+    assignee_ids = Task.assigned_to.through.objects.filter(task=instance).values_list('user_id', flat=True)
+    invalidate_dashboard_fragments(list(assignee_ids), 'tasks')
+
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, created, **kwargs):
+    """Count a new open task in its team's statistics, or recount the team's open tasks after an edit.
+
+    An edit that moved the task to another team recounts the team it left
+    too. Either way the teams' cards are refreshed on their members'
+    dashboards.
+    """
+
+    previous_team_id = getattr(instance, '_loaded_team_id', None)
+    instance._loaded_team_id = instance.team_id
+    if created and instance.completed_at is not None:
+        return
+    team_ids = {instance.team_id, previous_team_id} - {None}
+    if created:
+        due_date = Value(instance.due_date, output_field=DateField())
+        Team.objects.filter(pk=instance.team_id).update(
+            task_count=F('task_count') + 1,
+            next_due_date=Coalesce(Least('next_due_date', due_date), due_date),
+        )
+    else:
+        # The task may have been completed, had its due date changed or moved team
+        expressions = team_stats_expressions()
+        Team.objects.filter(pk__in=team_ids).update(
+            task_count=expressions['task_count'], next_due_date=expressions['next_due_date']
+        )
+    invalidate_team_cards(team_ids)
+
+
+@receiver(post_delete, sender=Task)
+def task_deleted(sender, instance, **kwargs):
+    """Stop counting a deleted open task, recounting its team's next due date only if it was the task due next."""
+
+    if instance.completed_at is not None:
+        return
+    Team.objects.filter(pk=instance.team_id).update(
+        task_count=Greatest(F('task_count') - 1, 0),
+        next_due_date=Case(
+            When(next_due_date=instance.due_date, then=team_stats_expressions()['next_due_date']),
+            default=F('next_due_date'),
+        ),
+    )
+    invalidate_team_cards([instance.team_id])
+
+
+@receiver(post_save, sender=Team)
+def team_changed(sender, instance, created, **kwargs):
+    """Refresh the blocks that show a renamed team's name."""
+
+    if created:
+        return
+    member_ids = list(Team.members.through.objects.filter(team=instance).values_list('user_id', flat=True))
+    invalidate_dashboard_fragments(member_ids, 'teams', 'tasks')
+    receiver_ids = list(Invitation.objects.filter(team=instance).values_list('receiver_id', flat=True))
+    invalidate_dashboard_fragments(receiver_ids, 'notifications')
+
+
+@receiver(post_save, sender=Invitation)
+@receiver(post_delete, sender=Invitation)
+def invitation_changed(sender, instance, **kwargs):
+    """Refresh the notifications block of an invitation's receiver."""
+
+    invalidate_dashboard_fragments([instance.receiver_id], 'notifications')
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def notification_changed(sender, instance, **kwargs):
+    """Refresh the notifications block of a notification's user."""
+
+    invalidate_dashboard_fragments([instance.user_id], 'notifications')
+
+
+@receiver(post_save, sender=Notification)
+def notification_created(sender, instance, created, **kwargs):
+    """Count a new unread notification and push it to the user's open event streams once committed."""
+
+    if not created:
+        return
+    if instance.read_at is None:
+        User.objects.filter(pk=instance.user_id).update(
+            unread_notification_count=F('unread_notification_count') + 1
+        )
+    transaction.on_commit(lambda: publish_notifications([instance]))
+
+
+@receiver(post_delete, sender=Notification)
+def notification_deleted(sender, instance, **kwargs):
+    """Stop counting a deleted unread notification."""
+
+    if instance.read_at is None:
+        User.objects.filter(pk=instance.user_id, unread_notification_count__gt=0).update(
+            unread_notification_count=F('unread_notification_count') - 1
+        )
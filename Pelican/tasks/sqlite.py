@@ -0,0 +1,24 @@
+"""Tuning of SQLite connections with the pragmas in settings.SQLITE_PRAGMAS.
+
+The pragmas are applied to every new connection, since most of them only
+last as long as the connection. They are run on the underlying sqlite3
+connection, so they never show up in query counts or request metrics.
+"""
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+def apply_pragmas(sqlite_connection, pragmas):
+    """Run `PRAGMA name = value` on a sqlite3 connection for each item of `pragmas`."""
+
+    for name, value in pragmas.items():
+        sqlite_connection.execute(f'PRAGMA {name} = {value}')
+
+
+@receiver(connection_created)
+def tune_sqlite_connection(sender, connection, **kwargs):
+    """Apply settings.SQLITE_PRAGMAS to each new SQLite connection."""
+
+    if connection.vendor == 'sqlite':
+        apply_pragmas(connection.connection, settings.SQLITE_PRAGMAS)
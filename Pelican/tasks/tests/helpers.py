@@ -1,3 +1,4 @@
+from django.db import connections
 from django.urls import reverse
 from with_asserts.mixin import AssertHTMLMixin
 
@@ -8,6 +9,15 @@ def reverse_with_next(url_name, next_url):
     return url
 
 
+def sync_replica():
+    """Copy the default test database over the replica, standing in for replication."""
+
+    source, target = connections['default'], connections['replica']
+    source.ensure_connection()
+    target.ensure_connection()
+    source.connection.backup(target.connection)
+
+
 class LogInTester:
     """Class support login in tests."""
  
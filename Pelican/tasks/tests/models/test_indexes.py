@@ -0,0 +1,75 @@
+"""Tests that the hot lookup paths are served by their indexes."""
+from datetime import date
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+from django.utils import timezone
+from tasks.models import ArchivedTask, Invitation, Notification, Task, Team, User
+
+class IndexUsageTestCase(TestCase):
+    """Tests that the hot lookup paths are served by their indexes."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+    ]
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        self.other_user = User.objects.get(username='@janedoe')
+        self.team = Team.objects.create(name='Team Pelican')
+
+    def test_team_tasks_by_due_date_use_index(self):
+        queryset = Task.objects.filter(team=self.team).order_by('due_date', 'id')
+        self._assert_uses_index(queryset, 'task_team_due_date_idx')
+
+    def test_user_notifications_by_created_at_use_index(self):
+        queryset = Notification.objects.filter(user=self.user).order_by('-created_at', '-id')
+        self._assert_uses_index(queryset, 'notification_user_created_idx')
+
+    def test_invitation_lookup_uses_index(self):
+        queryset = Invitation.objects.filter(receiver=self.user, team=self.team, status=Invitation.ACCEPTED)
+        self._assert_uses_index(queryset, 'invitation_receiver_team_idx')
+
+    def test_user_default_ordering_uses_index(self):
+        self._assert_uses_index(User.objects.all(), 'user_name_idx')
+
+    def test_assigned_tasks_in_a_date_range_use_the_assignee_index(self):
+        queryset = Task.objects.filter(assigned_to=self.user, due_date__range=(date(2030, 1, 1), date(2030, 1, 31)))
+        self.assertIn('USING COVERING INDEX task_assignee_user_task_idx', self._query_plan(queryset))
+
+    def test_team_tasks_in_a_date_range_use_the_member_and_due_date_indexes(self):
+        queryset = Task.objects.filter(team__members=self.user, due_date__range=(date(2030, 1, 1), date(2030, 1, 31)))
+        plan = self._query_plan(queryset)
+        self.assertIn('USING COVERING INDEX team_member_user_team_idx', plan)
+        self.assertIn('USING INDEX task_team_due_date_idx (team_id=? AND due_date>? AND due_date<?)', plan)
+
+    def test_completed_tasks_to_archive_use_the_partial_index(self):
+        queryset = Task.objects.completed().filter(completed_at__lt=timezone.now()).order_by('completed_at', 'pk')
+        self.assertIn('task_completed_idx', self._query_plan(queryset))
+
+    def test_team_history_uses_index(self):
+        queryset = ArchivedTask.objects.filter(team=self.team).order_by('-completed_at', '-id')
+        self._assert_uses_index(queryset, 'archived_task_team_done_idx')
+
+    def test_only_one_pending_invitation_per_receiver_and_team(self):
+        Invitation.objects.create(sender=self.other_user, receiver=self.user, team=self.team)
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                Invitation.objects.create(sender=self.other_user, receiver=self.user, team=self.team)
+
+    def test_answered_invitations_do_not_block_new_ones(self):
+        Invitation.objects.create(sender=self.other_user, receiver=self.user, team=self.team, status=Invitation.ACCEPTED)
+        Invitation.objects.create(sender=self.other_user, receiver=self.user, team=self.team, status=Invitation.DECLINED)
+        Invitation.objects.create(sender=self.other_user, receiver=self.user, team=self.team)
+        self.assertEqual(Invitation.objects.filter(receiver=self.user, team=self.team).count(), 3)
+
+    def _query_plan(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return ' '.join(row[-1] for row in cursor.fetchall())
+
+    def _assert_uses_index(self, queryset, index_name):
+        plan = self._query_plan(queryset)
+        self.assertIn(f'USING INDEX {index_name}', plan)
+        self.assertNotIn('USE TEMP B-TREE FOR ORDER BY', plan)
@@ -0,0 +1,92 @@
+"""Unit tests for the Invitation model."""
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from tasks.models import Invitation, Notification, OutboxMessage, Team, User
+
+class InvitationModelTestCase(TestCase):
+    """Unit tests for the Invitation model."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+    ]
+
+    def setUp(self):
+        self.sender = User.objects.get(username='@johndoe')
+        self.receiver = User.objects.get(username='@janedoe')
+        self.team = Team.objects.create(name='Team Pelican')
+
+    def test_invite_queues_one_outbox_message(self):
+        invitations = Invitation.objects.invite(self.sender, self.team, [self.receiver.id])
+        self.assertEqual(len(invitations), 1)
+        invitation = Invitation.objects.get(receiver=self.receiver)
+        self.assertEqual(invitation, invitations[0])
+        self.assertEqual(invitation.sender, self.sender)
+        self.assertEqual(invitation.team, self.team)
+        self.assertFalse(Notification.objects.exists())
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.kind, OutboxMessage.INVITATION_NOTIFICATIONS)
+        self.assertEqual(message.payload, {'invitation_ids': [invitation.pk]})
+
+    def test_notify_creates_linked_notifications(self):
+        invitation, = Invitation.objects.invite(self.sender, self.team, [self.receiver.id])
+        notifications = Invitation.objects.notify([invitation.pk])
+        self.assertEqual(len(notifications), 1)
+        notification = Notification.objects.get(user=self.receiver)
+        self.assertEqual(notification.invitation, invitation)
+        self.assertIsNotNone(notification.created_at)
+
+    def test_notify_skips_invitations_with_a_notification(self):
+        invitation, = Invitation.objects.invite(self.sender, self.team, [self.receiver.id])
+        Invitation.objects.notify([invitation.pk])
+        self.assertEqual(Invitation.objects.notify([invitation.pk]), [])
+        self.assertEqual(Notification.objects.filter(user=self.receiver).count(), 1)
+
+    def test_invite_nobody_queues_nothing(self):
+        Invitation.objects.invite(self.sender, self.team, [])
+        self.assertFalse(OutboxMessage.objects.exists())
+
+    def test_invite_skips_pending_invitations(self):
+        Invitation.objects.invite(self.sender, self.team, [self.receiver.id])
+        invitations = Invitation.objects.invite(self.sender, self.team, [self.receiver.id])
+        self.assertEqual(invitations, [])
+        self.assertEqual(Invitation.objects.filter(receiver=self.receiver).count(), 1)
+
+    def test_invite_after_accepted_invitation(self):
+        Invitation.objects.create(sender=self.sender, receiver=self.receiver, team=self.team, status=Invitation.ACCEPTED)
+        invitations = Invitation.objects.invite(self.sender, self.team, [self.receiver.id])
+        self.assertEqual(len(invitations), 1)
+
+    def test_invite_after_declined_invitation(self):
+        invitation, = Invitation.objects.invite(self.sender, self.team, [self.receiver.id])
+        invitation.decline()
+        self.assertEqual(Invitation.objects.get(pk=invitation.pk).status, Invitation.DECLINED)
+        invitations = Invitation.objects.invite(self.sender, self.team, [self.receiver.id])
+        self.assertEqual(len(invitations), 1)
+        self.assertEqual(invitations[0].status, Invitation.PENDING)
+        self.assertEqual(Invitation.objects.filter(receiver=self.receiver, team=self.team).count(), 2)
+
+    def test_accept_adds_receiver_to_team(self):
+        invitation = Invitation.objects.create(sender=self.sender, receiver=self.receiver, team=self.team)
+        invitation.accept()
+        self.assertEqual(Invitation.objects.get(pk=invitation.pk).status, Invitation.ACCEPTED)
+        self.assertIn(self.receiver, self.team.members.all())
+
+    def test_invite_query_count_does_not_grow_per_invitation(self):
+        receivers = User.objects.bulk_create([
+            User(username=f'@receiver{i}', email=f'receiver{i}@example.org', first_name='Receiver', last_name=f'{i}')
+            for i in range(310)
+        ])
+        small_batch = self._invite_queries(receivers[:10], team_name='Small batch')
+        large_batch = self._invite_queries(receivers[10:], team_name='Large batch')
+        # On SQLite an INSERT takes at most 999 parameters, so bulk_create writes the 300 invitations in two
+        self.assertEqual(len(large_batch), len(small_batch) + 1)
+        self.assertEqual(sum(query['sql'].startswith('INSERT INTO "tasks_invitation"') for query in large_batch), 2)
+
+    def _invite_queries(self, receivers, team_name):
+        team = Team.objects.create(name=team_name)
+        with CaptureQueriesContext(connection) as queries:
+            invitations = Invitation.objects.invite(self.sender, team, [receiver.id for receiver in receivers])
+        self.assertEqual(len(invitations), len(receivers))
+        return queries
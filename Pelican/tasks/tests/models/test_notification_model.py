@@ -0,0 +1,84 @@
+"""Unit tests for the Notification model and the unread notification counter."""
+from django.test import TestCase
+from tasks.models import Invitation, Notification, Team, User, refresh_unread_notification_counts
+from tasks.outbox import drain
+
+class NotificationModelTestCase(TestCase):
+    """Unit tests for the Notification model and the unread notification counter."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+    ]
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        self.other_user = User.objects.get(username='@janedoe')
+        self.team = Team.objects.create(name='Team Pelican')
+
+    def test_new_notification_is_unread(self):
+        notification = Notification.objects.create(user=self.user, message='Hello')
+        self.assertIsNone(notification.read_at)
+        self.assertEqual(self._unread_count(self.user), 1)
+
+    def test_notification_created_as_read_is_not_counted(self):
+        Notification.objects.create(user=self.user, message='Hello', read_at='2024-01-01T00:00Z')
+        self.assertEqual(self._unread_count(self.user), 0)
+
+    def test_deleting_unread_notification_decrements_counter(self):
+        notification = Notification.objects.create(user=self.user, message='Hello')
+        notification.delete()
+        self.assertEqual(self._unread_count(self.user), 0)
+
+    def test_deleting_read_notification_keeps_counter(self):
+        Notification.objects.create(user=self.user, message='Hello')
+        notification = Notification.objects.create(user=self.user, message='Hello again')
+        Notification.objects.filter(pk=notification.pk).mark_read()
+        Notification.objects.get(pk=notification.pk).delete()
+        self.assertEqual(self._unread_count(self.user), 1)
+
+    def test_counter_never_goes_below_zero(self):
+        notification = Notification.objects.create(user=self.user, message='Hello')
+        User.objects.filter(pk=self.user.pk).update(unread_notification_count=0)
+        notification.delete()
+        self.assertEqual(self._unread_count(self.user), 0)
+
+    def test_deleting_invitation_cascades_to_counter(self):
+        invitation, = Invitation.objects.invite(self.user, self.team, [self.other_user.pk])
+        drain()
+        invitation.delete()
+        self.assertEqual(self._unread_count(self.other_user), 0)
+
+    def test_delivered_invitations_increment_counters(self):
+        receivers = list(User.objects.exclude(pk=self.user.pk))
+        Invitation.objects.invite(self.user, self.team, [receiver.pk for receiver in receivers])
+        drain()
+        for receiver in receivers:
+            self.assertEqual(self._unread_count(receiver), 1)
+        self.assertEqual(self._unread_count(self.user), 0)
+
+    def test_mark_read(self):
+        Notification.objects.create(user=self.user, message='Hello')
+        Notification.objects.create(user=self.user, message='Hello again')
+        Notification.objects.create(user=self.other_user, message='Hello')
+        marked = Notification.objects.filter(user=self.user).mark_read()
+        self.assertEqual(marked, 2)
+        self.assertFalse(Notification.objects.filter(user=self.user).unread().exists())
+        self.assertEqual(self._unread_count(self.user), 0)
+        self.assertEqual(self._unread_count(self.other_user), 1)
+
+    def test_mark_read_twice_is_harmless(self):
+        Notification.objects.create(user=self.user, message='Hello')
+        Notification.objects.filter(user=self.user).mark_read()
+        self.assertEqual(Notification.objects.filter(user=self.user).mark_read(), 0)
+        self.assertEqual(self._unread_count(self.user), 0)
+
+    def test_refresh_repairs_drifted_counters(self):
+        Notification.objects.create(user=self.user, message='Hello')
+        User.objects.update(unread_notification_count=7)
+        refresh_unread_notification_counts([self.user.pk, self.other_user.pk])
+        self.assertEqual(self._unread_count(self.user), 1)
+        self.assertEqual(self._unread_count(self.other_user), 0)
+
+    def _unread_count(self, user):
+        return User.objects.values_list('unread_notification_count', flat=True).get(pk=user.pk)
@@ -0,0 +1,102 @@
+"""Unit tests for task completion and archival."""
+import io
+from datetime import date, timedelta
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.utils import timezone
+from tasks.models import ArchivedTask, Task, Team, User
+
+class TaskCompletionTestCase(TestCase):
+    """Unit tests for task completion and archival."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+    ]
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        self.other_user = User.objects.get(username='@janedoe')
+        self.team = Team.objects.create(name='Team Pelican')
+        self.task = Task.objects.create(description='Report', due_date=date(2030, 1, 5), team=self.team)
+        self.task.assigned_to.add(self.user, self.other_user)
+        self.later_task = Task.objects.create(description='Slides', due_date=date(2030, 1, 20), team=self.team)
+
+    def test_new_tasks_are_open(self):
+        self.assertIsNone(self.task.completed_at)
+        self.assertEqual(set(Task.objects.open()), {self.task, self.later_task})
+        self.assertFalse(Task.objects.completed().exists())
+
+    def test_complete_sets_completed_at_once(self):
+        self.task.complete()
+        completed_at = Task.objects.get(pk=self.task.pk).completed_at
+        self.assertIsNotNone(completed_at)
+        self.task.complete()
+        self.assertEqual(Task.objects.get(pk=self.task.pk).completed_at, completed_at)
+        self.assertEqual(list(Task.objects.completed()), [self.task])
+        self.assertEqual(list(Task.objects.open()), [self.later_task])
+
+    def test_team_statistics_count_only_open_tasks(self):
+        self.task.complete()
+        self.assertEqual(self._team_stats(), (1, date(2030, 1, 20)))
+        Task.objects.create(description='Done', due_date=date(2030, 1, 1), team=self.team, completed_at=timezone.now())
+        self.assertEqual(self._team_stats(), (1, date(2030, 1, 20)))
+        self.task.delete()
+        self.assertEqual(self._team_stats(), (1, date(2030, 1, 20)))
+
+    def test_archive_moves_completed_tasks_with_their_assignees(self):
+        self.task.complete()
+        completed_at = Task.objects.get(pk=self.task.pk).completed_at
+        self.assertEqual(ArchivedTask.objects.archive([self.task.pk, self.later_task.pk]), 1)
+        self.assertFalse(Task.objects.filter(pk=self.task.pk).exists())
+        self.assertFalse(Task.assigned_to.through.objects.filter(task_id=self.task.pk).exists())
+        archived = ArchivedTask.objects.get()
+        self.assertEqual(archived.pk, self.task.pk)
+        self.assertEqual(archived.team, self.team)
+        self.assertEqual(archived.description, 'Report')
+        self.assertEqual(archived.due_date, date(2030, 1, 5))
+        self.assertEqual(archived.completed_at, completed_at)
+        self.assertEqual(set(archived.assigned_to.all()), {self.user, self.other_user})
+        self.assertEqual(list(self.user.archived_tasks.all()), [archived])
+
+    def test_archive_leaves_team_statistics_alone(self):
+        self.task.complete()
+        ArchivedTask.objects.archive([self.task.pk])
+        self.assertEqual(self._team_stats(), (1, date(2030, 1, 20)))
+
+    def test_archive_skips_open_tasks(self):
+        self.assertEqual(ArchivedTask.objects.archive([self.later_task.pk]), 0)
+        self.assertTrue(Task.objects.filter(pk=self.later_task.pk).exists())
+        self.assertFalse(ArchivedTask.objects.exists())
+
+    def test_archive_tasks_command_archives_tasks_completed_before_the_cutoff(self):
+        Task.objects.filter(pk=self.task.pk).update(completed_at=timezone.now() - timedelta(days=40))
+        recent = Task.objects.create(description='Recent', due_date=date(2030, 1, 1), team=self.team)
+        recent.complete()
+        output = io.StringIO()
+        call_command('archive_tasks', '--older-than', '30', '--batch-size', '1', stdout=output)
+        self.assertEqual(list(ArchivedTask.objects.values_list('pk', flat=True)), [self.task.pk])
+        self.assertEqual(set(Task.objects.all()), {self.later_task, recent})
+        self.assertIn('Archived 1 tasks completed before', output.getvalue())
+
+    def test_archive_tasks_command_works_in_batches(self):
+        for number in range(5):
+            Task.objects.create(
+                description=f'Old {number}', due_date=date(2030, 1, 1), team=self.team,
+                completed_at=timezone.now() - timedelta(days=10),
+            )
+        call_command('archive_tasks', '--older-than', '1', '--batch-size', '2', stdout=io.StringIO())
+        self.assertEqual(ArchivedTask.objects.count(), 5)
+        self.assertFalse(Task.objects.completed().exists())
+
+    def test_archive_tasks_command_rejects_invalid_options(self):
+        with self.assertRaises(CommandError):
+            call_command('archive_tasks', '--older-than', '30', '--batch-size', '1000')
+        with self.assertRaises(CommandError):
+            call_command('archive_tasks', '--older-than', '-1')
+        with self.assertRaises(CommandError):
+            call_command('archive_tasks')
+
+    def _team_stats(self):
+        return Team.objects.values_list('task_count', 'next_due_date').get(pk=self.team.pk)
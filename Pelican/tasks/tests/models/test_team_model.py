@@ -0,0 +1,132 @@
+"""Unit tests for the team model's denormalized statistics."""
+import io
+from datetime import date
+from django.core.management import call_command
+from django.test import TestCase
+from tasks.fragment_cache import block_version
+from tasks.models import Task, Team, User, refresh_team_stats
+
+class TeamStatsTestCase(TestCase):
+    """Unit tests for the team model's denormalized statistics."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+    ]
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        self.other_user = User.objects.get(username='@janedoe')
+        self.team = Team.objects.create(name='Team Pelican')
+        self.other_team = Team.objects.create(name='Team Heron')
+
+    def test_new_team_has_no_members_or_tasks(self):
+        self.assertEqual(self._stats(self.team), (0, 0, None))
+
+    def test_adding_members_counts_only_new_members(self):
+        self.team.members.add(self.user, self.other_user)
+        self.team.members.add(self.user)
+        self.assertEqual(self._stats(self.team)[0], 2)
+
+    def test_joining_teams_from_the_user_side_counts_the_member(self):
+        self.user.teams.add(self.team, self.other_team)
+        self.assertEqual(self._stats(self.team)[0], 1)
+        self.assertEqual(self._stats(self.other_team)[0], 1)
+
+    def test_removing_members_recounts_the_team(self):
+        self.team.members.add(self.user)
+        self.team.members.remove(self.user, self.other_user)
+        self.assertEqual(self._stats(self.team)[0], 0)
+
+    def test_leaving_teams_recounts_them(self):
+        self.user.teams.add(self.team, self.other_team)
+        self.other_user.teams.add(self.team)
+        self.user.teams.remove(self.other_team)
+        self.assertEqual(self._stats(self.other_team)[0], 0)
+        self.user.teams.clear()
+        self.assertEqual(self._stats(self.team)[0], 1)
+
+    def test_clearing_members_recounts_the_team(self):
+        self.team.members.add(self.user, self.other_user)
+        self.team.members.clear()
+        self.assertEqual(self._stats(self.team)[0], 0)
+
+    def test_deleting_a_user_stops_counting_them(self):
+        self.team.members.add(self.user, self.other_user)
+        self.other_user.delete()
+        self.assertEqual(self._stats(self.team)[0], 1)
+
+    def test_creating_tasks_counts_them_and_tracks_the_next_due_date(self):
+        Task.objects.create(description='Report', due_date=date(2030, 1, 20), team=self.team)
+        Task.objects.create(description='Slides', due_date='2030-01-05', team=self.team)
+        Task.objects.create(description='Review', due_date=date(2030, 2, 1), team=self.team)
+        self.assertEqual(self._stats(self.team), (0, 3, date(2030, 1, 5)))
+
+    def test_editing_a_task_recounts_the_next_due_date(self):
+        task = Task.objects.create(description='Report', due_date=date(2030, 1, 5), team=self.team)
+        Task.objects.create(description='Slides', due_date=date(2030, 1, 20), team=self.team)
+        task.due_date = date(2030, 3, 1)
+        task.save()
+        self.assertEqual(self._stats(self.team), (0, 2, date(2030, 1, 20)))
+
+    def test_moving_a_task_to_another_team_recounts_both_teams(self):
+        self.team.members.add(self.user)
+        self.other_team.members.add(self.other_user)
+        Task.objects.create(description='Report', due_date=date(2030, 1, 5), team=self.team)
+        task = Task.objects.get()
+        versions = [block_version(user.pk, 'teams') for user in (self.user, self.other_user)]
+        task.team = self.other_team
+        with self.captureOnCommitCallbacks(execute=True):
+            task.save()
+        self.assertEqual(self._stats(self.team), (1, 0, None))
+        self.assertEqual(self._stats(self.other_team), (1, 1, date(2030, 1, 5)))
+        for user, version in zip((self.user, self.other_user), versions):
+            self.assertNotEqual(block_version(user.pk, 'teams'), version)
+
+    def test_deleting_the_task_due_next_recounts_the_next_due_date(self):
+        first = Task.objects.create(description='Report', due_date=date(2030, 1, 5), team=self.team)
+        last = Task.objects.create(description='Slides', due_date=date(2030, 1, 20), team=self.team)
+        last.delete()
+        self.assertEqual(self._stats(self.team), (0, 1, date(2030, 1, 5)))
+        first.delete()
+        self.assertEqual(self._stats(self.team), (0, 0, None))
+
+    def test_deleting_a_task_that_is_not_due_next_updates_the_team_in_one_query(self):
+        Task.objects.create(description='Report', due_date=date(2030, 1, 5), team=self.team)
+        task = Task.objects.create(description='Slides', due_date=date(2030, 1, 20), team=self.team)
+        # Look up the assignees, delete the assignments and the task, update the team, then look up its members
+        with self.assertNumQueries(5):
+            task.delete()
+        self.assertEqual(self._stats(self.team), (0, 1, date(2030, 1, 5)))
+
+    def test_bulk_created_tasks_are_counted(self):
+        Task.objects.create(description='Report', due_date=date(2030, 1, 20), team=self.team)
+        Task.objects.bulk_create_assigned([
+            Task(description='Imported', due_date=date(2030, 1, 10), team=self.team),
+            Task(description='Imported', due_date=date(2030, 1, 1), team=self.other_team),
+        ], [[self.user.pk], []])
+        self.assertEqual(self._stats(self.team), (0, 2, date(2030, 1, 10)))
+        self.assertEqual(self._stats(self.other_team), (0, 1, date(2030, 1, 1)))
+
+    def test_refresh_team_stats_recounts_only_the_given_teams(self):
+        self.team.members.add(self.user)
+        Task.objects.create(description='Report', due_date=date(2030, 1, 5), team=self.team)
+        Team.objects.update(member_count=7, task_count=7, next_due_date=date(2000, 1, 1))
+        refresh_team_stats([self.team.pk])
+        self.assertEqual(self._stats(self.team), (1, 1, date(2030, 1, 5)))
+        self.assertEqual(self._stats(self.other_team), (7, 7, date(2000, 1, 1)))
+
+    def test_rebuild_team_stats_command_repairs_drift(self):
+        self.team.members.add(self.user)
+        Task.objects.create(description='Report', due_date=date(2030, 1, 5), team=self.team)
+        Team.objects.filter(pk=self.team.pk).update(task_count=5)
+        version = block_version(self.user.pk, 'teams')
+        output = io.StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('rebuild_team_stats', stdout=output)
+        self.assertEqual(output.getvalue(), 'Rebuilt the statistics of 2 teams, 1 of which had drifted.\n')
+        self.assertEqual(self._stats(self.team), (1, 1, date(2030, 1, 5)))
+        self.assertNotEqual(block_version(self.user.pk, 'teams'), version)
+
+    def _stats(self, team):
+        return Team.objects.values_list('member_count', 'task_count', 'next_due_date').get(pk=team.pk)
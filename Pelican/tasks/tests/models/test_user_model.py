@@ -1,7 +1,9 @@
 """Unit tests for the User model."""
+from unittest import mock
 from django.core.exceptions import ValidationError
 from django.test import TestCase
-from tasks.models import User
+from libgravatar import Gravatar
+from tasks.models import User, _gravatar_for_email, _gravatar_url
 
 class UserModelTestCase(TestCase):
     """Unit tests for the User model."""
@@ -143,6 +145,29 @@ class UserModelTestCase(TestCase):
         expected_gravatar_url = self._gravatar_url(size=60)
         self.assertEqual(actual_gravatar_url, expected_gravatar_url)
 
+    def test_gravatar_follows_email_changes(self):
+        self.user.gravatar()
+        self.user.email = 'janedoe@example.org'
+        self.assertNotEqual(self.user.gravatar(), self._gravatar_url(size=120))
+        self.assertEqual(self.user.gravatar(), Gravatar('janedoe@example.org').get_image(size=120, default='mp'))
+
+    def test_gravatar_hash_is_computed_once_per_email(self):
+        _gravatar_for_email.cache_clear()
+        _gravatar_url.cache_clear()
+        self.user.gravatar()
+        self.user.gravatar(size=100)
+        self.user.mini_gravatar()
+        self.assertEqual(_gravatar_for_email.cache_info().misses, 1)
+
+    def test_repeated_gravatar_calls_are_served_from_the_cache(self):
+        _gravatar_for_email.cache_clear()
+        _gravatar_url.cache_clear()
+        with mock.patch('tasks.models.Gravatar', wraps=Gravatar) as gravatar:
+            urls = {self.user.gravatar() for _ in range(100)}
+        self.assertEqual(urls, {self._gravatar_url(size=120)})
+        self.assertEqual(gravatar.call_count, 1)
+        self.assertEqual(_gravatar_url.cache_info().hits, 99)
+
     def _gravatar_url(self, size):
         gravatar_url = f"{UserModelTestCase.GRAVATAR_URL}?size={size}&default=mp"
         return gravatar_url
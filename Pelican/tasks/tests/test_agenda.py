@@ -0,0 +1,139 @@
+"""Unit tests for the agenda calendar and its date range API."""
+from datetime import date
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from tasks.agenda import calendar_range, parse_date_range
+from tasks.models import Task, Team, User
+
+class AgendaTestCase(TestCase):
+    """Unit tests for the agenda calendar and its date range API."""
+
+    fixtures = ['tasks/tests/fixtures/default_user.json', 'tasks/tests/fixtures/other_users.json']
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        self.other_user = User.objects.get(username='@janedoe')
+        self.team = Team.objects.create(name='Team Pelican')
+        self.team.members.add(self.user, self.other_user)
+        self.mine = [
+            self._task('Report', date(2030, 1, 5), self.user),
+            self._task('Slides', date(2030, 1, 5), self.user, self.other_user),
+            self._task('Review', date(2030, 1, 20), self.user),
+        ]
+        self.theirs = self._task('Budget', date(2030, 1, 20), self.other_user)
+        self._task('Out of range', date(2030, 3, 1), self.user)
+        other_team = Team.objects.create(name='Team Heron')
+        other_team.members.add(self.other_user)
+        Task.objects.create(description='Not mine', due_date=date(2030, 1, 5), team=other_team).assigned_to.add(self.other_user)
+        self.client.login(username=self.user.username, password='Password123')
+
+    def test_days_counts_assigned_tasks_in_one_query(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('agenda_days'), {'start': '2030-01-01', 'end': '2030-01-31'})
+        self.assertEqual(response.json(), {
+            'scope': 'assigned',
+            'start': '2030-01-01',
+            'end': '2030-01-31',
+            'days': {'2030-01-05': 2, '2030-01-20': 1},
+        })
+
+    def test_days_counts_every_task_of_the_users_teams(self):
+        response = self.client.get(reverse('agenda_days'), {'start': '2030-01-01', 'end': '2030-01-31', 'scope': 'teams'})
+        self.assertEqual(response.json()['days'], {'2030-01-05': 2, '2030-01-20': 2})
+
+    def test_completed_tasks_leave_the_agenda(self):
+        self.mine[0].complete()
+        self.theirs.complete()
+        query = {'start': '2030-01-01', 'end': '2030-01-31', 'scope': 'teams'}
+        self.assertEqual(self.client.get(reverse('agenda_days'), query).json()['days'], {'2030-01-05': 1, '2030-01-20': 1})
+        tasks = self.client.get(reverse('agenda_tasks'), query).json()['tasks']
+        self.assertEqual([task['id'] for task in tasks], [self.mine[1].pk, self.mine[2].pk])
+        weeks = self.client.get(reverse('agenda'), {'month': '2030-01'}).context['weeks']
+        self.assertEqual({day: count for week in weeks for day, count in week if count}, {date(2030, 1, 5): 1, date(2030, 1, 20): 1})
+
+    def test_days_defaults_to_the_current_month(self):
+        response = self.client.get(reverse('agenda_days'))
+        start, end = parse_date_range(None, None)
+        self.assertEqual(response.json()['start'], start.isoformat())
+        self.assertEqual(response.json()['end'], end.isoformat())
+        self.assertEqual(start.day, 1)
+
+    def test_invalid_ranges_are_rejected(self):
+        url = reverse('agenda_days')
+        for query in (
+            {'start': 'tomorrow'},
+            {'start': '2030-01-31', 'end': '2030-01-01'},
+            {'start': '2030-01-01', 'end': '2032-01-01'},
+            {'scope': 'everyone'},
+        ):
+            response = self.client.get(url, query)
+            self.assertEqual(response.status_code, 400, query)
+            self.assertIn('error', response.json())
+
+    @override_settings(AGENDA_MAX_DAYS=7)
+    def test_range_length_is_limited_by_setting(self):
+        url = reverse('agenda_days')
+        self.assertEqual(self.client.get(url, {'start': '2030-01-01', 'end': '2030-01-07'}).status_code, 200)
+        self.assertEqual(self.client.get(url, {'start': '2030-01-01', 'end': '2030-01-08'}).status_code, 400)
+
+    def test_tasks_of_a_day_are_returned_with_their_team_and_assignees(self):
+        response = self.client.get(reverse('agenda_tasks'), {'start': '2030-01-05'})
+        self.assertEqual(response.json(), {'tasks': [
+            {
+                'id': self.mine[0].pk, 'name': 'Report', 'description': 'Report', 'due_date': '2030-01-05',
+                'team': {'id': self.team.pk, 'name': 'Team Pelican'}, 'assigned_to': ['@johndoe'],
+            },
+            {
+                'id': self.mine[1].pk, 'name': 'Slides', 'description': 'Slides', 'due_date': '2030-01-05',
+                'team': {'id': self.team.pk, 'name': 'Team Pelican'}, 'assigned_to': ['@janedoe', '@johndoe'],
+            },
+        ], 'next': None})
+
+    @override_settings(FEED_PAGE_SIZE=2)
+    def test_tasks_are_paged_soonest_due_first(self):
+        query = {'start': '2030-01-01', 'end': '2030-01-31', 'scope': 'teams'}
+        first = self.client.get(reverse('agenda_tasks'), query).json()
+        self.assertEqual([task['id'] for task in first['tasks']], [self.mine[0].pk, self.mine[1].pk])
+        self.assertIn('scope=teams', first['next'])
+        second = self.client.get(first['next']).json()
+        self.assertEqual([task['id'] for task in second['tasks']], [self.mine[2].pk, self.theirs.pk])
+        self.assertIsNone(second['next'])
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(reverse('agenda_tasks'), {'after': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_calendar_shows_the_number_of_tasks_due_each_day(self):
+        response = self.client.get(reverse('agenda'), {'month': '2030-01'})
+        self.assertTemplateUsed(response, 'agenda.html')
+        weeks = response.context['weeks']
+        counts = {day: count for week in weeks for day, count in week if count}
+        self.assertEqual(counts, {date(2030, 1, 5): 2, date(2030, 1, 20): 1})
+        self.assertEqual((weeks[0][0][0], weeks[-1][-1][0]), calendar_range(date(2030, 1, 1)))
+        self.assertEqual(response.context['previous_month'], date(2029, 12, 1))
+        self.assertEqual(response.context['next_month'], date(2030, 2, 1))
+
+    def test_invalid_month_is_not_found(self):
+        for month in ('2030-13', 'January', '2030'):
+            self.assertEqual(self.client.get(reverse('agenda'), {'month': month}).status_code, 404)
+
+    def test_months_at_the_ends_of_the_calendar(self):
+        for month in ('0001-01', '9999-12', '10000-01'):
+            self.assertEqual(self.client.get(reverse('agenda'), {'month': month}).status_code, 404)
+        first = self.client.get(reverse('agenda'), {'month': '0001-02'})
+        self.assertIsNone(first.context['previous_month'])
+        self.assertNotContains(first, 'Previous month')
+        last = self.client.get(reverse('agenda'), {'month': '9999-11'})
+        self.assertIsNone(last.context['next_month'])
+        self.assertNotContains(last, 'Next month')
+
+    def test_agenda_requires_login(self):
+        self.client.logout()
+        for name in ('agenda', 'agenda_days', 'agenda_tasks'):
+            response = self.client.get(reverse(name))
+            self.assertRedirects(response, f"{reverse('log_in')}?next={reverse(name)}")
+
+    def _task(self, description, due_date, *users):
+        task = Task.objects.create(name=description, description=description, due_date=due_date, team=self.team)
+        task.assigned_to.add(*users)
+        return task
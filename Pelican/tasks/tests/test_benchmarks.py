@@ -0,0 +1,61 @@
+"""Unit tests for the benchmark suite."""
+from django.test import TestCase
+from benchmarks.concurrency import sqlite_concurrency
+from benchmarks.logins import login_throughput
+from benchmarks.runner import compare, run_scale
+
+class BenchmarkTestCase(TestCase):
+    """Unit tests for the benchmark suite."""
+
+    def test_run_scale_reports_each_scenario(self):
+        results = run_scale('10', ['dashboard', 'send_invitations'], iterations=3, warmup=1)
+        self.assertEqual(set(results), {'dashboard', 'send_invitations'})
+        for result in results.values():
+            self.assertEqual(result['iterations'], 3)
+            self.assertEqual(result['errors'], 0)
+            self.assertLessEqual(result['latency_ms']['p50'], result['latency_ms']['p99'])
+            self.assertGreater(result['queries']['max'], 0)
+            self.assertGreater(result['peak_memory_kib'], 0)
+
+    def test_login_throughput_covers_each_profile(self):
+        results = login_throughput(duration=0.01)
+        self.assertEqual(set(results), {'production', 'fast'})
+        self.assertEqual(results['fast']['hasher'], 'FastPasswordHasher')
+        for result in results.values():
+            self.assertGreater(result['logins_per_second_per_core'], 0)
+            self.assertGreater(result['legacy_rehash_ms'], 0)
+
+    def test_compare_reports_slower_logins_for_the_same_hasher(self):
+        baseline = {'scales': {}, 'logins': {'fast': {'hasher': 'FastPasswordHasher', 'logins_per_second_per_core': 100.0}}}
+        slower = {'scales': {}, 'logins': {'fast': {'hasher': 'FastPasswordHasher', 'logins_per_second_per_core': 70.0}}}
+        other_hasher = {'scales': {}, 'logins': {'fast': {'hasher': 'SHA1PasswordHasher', 'logins_per_second_per_core': 1.0}}}
+        self.assertEqual(compare(slower, baseline, tolerance=0.25), ['fast logins: 70.0 per second per core, baseline 100.0'])
+        self.assertEqual(compare(other_hasher, baseline, tolerance=0.25), [])
+
+    def test_sqlite_concurrency_covers_each_pragma_profile(self):
+        results = sqlite_concurrency(duration=0.05, writers=2, readers=2)
+        self.assertEqual(set(results), {'default', 'tuned'})
+        for result in results.values():
+            self.assertGreater(result['writes_per_second'], 0)
+            self.assertGreater(result['reads_per_second'], 0)
+
+    def test_compare_reports_slower_sqlite_throughput(self):
+        baseline = {'scales': {}, 'concurrency': {'tuned': {'writes_per_second': 100.0, 'reads_per_second': 100.0}}}
+        slower = {'scales': {}, 'concurrency': {'tuned': {'writes_per_second': 100.0, 'reads_per_second': 50.0}}}
+        self.assertEqual(compare(slower, baseline, tolerance=0.25), ['tuned SQLite reads: 50.0 per second, baseline 100.0'])
+
+    def test_compare_reports_slower_latency(self):
+        baseline = self._results(p95=10.0, queries=5)
+        self.assertEqual(compare(self._results(p95=12.0, queries=5), baseline, tolerance=0.25), [])
+        regressions = compare(self._results(p95=13.0, queries=5), baseline, tolerance=0.25)
+        self.assertEqual(regressions, ['dashboard at 1k: p95 latency 13.0ms, baseline 10.0ms'])
+
+    def test_compare_reports_any_extra_query(self):
+        regressions = compare(self._results(p95=10.0, queries=6), self._results(p95=10.0, queries=5), tolerance=0.25)
+        self.assertEqual(regressions, ['dashboard at 1k: 6 queries per request, baseline 5'])
+
+    def test_compare_ignores_scenarios_missing_from_baseline(self):
+        self.assertEqual(compare(self._results(p95=10.0, queries=5), {'scales': {}}, tolerance=0.25), [])
+
+    def _results(self, p95, queries):
+        return {'scales': {'1k': {'dashboard': {'latency_ms': {'p95': p95}, 'queries': {'max': queries}}}}}
@@ -0,0 +1,83 @@
+"""Unit tests for the database connection profiles, pool and counters."""
+import threading
+import time
+from django.conf import settings
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from task_manager.database_connections import async_pool_size, database_connection_settings
+from task_manager.runner import test_settings
+from tasks.db_connections import connection_stats, reset_connection_stats, run_in_database_pool
+from tasks.models import User
+
+class DatabaseConnectionProfilesTestCase(TestCase):
+    """Unit tests for the database connection profiles and counters."""
+
+    def setUp(self):
+        reset_connection_stats()
+
+    def test_persistent_profile_reuses_checked_connections(self):
+        self.assertEqual(database_connection_settings('persistent'), {'CONN_MAX_AGE': 600, 'CONN_HEALTH_CHECKS': True})
+        self.assertGreater(async_pool_size('persistent'), 0)
+
+    def test_asgi_profile_closes_connections_but_pools_async_queries(self):
+        self.assertEqual(database_connection_settings('asgi')['CONN_MAX_AGE'], 0)
+        self.assertGreater(async_pool_size('asgi'), 0)
+
+    def test_per_request_profile_has_no_pool(self):
+        self.assertEqual(database_connection_settings('per_request')['CONN_MAX_AGE'], 0)
+        self.assertEqual(async_pool_size('per_request'), 0)
+
+    def test_unknown_profile_is_rejected(self):
+        with self.assertRaises(ValueError):
+            database_connection_settings('pooled')
+
+    def test_test_runner_uses_the_per_request_profile_unless_the_environment_sets_one(self):
+        self.assertEqual(test_settings({})['DATABASE_CONNECTION_PROFILE'], 'per_request')
+        self.assertEqual(test_settings({})['DATABASE_ASYNC_POOL_SIZE'], 0)
+        self.assertNotIn('DATABASE_CONNECTION_PROFILE', test_settings({'DATABASE_CONNECTION_PROFILE': 'asgi'}))
+        profile_settings = database_connection_settings(settings.DATABASE_CONNECTION_PROFILE)
+        self.assertEqual(connection.settings_dict['CONN_MAX_AGE'], profile_settings['CONN_MAX_AGE'])
+
+    def test_new_connections_are_counted(self):
+        new_connection = connections.create_connection('default')
+        try:
+            new_connection.ensure_connection()
+        finally:
+            new_connection.close()
+        self.assertEqual(connection_stats()['databases']['default']['opened'], 1)
+
+    def test_requests_starting_with_an_open_connection_are_counted(self):
+        self.client.get(reverse('home'))
+        self.client.get(reverse('home'))
+        self.assertEqual(connection_stats()['databases']['default']['reused'], 2)
+
+
+@override_settings(DATABASE_ASYNC_POOL_SIZE=1, DATABASE_ASYNC_POOL_MAX_AGE=60)
+class DatabasePoolTestCase(TransactionTestCase):
+    """Unit tests for the pool of database threads used by async views."""
+
+    fixtures = ['tasks/tests/fixtures/default_user.json']
+
+    def setUp(self):
+        reset_connection_stats()
+
+    async def test_queries_run_on_a_pool_thread(self):
+        thread_name, count = await run_in_database_pool(
+            lambda: (threading.current_thread().name, User.objects.count())
+        )
+        self.assertTrue(thread_name.startswith('database'))
+        self.assertEqual(count, 1)
+
+    async def test_pool_threads_keep_their_connections(self):
+        await run_in_database_pool(User.objects.count)
+        reset_connection_stats()
+        close_at = await run_in_database_pool(lambda: connection.close_at)
+        self.assertLessEqual(close_at, time.monotonic() + 60)
+        self.assertGreater(close_at, time.monotonic())
+        self.assertEqual(connection_stats()['databases'], {'default': {'opened': 0, 'reused': 1}})
+
+    @override_settings(DATABASE_ASYNC_POOL_SIZE=0)
+    async def test_disabled_pool_runs_on_the_shared_thread(self):
+        thread_name = await run_in_database_pool(lambda: threading.current_thread().name)
+        self.assertFalse(thread_name.startswith('database'))
@@ -0,0 +1,120 @@
+"""Unit tests for the task export endpoint and command."""
+import csv
+import io
+import json
+import os
+import tempfile
+from datetime import date, timedelta
+from asgiref.sync import sync_to_async
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.urls import reverse
+from tasks.exports import export_tasks, tasks_to_export
+from tasks.models import Task, Team, User
+
+class TaskExportTestCase(TestCase):
+    """Unit tests for the task export endpoint and command."""
+
+    fixtures = ['tasks/tests/fixtures/default_user.json', 'tasks/tests/fixtures/other_users.json']
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        self.other_user = User.objects.get(username='@janedoe')
+        self.team = Team.objects.create(name='Team Pelican')
+        self.team.members.add(self.user, self.other_user)
+        today = date.today()
+        self.tasks = []
+        for number in range(5):
+            task = Task.objects.create(
+                name=f'Task {number}', description=f'Write, "quote" {number}', due_date=today + timedelta(days=5 - number), team=self.team
+            )
+            task.assigned_to.add(self.user)
+            if number % 2:
+                task.assigned_to.add(self.other_user)
+            self.tasks.append(task)
+        other_team = Team.objects.create(name='Team Heron')
+        Task.objects.create(description='Not exported', due_date=today, team=other_team)
+        self.url = reverse('export_team_tasks', args=[self.team.id])
+
+    def test_csv_export_has_a_header_and_one_row_per_task_soonest_due_first(self):
+        rows = list(csv.reader(io.StringIO(''.join(export_tasks(tasks_to_export(self.team), 'csv')))))
+        self.assertEqual(rows[0], ['id', 'team', 'name', 'description', 'due_date', 'assigned_to'])
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[1], [
+            str(self.tasks[4].pk), 'Team Pelican', 'Task 4', 'Write, "quote" 4',
+            self.tasks[4].due_date.isoformat(), '@johndoe',
+        ])
+        self.assertEqual(rows[2][5], '@janedoe @johndoe')
+
+    def test_ndjson_export_has_one_object_per_task(self):
+        lines = ''.join(export_tasks(tasks_to_export(self.team), 'ndjson')).splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(json.loads(lines[1])['assigned_to'], ['@janedoe', '@johndoe'])
+
+    def test_export_reads_assignees_with_one_query_per_chunk(self):
+        with self.assertNumQueries(4):
+            chunks = list(export_tasks(tasks_to_export(self.team), 'ndjson', chunk_size=2))
+        self.assertEqual(len(chunks), 3)
+
+    def test_export_of_every_team(self):
+        lines = ''.join(export_tasks(tasks_to_export(), 'ndjson')).splitlines()
+        self.assertEqual(len(lines), 6)
+
+    def test_unknown_format_is_rejected(self):
+        with self.assertRaises(ValueError):
+            list(export_tasks(tasks_to_export(self.team), 'xml'))
+
+    def test_export_view_streams_csv_to_members(self):
+        self.client.login(username=self.user.username, password='Password123')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(response['Content-Disposition'], f'attachment; filename="team-{self.team.id}-tasks.csv"')
+        content = b''.join(response.streaming_content).decode()
+        self.assertEqual(len(content.splitlines()), 6)
+
+    def test_export_view_streams_ndjson(self):
+        self.client.login(username=self.user.username, password='Password123')
+        response = self.client.get(self.url, {'format': 'ndjson'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 5)
+
+    def test_export_view_rejects_unknown_formats(self):
+        self.client.login(username=self.user.username, password='Password123')
+        response = self.client.get(self.url, {'format': 'xml'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_export_view_is_for_team_members_only(self):
+        outsider = User.objects.get(username='@petrapickles')
+        self.client.login(username=outsider.username, password='Password123')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 404)
+
+    def test_export_view_redirects_when_not_logged_in(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+
+    async def test_export_view_streams_asynchronously_under_asgi(self):
+        await sync_to_async(self.async_client.force_login)(self.user)
+        response = await self.async_client.get(self.url)
+        self.assertTrue(response.is_async)
+        content = b''.join([chunk async for chunk in response.streaming_content]).decode()
+        self.assertEqual(len(content.splitlines()), 6)
+
+    def test_command_writes_a_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'tasks.ndjson')
+            call_command('export_tasks', team=self.team.id, format='ndjson', output=path)
+            with open(path) as output:
+                self.assertEqual(len(output.read().splitlines()), 5)
+
+    def test_command_writes_every_team_to_standard_output(self):
+        stdout = io.StringIO()
+        call_command('export_tasks', stdout=stdout)
+        self.assertEqual(len(stdout.getvalue().splitlines()), 7)
+
+    def test_command_rejects_unknown_teams(self):
+        with self.assertRaises(CommandError):
+            call_command('export_tasks', team=self.team.id + 100)
@@ -0,0 +1,166 @@
+"""Unit tests for the dashboard fragment cache."""
+import shutil
+import tempfile
+from datetime import date
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from tasks.fragment_cache import (
+    dashboard_cache_is_shared, fragment_cache_stats, invalidate_dashboard_fragments, render_dashboard_fragments, reset_fragment_cache_stats
+)
+from tasks.models import Invitation, Notification, Task, Team, User
+
+class FragmentCacheTestCase(TestCase):
+    """Unit tests for the dashboard fragment cache."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+    ]
+
+    def setUp(self):
+        cache.clear()
+        reset_fragment_cache_stats()
+        self.user = User.objects.get(username='@johndoe')
+        self.other_user = User.objects.get(username='@janedoe')
+        self.request = RequestFactory().get('/dashboard/')
+        self.request.user = self.user
+        self.team = Team.objects.create(name='Team Pelican')
+
+    def test_second_render_is_a_hit(self):
+        self._render()
+        self._render()
+        self.assertEqual(fragment_cache_stats()['teams'], {'hits': 1, 'misses': 1})
+
+    def test_cached_fragment_does_not_call_context_factory(self):
+        self._render()
+        calls = []
+        render_dashboard_fragments(self.request, {'teams': ('partials/dashboard_teams.html', calls.append)})
+        self.assertEqual(calls, [])
+
+    def test_invalidate_only_affects_given_users_and_blocks(self):
+        self._render()
+        invalidate_dashboard_fragments([self.other_user.pk], 'teams')
+        invalidate_dashboard_fragments([self.user.pk], 'tasks')
+        self._render()
+        self.assertEqual(fragment_cache_stats()['teams'], {'hits': 1, 'misses': 1})
+
+    def test_joining_a_team_invalidates_teams(self):
+        self._assert_invalidates('teams', lambda: self.team.members.add(self.user))
+
+    def test_joining_a_team_from_the_user_side_invalidates_teams(self):
+        self._assert_invalidates('teams', lambda: self.user.teams.add(self.team))
+
+    def test_leaving_teams_invalidates_teams(self):
+        self.team.members.add(self.user)
+        self._assert_invalidates('teams', lambda: self.team.members.clear())
+
+    def test_bulk_created_tasks_invalidate_tasks(self):
+        task = Task(description='Imported', due_date=date.today(), team=self.team)
+        self._assert_invalidates('tasks', lambda: Task.objects.bulk_create_assigned([task], [[self.user.pk]]))
+
+    def test_another_member_joining_invalidates_teams(self):
+        self.team.members.add(self.user)
+        self._assert_invalidates('teams', lambda: self.team.members.add(self.other_user))
+
+    def test_another_member_leaving_invalidates_teams(self):
+        self.team.members.add(self.user, self.other_user)
+        self._assert_invalidates('teams', lambda: self.other_user.teams.remove(self.team))
+
+    def test_deleting_another_member_invalidates_teams(self):
+        self.team.members.add(self.user, self.other_user)
+        self._assert_invalidates('teams', self.other_user.delete)
+
+    def test_creating_a_team_task_invalidates_teams(self):
+        self.team.members.add(self.user)
+        self._assert_invalidates('teams', lambda: Task.objects.create(
+            description='Report', due_date=date.today(), team=self.team
+        ))
+
+    def test_completing_a_team_task_invalidates_teams(self):
+        self.team.members.add(self.user)
+        task = Task.objects.create(description='Report', due_date=date.today(), team=self.team)
+        self._assert_invalidates('teams', task.complete)
+
+    def test_deleting_a_team_task_invalidates_teams(self):
+        self.team.members.add(self.user)
+        task = Task.objects.create(description='Report', due_date=date.today(), team=self.team)
+        self._assert_invalidates('teams', task.delete)
+
+    def test_bulk_created_team_tasks_invalidate_teams(self):
+        self.team.members.add(self.user)
+        task = Task(description='Imported', due_date=date.today(), team=self.team)
+        self._assert_invalidates('teams', lambda: Task.objects.bulk_create_assigned([task], [[]]))
+
+    def test_renaming_a_team_invalidates_teams(self):
+        self.team.members.add(self.user)
+
+        def rename():
+            self.team.name = 'Team Puffin'
+            self.team.save()
+        self._assert_invalidates('teams', rename)
+
+    def test_assigning_a_task_invalidates_tasks(self):
+        task = Task.objects.create(description='Report', due_date=date.today(), team=self.team)
+        self._assert_invalidates('tasks', lambda: task.assigned_to.add(self.user))
+
+    def test_deleting_a_task_invalidates_tasks(self):
+        task = Task.objects.create(description='Report', due_date=date.today(), team=self.team)
+        task.assigned_to.add(self.user)
+        self._assert_invalidates('tasks', task.delete)
+
+    def test_invitation_invalidates_notifications(self):
+        self._assert_invalidates('notifications', lambda: Invitation.objects.create(
+            sender=self.other_user, receiver=self.user, team=self.team
+        ))
+
+    def test_delivering_bulk_invitations_invalidates_notifications(self):
+        invitation, = Invitation.objects.invite(self.other_user, self.team, [self.user.pk])
+        self._assert_invalidates('notifications', lambda: Invitation.objects.notify([invitation.pk]))
+
+    def test_deleting_a_notification_invalidates_notifications(self):
+        notification = Notification.objects.create(user=self.user, message='Hello')
+        self._assert_invalidates('notifications', notification.delete)
+
+    def test_file_based_cache_backend(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        file_cache = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': cache_dir}}
+        self.assertFalse(dashboard_cache_is_shared())
+        with override_settings(CACHES=file_cache):
+            self.assertTrue(dashboard_cache_is_shared())
+            self.team.members.add(self.user)
+            first = self._render()['teams']
+            self.assertEqual(self._render()['teams'], first)
+            self.team.members.remove(self.user)
+            self.assertNotIn('Team Pelican', self._render()['teams'])
+        self.assertEqual(fragment_cache_stats()['teams'], {'hits': 1, 'misses': 2})
+
+    def test_cache_stats_endpoint_is_staff_only(self):
+        url = reverse('dashboard_cache_stats')
+        self.client.login(username=self.user.username, password='Password123')
+        self.assertEqual(self.client.get(url).status_code, 302)
+        User.objects.filter(pk=self.user.pk).update(is_staff=True)
+        self._render()
+        response = self.client.get(url)
+        self.assertEqual(response.json()['teams'], {'hits': 0, 'misses': 1})
+
+    def _render(self):
+        return render_dashboard_fragments(self.request, {
+            'teams': ('partials/dashboard_teams.html', lambda: {
+                'user_teams': Team.objects.filter(members=self.user),
+            }),
+            'tasks': ('partials/dashboard_tasks.html', lambda: {
+                'user_tasks': Task.objects.filter(assigned_to=self.user),
+            }),
+            'notifications': ('partials/dashboard_notifications.html', lambda: {
+                'user_notifications': Notification.objects.filter(user=self.user),
+            }),
+        })
+
+    def _assert_invalidates(self, block, change):
+        self._render()
+        change()
+        reset_fragment_cache_stats()
+        self._render()
+        self.assertEqual(fragment_cache_stats()[block], {'hits': 0, 'misses': 1})
@@ -0,0 +1,147 @@
+"""Unit tests for the task import endpoint and command."""
+import io
+import json
+import os
+import tempfile
+from datetime import date
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.urls import reverse
+from tasks.exports import export_tasks, tasks_to_export
+from tasks.imports import ImportFormatError, import_tasks
+from tasks.models import Task, Team, User
+
+CSV = """name,description,due_date,assigned_to
+Report,Write the report,2030-01-31,@johndoe @janedoe
+,Review the report,2030-02-01,@janedoe
+Bad date,Plan,not a date,@johndoe
+Nobody,Unassigned,2030-02-02,
+Stranger,Ghost work,2030-02-03,@nobody
+"""
+
+class TaskImportTestCase(TestCase):
+    """Unit tests for the task import endpoint and command."""
+
+    fixtures = ['tasks/tests/fixtures/default_user.json', 'tasks/tests/fixtures/other_users.json']
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.get(username='@johndoe')
+        self.other_user = User.objects.get(username='@janedoe')
+        self.team = Team.objects.create(name='Team Pelican')
+        self.team.members.add(self.user, self.other_user)
+        self.url = reverse('import_team_tasks', args=[self.team.id])
+
+    def test_csv_import_creates_valid_rows_and_reports_the_others(self):
+        result = import_tasks(self.team, io.StringIO(CSV), 'csv')
+        self.assertEqual(result.created, 2)
+        self.assertEqual(result.failed, 3)
+        self.assertEqual([error['line'] for error in result.errors], [4, 5, 6])
+        self.assertIn('due_date', result.errors[0]['errors'])
+        self.assertEqual(result.errors[1]['errors'], {'assigned_to': ['This field is required.']})
+        self.assertEqual(result.errors[2]['errors'], {'assigned_to': ['Unknown users: @nobody']})
+        report = Task.objects.get(name='Report')
+        self.assertEqual(report.team, self.team)
+        self.assertEqual(report.due_date, date(2030, 1, 31))
+        self.assertEqual(set(report.assigned_to.all()), {self.user, self.other_user})
+        self.assertIsNone(Task.objects.get(description='Review the report').name)
+
+    def test_ndjson_import(self):
+        lines = [
+            json.dumps({'description': 'Plan sprint', 'due_date': '2030-01-01', 'assigned_to': ['@johndoe']}),
+            '',
+            'not json',
+            json.dumps({'description': 'x' * 300, 'due_date': '2030-01-01', 'assigned_to': '@johndoe'}),
+        ]
+        result = import_tasks(self.team, io.StringIO('\n'.join(lines)), 'ndjson')
+        self.assertEqual(result.created, 1)
+        self.assertEqual([error['line'] for error in result.errors], [3, 4])
+        self.assertIn('description', result.errors[1]['errors'])
+
+    def test_ndjson_import_reports_values_of_the_wrong_type(self):
+        lines = [
+            json.dumps({'description': 'Plan sprint', 'due_date': 20300101, 'assigned_to': ['@johndoe']}),
+            json.dumps({'description': ['Plan', 'sprint'], 'due_date': '2030-01-01', 'assigned_to': ['@johndoe']}),
+            json.dumps({'name': {'x': 1}, 'description': 'Plan', 'due_date': ['2030-01-01'], 'assigned_to': [1]}),
+        ]
+        result = import_tasks(self.team, io.StringIO('\n'.join(lines)), 'ndjson')
+        self.assertEqual(result.created, 0)
+        self.assertEqual(result.errors, [
+            {'line': 1, 'errors': {'due_date': ['Enter a string.']}},
+            {'line': 2, 'errors': {'description': ['Enter a string.']}},
+            {'line': 3, 'errors': {
+                'name': ['Enter a string.'], 'due_date': ['Enter a string.'], 'assigned_to': ['Enter a list of usernames.'],
+            }},
+        ])
+
+    def test_import_view_reports_values_of_the_wrong_type(self):
+        self.client.login(username=self.user.username, password='Password123')
+        line = json.dumps({'description': 'Plan sprint', 'due_date': 20300101, 'assigned_to': ['@johndoe']})
+        response = self.client.post(self.url, {'file': SimpleUploadedFile('tasks.ndjson', line.encode())})
+        self.assertEqual(response.json()['errors'], [{'line': 1, 'errors': {'due_date': ['Enter a string.']}}])
+        self.assertFalse(Task.objects.exists())
+
+    def test_each_chunk_looks_up_users_once_and_writes_in_bulk(self):
+        rows = ''.join(f'Task {number},Work,2030-01-01,@johndoe @janedoe\n' for number in range(10))
+        # Per chunk: one user lookup, then a savepoint around the task and assignee inserts, the team
+        # recount and the lookup of the team's members, whose dashboards are refreshed
+        with self.assertNumQueries(14):
+            result = import_tasks(self.team, io.StringIO('name,description,due_date,assigned_to\n' + rows), 'csv', chunk_size=5)
+        self.assertEqual(result.created, 10)
+        self.assertEqual(Task.assigned_to.through.objects.count(), 20)
+
+    def test_exported_tasks_can_be_imported(self):
+        import_tasks(self.team, io.StringIO(CSV), 'csv')
+        other_team = Team.objects.create(name='Team Heron')
+        exported = ''.join(export_tasks(tasks_to_export(self.team), 'ndjson'))
+        result = import_tasks(other_team, io.StringIO(exported), 'ndjson')
+        self.assertEqual(result.created, 2)
+        self.assertEqual(other_team.tasks.count(), 2)
+
+    def test_missing_columns_are_rejected(self):
+        with self.assertRaises(ImportFormatError):
+            import_tasks(self.team, io.StringIO('name,description\nA,B\n'), 'csv')
+
+    def test_import_view_returns_the_report(self):
+        self.client.login(username=self.user.username, password='Password123')
+        upload = SimpleUploadedFile('tasks.csv', CSV.encode('utf-8-sig'), content_type='text/csv')
+        response = self.client.post(self.url, {'file': upload})
+        self.assertEqual(response.status_code, 200)
+        report = response.json()
+        self.assertEqual(report['created'], 2)
+        self.assertEqual(report['failed'], 3)
+        self.assertEqual(len(report['errors']), 3)
+
+    def test_import_view_rejects_unknown_formats(self):
+        self.client.login(username=self.user.username, password='Password123')
+        upload = SimpleUploadedFile('tasks.xml', b'<tasks/>')
+        response = self.client.post(self.url, {'file': upload})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Unknown import format', response.json()['error'])
+
+    def test_import_view_requires_a_file(self):
+        self.client.login(username=self.user.username, password='Password123')
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, 400)
+
+    def test_import_view_is_for_team_members_only(self):
+        outsider = User.objects.get(username='@petrapickles')
+        self.client.login(username=outsider.username, password='Password123')
+        response = self.client.post(self.url, {'file': SimpleUploadedFile('tasks.csv', CSV.encode())})
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Task.objects.exists())
+
+    def test_command_imports_a_file_and_reports_skipped_rows(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'tasks.csv')
+            with open(path, 'w') as tasks_file:
+                tasks_file.write(CSV)
+            stdout, stderr = io.StringIO(), io.StringIO()
+            with self.assertRaisesMessage(CommandError, '3 rows were not imported.'):
+                call_command('import_tasks', path, team=self.team.id, stdout=stdout, stderr=stderr)
+        self.assertIn('Imported 2 tasks into Team Pelican.', stdout.getvalue())
+        self.assertIn('Line 6: assigned_to: Unknown users: @nobody', stderr.getvalue())
+        self.assertIn('Warning: the dashboard cache is local to each process', stderr.getvalue())
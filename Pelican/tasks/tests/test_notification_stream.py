@@ -0,0 +1,245 @@
+"""Unit tests for the real-time notification stream."""
+import asyncio
+import threading
+from datetime import timedelta
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from tasks.models import Invitation, Notification, Team, User
+from tasks.notification_stream import cancel_on_disconnect, notification_events
+from tasks.outbox import drain
+from tasks.pagination import KeysetPaginator
+from tasks.pubsub import NotificationBroker, notification_broker
+
+class NotificationBrokerTestCase(TestCase):
+    """Unit tests for the in-process notification broker."""
+
+    async def test_publish_from_another_thread_reaches_subscriber(self):
+        broker = NotificationBroker()
+        queue = broker.subscribe(1)
+        thread = threading.Thread(target=broker.publish, args=(1, {'id': 1}))
+        thread.start()
+        thread.join()
+        self.assertEqual(await asyncio.wait_for(queue.get(), 1), {'id': 1})
+
+    async def test_publish_only_reaches_the_users_subscribers(self):
+        broker = NotificationBroker()
+        queue = broker.subscribe(1)
+        broker.publish(2, {'id': 1})
+        await asyncio.sleep(0)
+        self.assertTrue(queue.empty())
+
+    async def test_full_queue_drops_payloads(self):
+        broker = NotificationBroker(queue_size=1)
+        queue = broker.subscribe(1)
+        broker.publish(1, {'id': 1})
+        broker.publish(1, {'id': 2})
+        await asyncio.sleep(0)
+        self.assertEqual(queue.qsize(), 1)
+        self.assertEqual(queue.get_nowait(), {'id': 1})
+
+    async def test_unsubscribe(self):
+        broker = NotificationBroker()
+        queue = broker.subscribe(1)
+        broker.unsubscribe(1, queue)
+        self.assertFalse(broker.has_subscribers(1))
+        self.assertEqual(broker.subscriber_count(), 0)
+
+
+class NotificationStreamTestCase(TestCase):
+    """Unit tests for the notification event stream and its view."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+    ]
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        self.other_user = User.objects.get(username='@janedoe')
+        self.team = Team.objects.create(name='Team Pelican')
+        self.url = reverse('notification_stream')
+
+    async def test_stream_starts_with_reconnect_delay(self):
+        events = notification_events(self.user.pk, broker=NotificationBroker())
+        self.assertTrue((await anext(events)).startswith('retry: '))
+        await events.aclose()
+
+    async def test_stream_catches_up_after_cursor(self):
+        old, new = await sync_to_async(self._create_notifications)(2)
+        cursor = KeysetPaginator.cursor_for(old.created_at, old.pk)
+        events = notification_events(self.user.pk, cursor, broker=NotificationBroker())
+        await anext(events)
+        event = await anext(events)
+        await events.aclose()
+        self.assertIn(f'id: {KeysetPaginator.cursor_for(new.created_at, new.pk)}\n', event)
+        self.assertIn('event: notification\n', event)
+        self.assertIn(f'"id": {new.pk}', event)
+
+    async def test_stream_without_cursor_skips_existing_notifications(self):
+        await sync_to_async(self._create_notifications)(1)
+        events = notification_events(self.user.pk, poll_interval=0.01, broker=NotificationBroker())
+        await anext(events)
+        self.assertEqual(await anext(events), ': keep-alive\n\n')
+        await events.aclose()
+
+    async def test_stream_polls_for_notifications_written_elsewhere(self):
+        events = notification_events(self.user.pk, poll_interval=0.01, broker=NotificationBroker())
+        await anext(events)
+        self.assertEqual(await anext(events), ': keep-alive\n\n')
+        notification, = await sync_to_async(self._create_notifications)(1, delay=timedelta(seconds=1))
+        event = await anext(events)
+        await events.aclose()
+        self.assertIn(f'"id": {notification.pk}', event)
+
+    async def test_stream_delivers_published_notifications_without_polling(self):
+        broker = NotificationBroker()
+        events = notification_events(self.user.pk, poll_interval=60, broker=broker)
+        await anext(events)
+        pending = asyncio.ensure_future(anext(events))
+        await asyncio.sleep(0.1)
+        notification, = await sync_to_async(self._create_notifications)(1, delay=timedelta(seconds=1))
+        broker.publish(self.user.pk, await sync_to_async(notification.event_payload)())
+        event = await asyncio.wait_for(pending, 1)
+        await events.aclose()
+        self.assertIn(f'"id": {notification.pk}', event)
+        self.assertFalse(broker.has_subscribers(self.user.pk))
+
+    async def test_stream_ends_after_max_duration_with_its_cursor(self):
+        old, = await sync_to_async(self._create_notifications)(1)
+        cursor = KeysetPaginator.cursor_for(old.created_at, old.pk)
+        events = notification_events(self.user.pk, cursor, poll_interval=60, max_duration=0.05, broker=NotificationBroker())
+        remaining = [event async for event in events]
+        self.assertEqual(remaining[-1], f'id: {cursor}\n\n')
+
+    def test_new_notification_is_published_on_commit(self):
+        with mock.patch.object(notification_broker, 'has_subscribers', return_value=True), \
+                mock.patch.object(notification_broker, 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                notification = Notification.objects.create(user=self.user, message='Hello')
+                publish.assert_not_called()
+        publish.assert_called_once_with(self.user.pk, notification.event_payload())
+
+    def test_delivered_invitations_are_published_on_commit(self):
+        with mock.patch.object(notification_broker, 'has_subscribers', return_value=True), \
+                mock.patch.object(notification_broker, 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                Invitation.objects.invite(self.user, self.team, [self.other_user.pk])
+                drain()
+        self.assertEqual(publish.call_count, 1)
+        user_id, payload = publish.call_args.args
+        self.assertEqual(user_id, self.other_user.pk)
+        self.assertEqual(payload['team'], 'Team Pelican')
+
+    async def test_stream_view_redirects_when_not_logged_in(self):
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response.url.startswith(reverse('log_in')))
+
+    def test_stream_view_is_not_served_under_wsgi(self):
+        self.client.force_login(self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 204)
+
+    async def test_dashboard_opens_the_stream_only_under_asgi(self):
+        await sync_to_async(self.client.force_login)(self.user)
+        self.assertNotContains(await sync_to_async(self.client.get)(reverse('dashboard')), 'data-stream-url')
+        self.async_client.cookies = self.client.cookies
+        response = await self.async_client.get(reverse('dashboard'))
+        self.assertContains(response, f'data-stream-url="{self.url}"')
+
+    async def test_stream_view_streams_events(self):
+        await sync_to_async(self.client.force_login)(self.user)
+        self.async_client.cookies = self.client.cookies
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        content = aiter(response.streaming_content)
+        self.assertTrue((await anext(content)).startswith(b'retry: '))
+        await content.aclose()
+
+    async def test_invitations_sent_through_the_worker_wake_a_live_stream(self):
+        await sync_to_async(self.team.members.add)(self.user)
+        await sync_to_async(self.client.force_login)(self.user)
+        # A broker of its own stands in for the web server process, which the worker cannot publish to
+        events = notification_events(self.other_user.pk, poll_interval=60, wake_interval=0.01, broker=NotificationBroker())
+        self.assertTrue((await anext(events)).startswith('retry: '))
+        pending = asyncio.ensure_future(anext(events))
+        await asyncio.sleep(0.05)
+        self.assertFalse(pending.done())
+        response = await sync_to_async(self.client.post)(
+            reverse('send_invitations', args=[self.team.id]), {'selected_users': [self.other_user.pk]}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(await sync_to_async(drain)(), (1, 0))
+        event = await asyncio.wait_for(pending, 1)
+        self.assertIn('event: notification', event)
+        self.assertIn(self.team.name, event)
+        await events.aclose()
+
+    def _create_notifications(self, count, delay=timedelta(0)):
+        notifications = [Notification.objects.create(user=self.user, message=f'Note {i}') for i in range(count)]
+        for i, notification in enumerate(notifications):
+            notification.created_at = timezone.now() + delay + timedelta(seconds=i)
+        Notification.objects.bulk_update(notifications, ['created_at'])
+        return notifications
+
+
+class CancelOnDisconnectTestCase(TestCase):
+    """Unit tests for cancelling ASGI requests whose client has gone away."""
+
+    async def test_streaming_request_is_cancelled_on_disconnect(self):
+        cancelled = asyncio.Event()
+
+        async def application(scope, receive, send):
+            self.assertEqual(await receive(), {'type': 'http.request', 'body': b'', 'more_body': False})
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        disconnected = asyncio.Event()
+        messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            await disconnected.wait()
+            return {'type': 'http.disconnect'}
+
+        request = asyncio.ensure_future(cancel_on_disconnect(application)({'type': 'http'}, receive, None))
+        await asyncio.sleep(0.01)
+        self.assertFalse(cancelled.is_set())
+        disconnected.set()
+        await asyncio.wait_for(request, 1)
+        self.assertTrue(cancelled.is_set())
+
+    async def test_completed_request_stops_listening(self):
+        async def application(scope, receive, send):
+            await send({'type': 'http.response.start'})
+
+        sent = []
+        never = asyncio.Event()
+
+        async def receive():
+            await never.wait()
+
+        async def send(message):
+            sent.append(message)
+
+        await asyncio.wait_for(cancel_on_disconnect(application)({'type': 'http'}, receive, send), 1)
+        self.assertEqual(sent, [{'type': 'http.response.start'}])
+
+    async def test_errors_are_raised(self):
+        async def application(scope, receive, send):
+            raise ValueError('Broken')
+
+        async def receive():
+            await asyncio.Event().wait()
+
+        with self.assertRaises(ValueError):
+            await cancel_on_disconnect(application)({'type': 'http'}, receive, None)
@@ -0,0 +1,124 @@
+"""Unit tests for the outbox and the notification worker."""
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from tasks.models import Invitation, Notification, OutboxMessage, Team, User
+from tasks.outbox import HANDLERS, claim_messages, drain, process_message, retry_delay
+
+@override_settings(OUTBOX_MAX_ATTEMPTS=3, OUTBOX_RETRY_DELAY=5, OUTBOX_MAX_RETRY_DELAY=60)
+class OutboxTestCase(TestCase):
+    """Unit tests for the outbox and the notification worker."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+    ]
+
+    def setUp(self):
+        self.sender = User.objects.get(username='@johndoe')
+        self.receivers = list(User.objects.exclude(pk=self.sender.pk))
+        self.team = Team.objects.create(name='Team Pelican')
+        self.invitations = Invitation.objects.invite(self.sender, self.team, [user.pk for user in self.receivers])
+        self.message = OutboxMessage.objects.get()
+
+    def test_drain_expands_message_into_notifications(self):
+        self.assertEqual(drain('worker'), (1, 0))
+        self.assertEqual(
+            set(Notification.objects.values_list('user_id', flat=True)), {user.pk for user in self.receivers}
+        )
+        self.message.refresh_from_db()
+        self.assertIsNotNone(self.message.processed_at)
+        self.assertEqual(self.message.attempts, 1)
+        self.assertEqual(drain('worker'), (0, 0))
+
+    def test_claim_holds_message_for_lease(self):
+        claimed = claim_messages('worker-1', batch_size=10, lease=60)
+        self.assertEqual(claimed, [self.message])
+        self.assertEqual(claimed[0].claimed_by, 'worker-1')
+        self.assertGreater(claimed[0].available_at, timezone.now() + timedelta(seconds=50))
+        self.assertEqual(claim_messages('worker-2', batch_size=10, lease=60), [])
+
+    def test_claim_respects_batch_size_and_order(self):
+        team = Team.objects.create(name='Second team')
+        Invitation.objects.invite(self.sender, team, [self.receivers[0].pk])
+        claimed = claim_messages('worker', batch_size=1, lease=60)
+        self.assertEqual(claimed, [self.message])
+
+    def test_expired_lease_is_claimed_again(self):
+        claim_messages('crashed-worker', batch_size=10, lease=60)
+        OutboxMessage.objects.update(available_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(drain('worker'), (1, 0))
+        self.message.refresh_from_db()
+        self.assertEqual(self.message.claimed_by, 'worker')
+        self.assertEqual(self.message.attempts, 2)
+
+    def test_redelivery_after_a_crash_does_not_duplicate_notifications(self):
+        # A worker that created the notifications but died before marking the message done
+        Invitation.objects.notify([invitation.pk for invitation in self.invitations])
+        drain('worker')
+        self.assertEqual(Notification.objects.count(), len(self.receivers))
+        for receiver in self.receivers:
+            receiver.refresh_from_db()
+            self.assertEqual(receiver.unread_notification_count, 1)
+
+    def test_lost_lease_rolls_back_the_work(self):
+        message, = claim_messages('slow-worker', batch_size=10, lease=60)
+        OutboxMessage.objects.update(available_at=timezone.now() - timedelta(seconds=1))
+        claim_messages('other-worker', batch_size=10, lease=60)
+        with self.assertLogs('tasks.outbox', 'WARNING'):
+            self.assertFalse(process_message(message, 'slow-worker'))
+        self.assertFalse(Notification.objects.exists())
+        self.message.refresh_from_db()
+        self.assertIsNone(self.message.processed_at)
+        self.assertEqual(self.message.claimed_by, 'other-worker')
+
+    def test_failure_is_retried_later(self):
+        with mock.patch.dict(HANDLERS, {OutboxMessage.INVITATION_NOTIFICATIONS: self._fail}), \
+                self.assertLogs('tasks.outbox', 'ERROR'):
+            self.assertEqual(drain('worker'), (0, 1))
+        self.message.refresh_from_db()
+        self.assertIsNone(self.message.processed_at)
+        self.assertIsNone(self.message.failed_at)
+        self.assertEqual(self.message.last_error, 'RuntimeError: boom')
+        self.assertGreater(self.message.available_at, timezone.now())
+        self.assertFalse(Notification.objects.exists())
+        OutboxMessage.objects.update(available_at=timezone.now())
+        self.assertEqual(drain('worker'), (1, 0))
+        self.assertEqual(Notification.objects.count(), len(self.receivers))
+
+    def test_message_fails_after_max_attempts(self):
+        with mock.patch.dict(HANDLERS, {OutboxMessage.INVITATION_NOTIFICATIONS: self._fail}), \
+                self.assertLogs('tasks.outbox', 'ERROR'):
+            for _ in range(3):
+                OutboxMessage.objects.update(available_at=timezone.now())
+                drain('worker')
+        self.message.refresh_from_db()
+        self.assertIsNotNone(self.message.failed_at)
+        self.assertEqual(self.message.attempts, 3)
+        OutboxMessage.objects.update(available_at=timezone.now())
+        self.assertEqual(claim_messages('worker', batch_size=10, lease=60), [])
+
+    def test_retry_delay_backs_off_up_to_a_limit(self):
+        self.assertEqual([retry_delay(attempts) for attempts in range(1, 6)], [5, 10, 20, 40, 60])
+
+    def test_notification_worker_command_once(self):
+        out = StringIO()
+        with tempfile.TemporaryDirectory() as directory:
+            shared_cache = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory}}
+            with override_settings(CACHES=shared_cache):
+                call_command('notification_worker', '--once', stdout=out)
+        self.assertIn('Handled 1 outbox messages, 0 failed.', out.getvalue())
+        self.assertEqual(Notification.objects.count(), len(self.receivers))
+
+    def test_notification_worker_command_requires_a_shared_cache(self):
+        with self.assertRaisesMessage(CommandError, 'Point DASHBOARD_CACHE_ALIAS at a shared cache.'):
+            call_command('notification_worker', '--once', stdout=StringIO())
+        self.assertFalse(Notification.objects.exists())
+
+    def _fail(self, payload):
+        raise RuntimeError('boom')
@@ -0,0 +1,55 @@
+"""Unit tests for keyset pagination."""
+from datetime import date, timedelta
+from django.test import TestCase
+from tasks.models import Task, Team
+from tasks.pagination import InvalidCursor, KeysetPaginator
+
+class KeysetPaginatorTestCase(TestCase):
+    """Unit tests for keyset pagination."""
+
+    def setUp(self):
+        team = Team.objects.create(name='Team Pelican')
+        # Two tasks share every due date so the id tie-breaker is exercised.
+        self.tasks = [
+            Task.objects.create(description=f'Task {i}', due_date=date(2024, 1, 1) + timedelta(days=i // 2), team=team)
+            for i in range(7)
+        ]
+        self.paginator = KeysetPaginator(Task.objects.all(), 'due_date', per_page=3)
+
+    def test_first_page(self):
+        page = self.paginator.page()
+        self.assertEqual(page.items, self.tasks[:3])
+        self.assertTrue(page.has_next)
+
+    def test_pages_cover_every_row_once(self):
+        seen = []
+        cursor = None
+        while True:
+            page = self.paginator.page(cursor)
+            seen += page.items
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        self.assertEqual(seen, self.tasks)
+
+    def test_descending_pages(self):
+        paginator = KeysetPaginator(Task.objects.all(), 'due_date', per_page=4, descending=True)
+        first_page = paginator.page()
+        second_page = paginator.page(first_page.next_cursor)
+        self.assertEqual(first_page.items + second_page.items, self.tasks[::-1])
+        self.assertFalse(second_page.has_next)
+
+    def test_later_pages_do_not_use_offset(self):
+        cursor = self.paginator.page().next_cursor
+        with self.assertNumQueries(1) as context:
+            self.paginator.page(cursor)
+        self.assertNotIn('OFFSET', context.captured_queries[0]['sql'])
+
+    def test_exact_last_page_has_no_next(self):
+        paginator = KeysetPaginator(Task.objects.all(), 'due_date', per_page=7)
+        self.assertFalse(paginator.page().has_next)
+
+    def test_invalid_cursor(self):
+        for cursor in ['!!!', 'bm90LWEtY3Vyc29y', 'MjAyNC0xMy0wMXwx']:
+            with self.assertRaises(InvalidCursor):
+                self.paginator.page(cursor)
@@ -0,0 +1,63 @@
+"""Unit tests for the password hasher profiles."""
+from unittest import mock
+from django.contrib.auth.hashers import get_hasher, identify_hasher, make_password
+from django.test import TestCase, override_settings
+from task_manager.password_hashers import LEGACY_HASHERS, password_hashers
+from task_manager.runner import test_settings
+from tasks.models import User
+
+class PasswordHashersTestCase(TestCase):
+    """Unit tests for the password hasher profiles."""
+
+    fixtures = ['tasks/tests/fixtures/default_user.json']
+
+    def test_production_profile_prefers_argon2_when_installed(self):
+        with mock.patch('task_manager.password_hashers.find_spec', return_value=object()):
+            hashers = password_hashers('production')
+        self.assertEqual(hashers[0], 'django.contrib.auth.hashers.Argon2PasswordHasher')
+
+    def test_production_profile_falls_back_to_scrypt(self):
+        with mock.patch('task_manager.password_hashers.find_spec', return_value=None):
+            hashers = password_hashers('production')
+        self.assertEqual(hashers[0], 'django.contrib.auth.hashers.ScryptPasswordHasher')
+
+    def test_production_profile_verifies_legacy_hashes_but_not_fast_ones(self):
+        hashers = password_hashers('production')
+        for legacy_hasher in LEGACY_HASHERS:
+            self.assertIn(legacy_hasher, hashers)
+        self.assertNotIn('task_manager.password_hashers.FastPasswordHasher', hashers)
+
+    def test_fast_profile_hashes_with_md5_and_verifies_everything_else(self):
+        hashers = password_hashers('fast')
+        self.assertEqual(hashers[0], 'task_manager.password_hashers.FastPasswordHasher')
+        self.assertEqual(hashers[1:], password_hashers('production'))
+        with override_settings(PASSWORD_HASHERS=hashers):
+            self.assertTrue(make_password('Password123').startswith('md5$'))
+
+    def test_unknown_profile(self):
+        with self.assertRaises(ValueError):
+            password_hashers('quick')
+
+    def test_test_runner_uses_the_fast_profile_unless_the_environment_sets_one(self):
+        self.assertEqual(test_settings({})['PASSWORD_HASHERS'], password_hashers('fast'))
+        self.assertNotIn('PASSWORD_HASHERS', test_settings({'PASSWORD_HASHER_PROFILE': 'production'}))
+
+    @override_settings(PASSWORD_HASHERS=password_hashers('fast'))
+    def test_fast_profile_does_not_downgrade_stronger_hashes_at_login(self):
+        for hasher in password_hashers('production'):
+            with self.subTest(hasher=hasher):
+                with override_settings(PASSWORD_HASHERS=[hasher]):
+                    password = make_password('Password123')
+                User.objects.filter(username='@johndoe').update(password=password)
+                self.assertTrue(self.client.login(username='@johndoe', password='Password123'))
+                self.assertEqual(User.objects.get(username='@johndoe').password, password)
+
+    @override_settings(PASSWORD_HASHERS=password_hashers('production'))
+    def test_legacy_hash_is_upgraded_at_login(self):
+        with override_settings(PASSWORD_HASHERS=LEGACY_HASHERS):
+            legacy_password = make_password('Password123')
+        User.objects.filter(username='@johndoe').update(password=legacy_password)
+        self.assertTrue(self.client.login(username='@johndoe', password='Password123'))
+        upgraded_password = User.objects.get(username='@johndoe').password
+        self.assertEqual(identify_hasher(upgraded_password).algorithm, get_hasher().algorithm)
+        self.assertNotEqual(identify_hasher(legacy_password).algorithm, get_hasher().algorithm)
@@ -0,0 +1,71 @@
+"""Unit tests for the request metrics middleware and endpoint."""
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from tasks.request_metrics import percentile, request_metrics_summary, reset_request_metrics
+from tasks.models import User
+
+@override_settings(REQUEST_METRICS_ENABLED=True)
+class RequestMetricsTestCase(TestCase):
+    """Unit tests for the request metrics middleware and endpoint."""
+
+    fixtures = ['tasks/tests/fixtures/default_user.json']
+
+    def setUp(self):
+        cache.clear()
+        reset_request_metrics()
+        self.user = User.objects.get(username='@johndoe')
+        self.client.login(username=self.user.username, password='Password123')
+
+    def test_response_has_server_timing_header(self):
+        response = self.client.get(reverse('dashboard'))
+        timing = response['Server-Timing']
+        self.assertRegex(timing, r'^db;dur=[\d.]+;desc="\d+ queries", tpl;dur=[\d.]+, total;dur=[\d.]+$')
+
+    def test_requests_are_recorded_per_url_name(self):
+        self.client.get(reverse('dashboard'))
+        self.client.get(reverse('dashboard'))
+        self.client.get(reverse('user_search'), {'q': 'john'})
+        summary = request_metrics_summary()
+        self.assertEqual(summary['dashboard']['count'], 2)
+        self.assertEqual(summary['user_search']['count'], 1)
+        self.assertGreater(summary['dashboard']['template_ms']['max'], 0)
+        self.assertEqual(sum(summary['dashboard']['total_ms_histogram'].values()), 2)
+
+    def test_query_count_matches_the_queries_run(self):
+        with self.assertNumQueries(5):
+            self.client.get(reverse('dashboard'))
+        self.assertEqual(request_metrics_summary()['dashboard']['queries']['max'], 5)
+
+    @override_settings(REQUEST_METRICS_BUDGETS={'dashboard': {'queries': 1}})
+    def test_exceeding_a_budget_logs_a_warning(self):
+        with self.assertLogs('tasks.request_metrics', 'WARNING') as logs:
+            self.client.get(reverse('dashboard'))
+        self.assertIn('dashboard exceeded its queries budget: 5 > 1', logs.output[0])
+
+    def test_staying_within_budget_logs_nothing(self):
+        with self.assertNoLogs('tasks.request_metrics', 'WARNING'):
+            self.client.get(reverse('dashboard'))
+
+    def test_metrics_endpoint_is_staff_only(self):
+        response = self.client.get(reverse('request_metrics'))
+        self.assertEqual(response.status_code, 302)
+        User.objects.filter(pk=self.user.pk).update(is_staff=True)
+        self.client.get(reverse('dashboard'))
+        response = self.client.get(reverse('request_metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('dashboard', response.json()['views'])
+        self.assertIn('teams', response.json()['fragment_cache'])
+        self.assertIn('shed', response.json()['login_throttle'])
+        self.assertIn('databases', response.json()['connections'])
+
+    @override_settings(REQUEST_METRICS_ENABLED=False)
+    def test_disabled_middleware_records_nothing(self):
+        response = self.client_class().get(reverse('home'))
+        self.assertNotIn('Server-Timing', response)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile([7], 99), 7)
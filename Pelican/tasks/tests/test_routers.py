@@ -0,0 +1,91 @@
+"""Unit tests for the read replica router and middleware."""
+from datetime import date
+from unittest import mock
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, router
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from tasks.models import Task, Team, User
+from tasks.routers import finish_request, primary_reads, start_request
+from tasks.tests.helpers import sync_replica
+
+@override_settings(READ_REPLICA_ENABLED=True, READ_YOUR_WRITES_WINDOW=10)
+class ReadReplicaTestCase(TransactionTestCase):
+    """Unit tests for the read replica router and middleware."""
+
+    databases = {'default', 'replica'}
+    fixtures = ['tasks/tests/fixtures/default_user.json']
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.get(username='@johndoe')
+        self.team = Team.objects.create(name='Team Pelican')
+        self.team.members.add(self.user)
+        self.url = reverse('team_detail', args=[self.team.id])
+        self.client.login(username=self.user.username, password='Password123')
+        sync_replica()
+        # A change the replica has not caught up with yet
+        Team.objects.filter(pk=self.team.pk).update(name='Team Heron')
+
+    def test_listed_views_read_from_the_replica(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['team'].name, 'Team Pelican')
+
+    @override_settings(READ_REPLICA_VIEWS=('dashboard',))
+    def test_other_views_read_from_the_default_database(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['team'].name, 'Team Heron')
+
+    @override_settings(READ_REPLICA_ENABLED=False)
+    def test_disabled_replica_is_never_read(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['team'].name, 'Team Heron')
+
+    def test_writes_go_to_the_default_database(self):
+        form_input = {'description': 'Plan sprint', 'due_date': date.today().isoformat(), 'assigned_to': [self.user.id]}
+        self.client.post(self.url, form_input)
+        self.assertTrue(Task.objects.using(DEFAULT_DB_ALIAS).filter(description='Plan sprint').exists())
+        self.assertFalse(Task.objects.using('replica').filter(description='Plan sprint').exists())
+
+    def test_users_read_their_writes_until_the_window_ends(self):
+        form_input = {'description': 'Plan sprint', 'due_date': date.today().isoformat(), 'assigned_to': [self.user.id]}
+        with mock.patch('tasks.middleware.time.time', return_value=1000.0):
+            self.client.post(self.url, form_input)
+        with mock.patch('tasks.routers.time.time', return_value=1009.0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.context['team'].name, 'Team Heron')
+        self.assertContains(response, 'Plan sprint')
+        with mock.patch('tasks.routers.time.time', return_value=1011.0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.context['team'].name, 'Team Pelican')
+
+    def test_dashboard_fragments_are_rendered_from_the_default_database(self):
+        response = self.client.get(reverse('dashboard'))
+        self.assertContains(response, 'Team Heron')
+        self.assertNotContains(response, 'Team Pelican')
+
+    def test_primary_reads_go_to_the_default_database(self):
+        state, token = start_request(use_replica=True)
+        try:
+            with primary_reads():
+                self.assertEqual(router.db_for_read(Team), DEFAULT_DB_ALIAS)
+            self.assertEqual(router.db_for_read(Team), 'replica')
+        finally:
+            finish_request(token)
+
+    def test_reads_go_to_the_default_database_outside_requests(self):
+        self.assertEqual(router.db_for_read(Team), DEFAULT_DB_ALIAS)
+
+    def test_reads_after_a_write_in_the_same_request_go_to_the_default_database(self):
+        state, token = start_request(use_replica=True)
+        try:
+            self.assertEqual(router.db_for_read(Team), 'replica')
+            self.assertEqual(router.db_for_write(Team), DEFAULT_DB_ALIAS)
+            self.assertTrue(state.wrote)
+            self.assertEqual(router.db_for_read(Team), DEFAULT_DB_ALIAS)
+        finally:
+            finish_request(token)
+
+    def test_replica_is_never_migrated(self):
+        self.assertFalse(router.allow_migrate('replica', 'tasks'))
+        self.assertTrue(router.allow_migrate(DEFAULT_DB_ALIAS, 'tasks'))
@@ -0,0 +1,60 @@
+"""Unit tests for the full-text user search."""
+from unittest import mock
+from django.test import TestCase
+from tasks.models import User
+from tasks.search import build_match_query, search_users
+
+class UserSearchTestCase(TestCase):
+    """Unit tests for the full-text user search."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+    ]
+
+    def test_build_match_query_matches_each_word_as_prefix(self):
+        self.assertEqual(build_match_query('@pet pick'), '"pet"* "pick"*')
+
+    def test_build_match_query_drops_query_syntax(self):
+        self.assertEqual(build_match_query('"pet" OR (pick*'), '"pet"* "OR"* "pick"*')
+
+    def test_search_matches_username_prefix(self):
+        self.assertEqual(self._usernames('@pet'), ['@petrapickles', '@peterpickles'])
+
+    def test_search_matches_names(self):
+        self.assertEqual(self._usernames('pickles'), ['@petrapickles', '@peterpickles'])
+        self.assertEqual(self._usernames('jan'), ['@janedoe'])
+
+    def test_search_requires_every_word(self):
+        self.assertEqual(self._usernames('peter pick'), ['@peterpickles'])
+
+    def test_search_ranks_username_matches_first(self):
+        User.objects.create_user('@doering', email='doering@example.org', first_name='Ann', last_name='Smith')
+        self.assertEqual(self._usernames('doe')[0], '@doering')
+
+    def test_search_is_limited(self):
+        self.assertEqual(len(search_users('doe', limit=1)), 1)
+
+    def test_search_without_words_returns_nothing(self):
+        self.assertEqual(search_users(''), [])
+        self.assertEqual(search_users('@ !'), [])
+
+    def test_index_follows_updates_and_deletes(self):
+        user = User.objects.get(username='@janedoe')
+        user.first_name = 'Janet'
+        user.save()
+        self.assertEqual(self._usernames('janet'), ['@janedoe'])
+        user.delete()
+        self.assertEqual(self._usernames('jan'), [])
+
+    def test_search_issues_one_query(self):
+        with self.assertNumQueries(1):
+            search_users('doe')
+
+    def test_search_without_fts5_matches_substrings(self):
+        with mock.patch('tasks.search.sqlite_has_fts5', return_value=False):
+            self.assertEqual(set(self._usernames('pick')), {'@petrapickles', '@peterpickles'})
+            self.assertEqual(self._usernames('peter pick'), ['@peterpickles'])
+
+    def _usernames(self, search_term):
+        return [user.username for user in search_users(search_term)]
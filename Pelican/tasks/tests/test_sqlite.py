@@ -0,0 +1,46 @@
+"""Unit tests for the SQLite connection pragmas."""
+import os
+import sqlite3
+import tempfile
+from types import SimpleNamespace
+from django.db import connection
+from django.test import TestCase, override_settings
+from tasks.sqlite import tune_sqlite_connection
+
+class SQLitePragmasTestCase(TestCase):
+    """Unit tests for the SQLite connection pragmas."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.sqlite_connection = sqlite3.connect(os.path.join(self.directory.name, 'test.sqlite3'))
+
+    def tearDown(self):
+        self.sqlite_connection.close()
+        self.directory.cleanup()
+
+    def _pragma(self, name):
+        return self.sqlite_connection.execute(f'PRAGMA {name}').fetchone()[0]
+
+    def test_pragmas_are_applied_to_django_connections(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 5000)
+
+    def test_pragmas_are_applied_to_new_sqlite_connections(self):
+        tune_sqlite_connection(sender=None, connection=SimpleNamespace(vendor='sqlite', connection=self.sqlite_connection))
+        self.assertEqual(self._pragma('journal_mode'), 'wal')
+        self.assertEqual(self._pragma('synchronous'), 1)
+        self.assertEqual(self._pragma('busy_timeout'), 5000)
+        self.assertEqual(self._pragma('mmap_size'), 256 * 1024 * 1024)
+        self.assertEqual(self._pragma('cache_size'), -20000)
+        self.assertEqual(self._pragma('temp_store'), 2)
+
+    @override_settings(SQLITE_PRAGMAS={'busy_timeout': 1234})
+    def test_pragmas_come_from_settings(self):
+        tune_sqlite_connection(sender=None, connection=SimpleNamespace(vendor='sqlite', connection=self.sqlite_connection))
+        self.assertEqual(self._pragma('busy_timeout'), 1234)
+        self.assertEqual(self._pragma('journal_mode'), 'delete')
+
+    def test_other_databases_are_left_alone(self):
+        tune_sqlite_connection(sender=None, connection=SimpleNamespace(vendor='postgresql', connection=self.sqlite_connection))
+        self.assertEqual(self._pragma('journal_mode'), 'delete')
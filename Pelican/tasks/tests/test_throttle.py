@@ -0,0 +1,99 @@
+"""Unit tests for login throttling."""
+import tempfile
+from unittest import mock
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from tasks.models import User
+from tasks.throttle import login_throttle_stats, reset_login_throttle, reset_login_throttle_stats, throttle_login
+
+BUCKETS = {
+    'ip': {'capacity': 5, 'refill_rate': 1},
+    'username': {'capacity': 3, 'refill_rate': 0.1},
+}
+
+@override_settings(LOGIN_THROTTLE_BUCKETS=BUCKETS)
+class LoginThrottleTestCase(TestCase):
+    """Unit tests for login throttling."""
+
+    fixtures = ['tasks/tests/fixtures/default_user.json']
+
+    def setUp(self):
+        cache.clear()
+        reset_login_throttle_stats()
+        self.url = reverse('log_in')
+        self.user = User.objects.get(username='@johndoe')
+
+    def test_username_bucket_sheds_attempts_over_its_capacity(self):
+        with mock.patch('tasks.throttle.time.time', return_value=1000.0):
+            for _ in range(3):
+                self.assertIsNone(throttle_login('10.0.0.1', '@johndoe'))
+            self.assertEqual(throttle_login('10.0.0.2', '@JohnDoe'), 10)
+            self.assertIsNone(throttle_login('10.0.0.2', '@janedoe'))
+
+    def test_ip_bucket_sheds_attempts_over_its_capacity(self):
+        with mock.patch('tasks.throttle.time.time', return_value=1000.0):
+            for number in range(5):
+                self.assertIsNone(throttle_login('10.0.0.1', f'@user{number}'))
+            self.assertEqual(throttle_login('10.0.0.1', '@another'), 1)
+            self.assertIsNone(throttle_login('10.0.0.2', '@another'))
+
+    def test_buckets_refill_over_time(self):
+        with mock.patch('tasks.throttle.time.time', return_value=1000.0):
+            for _ in range(3):
+                throttle_login('10.0.0.1', '@johndoe')
+            self.assertIsNotNone(throttle_login('10.0.0.1', '@johndoe'))
+        with mock.patch('tasks.throttle.time.time', return_value=1010.0):
+            self.assertIsNone(throttle_login('10.0.0.1', '@johndoe'))
+            self.assertIsNotNone(throttle_login('10.0.0.1', '@johndoe'))
+
+    def test_shed_attempts_take_no_tokens(self):
+        with mock.patch('tasks.throttle.time.time', return_value=1000.0):
+            for _ in range(3):
+                throttle_login('10.0.0.1', '@johndoe')
+            for _ in range(10):
+                throttle_login('10.0.0.1', '@johndoe')
+            self.assertIsNone(throttle_login('10.0.0.1', '@janedoe'))
+
+    def test_reset_refills_buckets(self):
+        for _ in range(3):
+            throttle_login('10.0.0.1', '@johndoe')
+        reset_login_throttle('10.0.0.1', '@johndoe')
+        self.assertIsNone(throttle_login('10.0.0.1', '@johndoe'))
+
+    def test_stats_count_allowed_and_shed_attempts(self):
+        with mock.patch('tasks.throttle.time.time', return_value=1000.0):
+            for _ in range(5):
+                throttle_login('10.0.0.1', '@johndoe')
+        self.assertEqual(login_throttle_stats(), {'allowed': 3, 'shed': {'ip': 0, 'username': 2}})
+        reset_login_throttle_stats()
+        self.assertEqual(login_throttle_stats(), {'allowed': 0, 'shed': {'ip': 0, 'username': 0}})
+
+    def test_throttled_login_returns_429_without_authenticating(self):
+        for _ in range(3):
+            self.client.post(self.url, {'username': '@johndoe', 'password': 'WrongPassword123'})
+        with mock.patch('tasks.forms.authenticate') as authenticate:
+            response = self.client.post(self.url, {'username': '@johndoe', 'password': 'Password123'})
+        authenticate.assert_not_called()
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+        self.assertTemplateUsed(response, 'log_in.html')
+        self.assertNotIn('_auth_user_id', self.client.session)
+        messages_list = list(response.context['messages'])
+        self.assertIn('Too many login attempts', str(messages_list[0]))
+
+    def test_logins_within_the_limit_succeed(self):
+        response = self.client.post(self.url, {'username': '@johndoe', 'password': 'Password123'})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(login_throttle_stats()['allowed'], 1)
+
+    def test_file_based_cache_backend(self):
+        with tempfile.TemporaryDirectory() as location:
+            caches = {
+                'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+                'throttle': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location},
+            }
+            with override_settings(CACHES=caches, LOGIN_THROTTLE_CACHE_ALIAS='throttle'):
+                for _ in range(3):
+                    self.assertIsNone(throttle_login('10.0.0.1', '@johndoe'))
+                self.assertIsNotNone(throttle_login('10.0.0.1', '@johndoe'))
@@ -0,0 +1,60 @@
+"""Unit tests for the batched unseed command."""
+import io
+from datetime import date
+from django.core.management import call_command
+from django.test import TestCase
+from tasks.management.commands.unseed import Command, deletion_plan
+from tasks.models import Invitation, Notification, Task, Team, User
+
+class UnseedTestCase(TestCase):
+    """Unit tests for the batched unseed command."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+    ]
+
+    def setUp(self):
+        self.staff = User.objects.get(username='@johndoe')
+        User.objects.filter(pk=self.staff.pk).update(is_staff=True)
+        self.sender = User.objects.get(username='@janedoe')
+        self.team = Team.objects.create(name='Team Pelican')
+        self.team.members.add(*User.objects.all())
+        task = Task.objects.create(description='Report', due_date=date(2030, 1, 5), team=self.team)
+        task.assigned_to.add(self.staff, self.sender)
+        invitation = Invitation.objects.create(sender=self.sender, receiver=self.staff, team=self.team)
+        Notification.objects.create(user=self.staff, message='Invited', invitation=invitation)
+        Notification.objects.create(user=self.staff, message='Hello')
+        Notification.objects.create(user=self.sender, message='Hello')
+
+    def test_deletion_plan_deletes_dependents_first(self):
+        plan = deletion_plan(User, User.objects.filter(is_staff=False))
+        models = [model for model, _ in plan]
+        self.assertEqual(plan[-1][0], User)
+        for dependent, model in [(Notification, Invitation), (Invitation, User), (Notification, User)]:
+            self.assertLess(models.index(dependent), models.index(model))
+        self.assertIn(Task.assigned_to.through, models)
+        self.assertIn(Team.members.through, models)
+        self.assertNotIn(Team, models)
+
+    def test_batched_unseed_removes_non_staff_users_and_their_data(self):
+        call_command('unseed', '--batched', '--batch-size', '1', stdout=io.StringIO())
+        self._assert_unseeded()
+
+    def test_interrupted_batched_unseed_can_be_restarted(self):
+        plan = deletion_plan(User, User.objects.filter(is_staff=False))
+        command = Command(stdout=io.StringIO())
+        # Stop after the invitations, and with them the staff user's invitation notification, are gone
+        for model, queryset in plan[:[model for model, _ in plan].index(Invitation) + 1]:
+            command.delete_in_batches(model, queryset, batch_size=1)
+        self.assertFalse(Invitation.objects.exists())
+        self.assertTrue(User.objects.filter(is_staff=False).exists())
+        call_command('unseed', '--batched', stdout=io.StringIO())
+        self._assert_unseeded()
+
+    def _assert_unseeded(self):
+        self.assertEqual(list(User.objects.all()), [self.staff])
+        self.assertEqual(list(Notification.objects.values_list('message', flat=True)), ['Hello'])
+        self.assertEqual(User.objects.get(pk=self.staff.pk).unread_notification_count, 1)
+        self.assertEqual(Team.objects.get(pk=self.team.pk).member_count, 1)
+        self.assertEqual(list(Task.objects.get().assigned_to.all()), [self.staff])
@@ -0,0 +1,148 @@
+"""Tests of the dashboard view."""
+from datetime import date, timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from tasks.models import Invitation, Notification, Task, Team, User
+
+class DashboardViewTestCase(TestCase):
+    """Tests of the dashboard view."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+    ]
+
+    # Session, user, tasks, teams and notifications.
+    QUERY_BUDGET = 5
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('dashboard')
+        self.user = User.objects.get(username='@johndoe')
+        self.other_user = User.objects.get(username='@janedoe')
+        self.client.login(username=self.user.username, password='Password123')
+
+    def test_dashboard_url(self):
+        self.assertEqual(self.url, '/dashboard/')
+
+    def test_get_dashboard_redirects_when_not_logged_in(self):
+        self.client.logout()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+
+    def test_get_dashboard_lists_teams_tasks_and_notifications(self):
+        self._create_dashboard_rows(count=3)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'dashboard.html')
+        self.assertContains(response, 'Team 0')
+        self.assertContains(response, 'Task 2 - Due:')
+        self.assertContains(response, 'Invitation to join Team: Team 1')
+        self.assertContains(response, 'class="assigned-user"', count=3)
+
+    def test_get_dashboard_shows_team_statistics(self):
+        self._create_dashboard_rows(count=1)
+        response = self.client.get(self.url)
+        today = date.today()
+        self.assertIn(f'1 member &middot; 1 task &middot; next due {today.day} {today:%b %Y}', self._text(response))
+
+    def test_get_dashboard_shows_team_statistics_after_they_change(self):
+        team = Team.objects.create(name='Team Pelican')
+        team.members.add(self.user)
+        self.assertIn('1 member &middot; 0 tasks', self._text(self.client.get(self.url)))
+        with self.captureOnCommitCallbacks(execute=True):
+            team.members.add(self.other_user)
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.create(description='Report', due_date=date(2030, 1, 5), team=team)
+        self.assertIn('2 members &middot; 1 task &middot; next due 5 Jan 2030', self._text(self.client.get(self.url)))
+
+    def test_get_dashboard_does_not_list_other_users_tasks(self):
+        team = Team.objects.create(name='Other team')
+        task = Task.objects.create(description='Not mine', due_date=date.today(), team=team)
+        task.assigned_to.add(self.other_user)
+        response = self.client.get(self.url)
+        self.assertNotContains(response, 'Not mine')
+
+    def test_get_dashboard_query_count_is_constant(self):
+        self._create_dashboard_rows(count=5)
+        with self.assertNumQueries(self.QUERY_BUDGET):
+            self.client.get(self.url)
+        self._create_dashboard_rows(count=50, start=5)
+        with self.assertNumQueries(self.QUERY_BUDGET):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.context['user_tasks']), settings.FEED_PAGE_SIZE)
+        self.assertEqual(len(response.context['user_notifications']), settings.FEED_PAGE_SIZE)
+
+    def test_get_dashboard_serves_unchanged_blocks_from_cache(self):
+        self._create_dashboard_rows(count=3)
+        first_response = self.client.get(self.url)
+        # Only the session and the user are loaded once every block is cached.
+        with self.assertNumQueries(2):
+            second_response = self.client.get(self.url)
+        self.assertEqual(second_response.context['fragments'], first_response.context['fragments'])
+
+    def test_get_dashboard_rerenders_blocks_after_changes(self):
+        self.client.get(self.url)
+        self._create_dashboard_rows(count=1)
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Team 0')
+        self.assertContains(response, 'Task 0 - Due:')
+        self.assertContains(response, 'Invitation to join Team: Team 0')
+
+    @override_settings(FEED_PAGE_SIZE=2)
+    def test_get_dashboard_links_to_next_pages(self):
+        self._create_dashboard_rows(count=3)
+        response = self.client.get(self.url)
+        user_tasks = response.context['user_tasks']
+        user_notifications = response.context['user_notifications']
+        self.assertEqual([task.description for task in user_tasks], ['Task 0', 'Task 1'])
+        self.assertContains(response, f'{reverse("dashboard_tasks")}?after={user_tasks.next_cursor}')
+        self.assertContains(response, f'{reverse("dashboard_notifications")}?after={user_notifications.next_cursor}')
+
+    @override_settings(FEED_PAGE_SIZE=2)
+    def test_get_dashboard_tasks_walks_every_page(self):
+        self._create_dashboard_rows(count=5)
+        descriptions = []
+        url = reverse('dashboard_tasks')
+        while url:
+            with self.assertNumQueries(3):
+                response = self.client.get(url)
+            self.assertTemplateUsed(response, 'partials/user_task_items.html')
+            user_tasks = response.context['user_tasks']
+            descriptions += [task.description for task in user_tasks]
+            url = user_tasks.has_next and f'{reverse("dashboard_tasks")}?after={user_tasks.next_cursor}'
+        self.assertEqual(descriptions, [f'Task {i}' for i in range(5)])
+
+    @override_settings(FEED_PAGE_SIZE=2)
+    def test_get_dashboard_notifications_pages_newest_first(self):
+        self._create_dashboard_rows(count=3)
+        first_page = self.client.get(reverse('dashboard_notifications')).context['user_notifications']
+        url = f'{reverse("dashboard_notifications")}?after={first_page.next_cursor}'
+        second_page = self.client.get(url).context['user_notifications']
+        teams = [notification.invitation.team.name for notification in [*first_page, *second_page]]
+        self.assertEqual(teams, ['Team 2', 'Team 1', 'Team 0'])
+        self.assertFalse(second_page.has_next)
+
+    def test_get_dashboard_tasks_with_invalid_cursor(self):
+        response = self.client.get(f'{reverse("dashboard_tasks")}?after=not-a-cursor')
+        self.assertEqual(response.status_code, 404)
+
+    def _text(self, response):
+        """Return the response's content with runs of whitespace collapsed, so template indentation does not matter."""
+        self.assertEqual(response.status_code, 200)
+        return ' '.join(response.content.decode().split())
+
+    def _create_dashboard_rows(self, count, start=0):
+        for i in range(start, start + count):
+            team = Team.objects.create(name=f'Team {i}')
+            team.members.add(self.user)
+            task = Task.objects.create(
+                description=f'Task {i}',
+                due_date=date.today() + timedelta(days=i),
+                team=team,
+            )
+            task.assigned_to.add(self.user, self.other_user)
+            invitation = Invitation.objects.create(sender=self.other_user, receiver=self.user, team=team)
+            Notification.objects.create(user=self.user, message='Click here to join ', invitation=invitation)
@@ -1,5 +1,6 @@
 """Tests of the log in view."""
 from django.contrib import messages
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 from tasks.forms import LogInForm
@@ -12,6 +13,7 @@ class LogInViewTestCase(TestCase, LogInTester, MenuTesterMixin):
     fixtures = ['tasks/tests/fixtures/default_user.json']
 
     def setUp(self):
+        cache.clear()
         self.url = reverse('log_in')
         self.user = User.objects.get(username='@johndoe')
 
@@ -0,0 +1,65 @@
+"""Tests of the unread notification count, mark as read and confirm invitation views."""
+from django.test import TestCase
+from django.urls import reverse
+from tasks.models import Invitation, Notification, Team, User
+from tasks.outbox import drain
+
+class NotificationViewsTestCase(TestCase):
+    """Tests of the unread notification count, mark as read and confirm invitation views."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+    ]
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        self.sender = User.objects.get(username='@janedoe')
+        self.team = Team.objects.create(name='Team Pelican')
+        self.invitation, = Invitation.objects.invite(self.sender, self.team, [self.user.pk])
+        drain()
+        Notification.objects.create(user=self.user, message='Hello')
+        self.client.login(username=self.user.username, password='Password123')
+
+    def test_unread_notifications_url(self):
+        self.assertEqual(reverse('unread_notifications'), '/notifications/unread/')
+
+    def test_unread_notifications_is_answered_from_the_user_row(self):
+        # One query loads the session and one the user, which carries the count
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('unread_notifications'))
+        self.assertEqual(response.json(), {'unread': 2})
+
+    def test_unread_notifications_redirects_when_not_logged_in(self):
+        self.client.logout()
+        response = self.client.get(reverse('unread_notifications'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_mark_notifications_read(self):
+        response = self.client.post(reverse('mark_notifications_read'))
+        self.assertRedirects(response, reverse('dashboard'), status_code=302, target_status_code=200)
+        self.assertEqual(self.client.get(reverse('unread_notifications')).json(), {'unread': 0})
+        self.assertFalse(Notification.objects.unread().filter(user=self.user).exists())
+
+    def test_get_mark_notifications_read_changes_nothing(self):
+        self.client.get(reverse('mark_notifications_read'))
+        self.assertEqual(Notification.objects.unread().filter(user=self.user).count(), 2)
+
+    def test_dashboard_shows_badge_and_mark_read_button(self):
+        response = self.client.get(reverse('dashboard'))
+        self.assertContains(response, 'id="unread-notifications-badge"')
+        self.assertContains(response, 'Mark all as read')
+
+    def test_confirming_invitation_deletes_notification_and_decrements_counter(self):
+        url = reverse('confirm_invitation', args=[self.invitation.pk])
+        response = self.client.post(url, {'accept': ''})
+        self.assertRedirects(response, reverse('dashboard'), status_code=302, target_status_code=200)
+        self.assertFalse(Notification.objects.filter(invitation=self.invitation).exists())
+        self.assertEqual(self.client.get(reverse('unread_notifications')).json(), {'unread': 1})
+        self.assertTrue(self.team.members.filter(pk=self.user.pk).exists())
+
+    def test_confirming_invitation_without_notification_rolls_back(self):
+        Notification.objects.filter(invitation=self.invitation).delete()
+        response = self.client.post(reverse('confirm_invitation', args=[self.invitation.pk]), {'accept': ''})
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(self.team.members.filter(pk=self.user.pk).exists())
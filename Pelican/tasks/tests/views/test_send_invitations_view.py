@@ -0,0 +1,72 @@
+"""Tests of the send invitations view."""
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from tasks.models import Invitation, Notification, OutboxMessage, Team, User
+from tasks.outbox import drain
+
+class SendInvitationsViewTestCase(TestCase):
+    """Tests of the send invitations view."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+    ]
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        self.team = Team.objects.create(name='Team Pelican')
+        self.team.members.add(self.user)
+        self.url = reverse('send_invitations', args=[self.team.id])
+        self.invitees = list(User.objects.exclude(pk=self.user.pk))
+        self.client.login(username=self.user.username, password='Password123')
+
+    def test_send_invitations_url(self):
+        self.assertEqual(self.url, f'/team/{self.team.id}/invite/send/')
+
+    def test_get_send_invitations_lists_users_not_in_team(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'invite_members.html')
+        self.assertEqual(set(response.context['users_not_in_team']), set(self.invitees))
+
+    def test_post_send_invitations(self):
+        response = self.client.post(self.url, {'selected_users': [user.id for user in self.invitees]})
+        self.assertRedirects(response, reverse('team_detail', args=[self.team.id]), status_code=302, target_status_code=200)
+        self.assertEqual(OutboxMessage.objects.filter(processed_at__isnull=True).count(), 1)
+        drain()
+        for invitee in self.invitees:
+            invitation = Invitation.objects.get(receiver=invitee, team=self.team)
+            self.assertEqual(invitation.sender, self.user)
+            self.assertEqual(invitation.status, Invitation.PENDING)
+            self.assertTrue(Notification.objects.filter(user=invitee, invitation=invitation).exists())
+
+    def test_post_send_invitations_skips_pending_invitations(self):
+        invitee = self.invitees[0]
+        Invitation.objects.create(sender=self.user, receiver=invitee, team=self.team)
+        self.client.post(self.url, {'selected_users': [user.id for user in self.invitees]})
+        self.assertEqual(Invitation.objects.filter(receiver=invitee, team=self.team).count(), 1)
+        self.assertEqual(Invitation.objects.filter(team=self.team).count(), len(self.invitees))
+
+    def test_post_send_invitations_invites_users_who_declined_again(self):
+        invitee = self.invitees[0]
+        Invitation.objects.create(sender=self.user, receiver=invitee, team=self.team, status=Invitation.DECLINED)
+        self.client.post(self.url, {'selected_users': [invitee.id]})
+        drain()
+        invitation = Invitation.objects.get(receiver=invitee, team=self.team, status=Invitation.PENDING)
+        self.assertTrue(Notification.objects.filter(user=invitee, invitation=invitation).exists())
+
+    def test_post_send_invitations_query_count_does_not_grow_per_invite(self):
+        invitees = User.objects.bulk_create([
+            User(username=f'@invitee{i}', email=f'invitee{i}@example.org', first_name='Invitee', last_name=f'{i}')
+            for i in range(200)
+        ])
+        with CaptureQueriesContext(connection) as small_batch:
+            self.client.post(self.url, {'selected_users': [user.id for user in invitees[:5]]})
+        with CaptureQueriesContext(connection) as large_batch:
+            self.client.post(self.url, {'selected_users': [user.id for user in invitees[5:]]})
+        self.assertLessEqual(len(large_batch), len(small_batch) + 2)
+        self.assertFalse(Notification.objects.exists())
+        drain()
+        self.assertEqual(Notification.objects.filter(invitation__team=self.team).count(), 200)
@@ -0,0 +1,61 @@
+"""Tests of the team creation view and the user search endpoint."""
+from django.test import TestCase
+from django.urls import reverse
+from tasks.models import Team, User
+
+class TeamCreateViewTestCase(TestCase):
+    """Tests of the team creation view and the user search endpoint."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+    ]
+
+    def setUp(self):
+        self.url = reverse('team')
+        self.search_url = reverse('user_search')
+        self.user = User.objects.get(username='@johndoe')
+        self.client.login(username=self.user.username, password='Password123')
+
+    def test_team_url(self):
+        self.assertEqual(self.url, '/team/')
+
+    def test_get_team_without_search_renders_no_users(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'team.html')
+        self.assertEqual(response.context['users'], [])
+        self.assertNotContains(response, 'name="members"')
+
+    def test_get_team_with_search_renders_matches(self):
+        response = self.client.get(self.url, {'userSearch': 'pickles'})
+        usernames = [user.username for user in response.context['users']]
+        self.assertEqual(usernames, ['@petrapickles', '@peterpickles'])
+        self.assertContains(response, 'name="members"', count=2)
+
+    def test_post_team_creates_team_with_members(self):
+        jane = User.objects.get(username='@janedoe')
+        response = self.client.post(self.url, {'name': 'Team Pelican', 'members': [jane.id]})
+        team = Team.objects.get(name='Team Pelican')
+        self.assertRedirects(response, reverse('team_detail', args=[team.id]), status_code=302, target_status_code=200)
+        self.assertEqual(set(team.members.all()), {self.user, jane})
+
+    def test_user_search_url(self):
+        self.assertEqual(self.search_url, '/users/search/')
+
+    def test_get_user_search(self):
+        response = self.client.get(self.search_url, {'q': '@peter'})
+        self.assertEqual(response.status_code, 200)
+        peter = User.objects.get(username='@peterpickles')
+        self.assertEqual(response.json(), {
+            'results': [{'id': peter.id, 'username': '@peterpickles', 'full_name': 'Peter Pickles'}]
+        })
+
+    def test_get_user_search_without_term(self):
+        response = self.client.get(self.search_url)
+        self.assertEqual(response.json(), {'results': []})
+
+    def test_get_user_search_redirects_when_not_logged_in(self):
+        self.client.logout()
+        response = self.client.get(self.search_url, {'q': 'doe'})
+        self.assertEqual(response.status_code, 302)
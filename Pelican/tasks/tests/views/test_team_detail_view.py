@@ -0,0 +1,85 @@
+"""Tests of the team detail view."""
+from datetime import date, timedelta
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from tasks.models import Task, Team, User
+
+class TeamDetailViewTestCase(TestCase):
+    """Tests of the team detail view."""
+
+    fixtures = ['tasks/tests/fixtures/default_user.json']
+
+    # Session, user, team, members, tasks and the assignee prefetch.
+    QUERY_BUDGET = 6
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        self.team = Team.objects.create(name='Team Pelican')
+        self.team.members.add(self.user)
+        self.url = reverse('team_detail', args=[self.team.id])
+        self.client.login(username=self.user.username, password='Password123')
+
+    def test_team_detail_url(self):
+        self.assertEqual(self.url, f'/team/{self.team.id}/')
+
+    def test_get_team_detail(self):
+        task = Task.objects.create(description='Write report', due_date=date.today(), team=self.team)
+        task.assigned_to.add(self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'team_detail.html')
+        self.assertEqual(response.context['team_members'], [self.user])
+        self.assertContains(response, 'Write report - Due:')
+        self.assertContains(response, f'<option value="{self.user.id}">{self.user.username}</option>', html=True)
+
+    def test_get_team_detail_of_unknown_team(self):
+        response = self.client.get(reverse('team_detail', args=[self.team.id + 1]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_post_team_detail_creates_task(self):
+        form_input = {
+            'description': 'Plan sprint',
+            'due_date': date.today().isoformat(),
+            'assigned_to': [self.user.id],
+        }
+        response = self.client.post(self.url, form_input)
+        self.assertRedirects(response, self.url, status_code=302, target_status_code=200)
+        task = Task.objects.get(description='Plan sprint')
+        self.assertEqual(task.team, self.team)
+        self.assertEqual(list(task.assigned_to.all()), [self.user])
+
+    def test_get_team_detail_query_count_is_bounded_for_large_teams(self):
+        members = User.objects.bulk_create([
+            User(username=f'@member{i}', email=f'member{i}@example.org', first_name='Member', last_name=f'{i:03d}')
+            for i in range(200)
+        ])
+        self.team.members.add(*members)
+        tasks = Task.objects.bulk_create([
+            Task(description=f'Task {i}', due_date=date.today() + timedelta(days=i % 30), team=self.team)
+            for i in range(500)
+        ])
+        Assignment = Task.assigned_to.through
+        Assignment.objects.bulk_create([
+            Assignment(task=task, user=members[i % len(members)])
+            for i, task in enumerate(tasks)
+        ])
+        with self.assertNumQueries(self.QUERY_BUDGET):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.context['team_members']), 201)
+        self.assertEqual(len(response.context['team_tasks']), settings.FEED_PAGE_SIZE)
+        self.assertTrue(response.context['team_tasks'].has_next)
+
+    @override_settings(FEED_PAGE_SIZE=2)
+    def test_get_team_tasks_walks_every_page(self):
+        for i in range(5):
+            Task.objects.create(description=f'Task {i}', due_date=date.today(), team=self.team)
+        descriptions = []
+        url = reverse('team_tasks', args=[self.team.id])
+        while url:
+            response = self.client.get(url)
+            self.assertTemplateUsed(response, 'partials/team_task_items.html')
+            team_tasks = response.context['team_tasks']
+            descriptions += [task.description for task in team_tasks]
+            url = team_tasks.has_next and f'{reverse("team_tasks", args=[self.team.id])}?after={team_tasks.next_cursor}'
+        self.assertEqual(descriptions, [f'Task {i}' for i in range(5)])
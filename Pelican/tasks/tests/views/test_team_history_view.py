@@ -0,0 +1,93 @@
+"""Tests of the task completion and team history views."""
+from datetime import date, timedelta
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from tasks.models import ArchivedTask, Task, Team, User
+
+class TeamHistoryViewTestCase(TestCase):
+    """Tests of the task completion and team history views."""
+
+    fixtures = ['tasks/tests/fixtures/default_user.json', 'tasks/tests/fixtures/other_users.json']
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.get(username='@johndoe')
+        self.team = Team.objects.create(name='Team Pelican')
+        self.team.members.add(self.user)
+        self.task = Task.objects.create(description='Write report', due_date=date.today(), team=self.team)
+        self.task.assigned_to.add(self.user)
+        self.url = reverse('team_history', args=[self.team.id])
+        self.client.login(username=self.user.username, password='Password123')
+
+    def test_complete_task(self):
+        response = self.client.post(reverse('complete_task', args=[self.task.id]))
+        self.assertRedirects(response, reverse('team_detail', args=[self.team.id]))
+        self.assertIsNotNone(Task.objects.get(pk=self.task.pk).completed_at)
+
+    def test_complete_task_requires_post(self):
+        response = self.client.get(reverse('complete_task', args=[self.task.id]))
+        self.assertRedirects(response, reverse('team_detail', args=[self.team.id]))
+        self.assertIsNone(Task.objects.get(pk=self.task.pk).completed_at)
+
+    def test_complete_task_of_another_team_is_not_found(self):
+        other_team = Team.objects.create(name='Team Heron')
+        task = Task.objects.create(description='Not mine', due_date=date.today(), team=other_team)
+        response = self.client.post(reverse('complete_task', args=[task.id]))
+        self.assertEqual(response.status_code, 404)
+        self.assertIsNone(Task.objects.get(pk=task.pk).completed_at)
+
+    def test_completed_tasks_leave_the_team_page_and_dashboard(self):
+        self.task.complete()
+        self.assertNotContains(self.client.get(reverse('team_detail', args=[self.team.id])), 'Write report')
+        self.assertNotContains(self.client.get(reverse('dashboard')), 'Write report')
+
+    def test_history_lists_completed_and_archived_tasks_most_recent_first(self):
+        now = timezone.now()
+        self._completed_task('Archived', now - timedelta(days=60))
+        self._completed_task('Old', now - timedelta(days=40))
+        ArchivedTask.objects.archive(Task.objects.filter(description='Archived').values_list('pk', flat=True))
+        self.task.complete()
+        response = self.client.get(self.url)
+        self.assertTemplateUsed(response, 'team_history.html')
+        descriptions = [task.description for task in response.context['completed_tasks']]
+        self.assertEqual(descriptions, ['Write report', 'Old', 'Archived'])
+        self.assertContains(response, '<li>@johndoe</li>', html=True)
+
+    @override_settings(FEED_PAGE_SIZE=2)
+    def test_history_is_paged_across_both_tables(self):
+        now = timezone.now()
+        for number in range(5):
+            self._completed_task(f'Done {number}', now - timedelta(days=number))
+        ArchivedTask.objects.archive(Task.objects.filter(description__in=['Done 1', 'Done 3']).values_list('pk', flat=True))
+        first_page = self.client.get(self.url).context['completed_tasks']
+        self.assertEqual([task.description for task in first_page], ['Done 0', 'Done 1'])
+        descriptions = []
+        cursor = first_page.next_cursor
+        while cursor:
+            page = self.client.get(reverse('team_history_tasks', args=[self.team.id]), {'after': cursor}).context['completed_tasks']
+            descriptions += [task.description for task in page]
+            cursor = page.next_cursor
+        self.assertEqual(descriptions, ['Done 2', 'Done 3', 'Done 4'])
+
+    def test_history_without_completed_tasks(self):
+        response = self.client.get(self.url)
+        self.assertContains(response, 'This team has not completed any tasks yet.')
+
+    def test_history_is_for_team_members_only(self):
+        ArchivedTask.objects.archive([self._completed_task('Secret', timezone.now()).pk])
+        outsider = User.objects.get(username='@petrapickles')
+        self.client.login(username=outsider.username, password='Password123')
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        response = self.client.get(reverse('team_history_tasks', args=[self.team.id]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_history_with_invalid_cursor(self):
+        response = self.client.get(reverse('team_history_tasks', args=[self.team.id]), {'after': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+    def _completed_task(self, description, completed_at):
+        task = Task.objects.create(description=description, due_date=date.today(), team=self.team, completed_at=completed_at)
+        task.assigned_to.add(self.user)
+        return task
@@ -0,0 +1,105 @@
+"""Token bucket throttling of login attempts, kept in the Django cache.
+
+Every attempt takes a token from a bucket for the client's IP address and
+one for the username tried, before the password is hashed. Buckets refill
+at a steady rate, so a client can burst up to a bucket's capacity and is
+then held to its refill rate. An attempt is shed if either bucket is empty.
+
+A bucket is stored as (tokens, timestamp) and expires once it would have
+refilled completely, so idle clients cost no cache space. Reading and
+updating a bucket is serialised within a process; across processes sharing
+a file or database cache, concurrent attempts may occasionally both get
+the last token.
+"""
+import hashlib
+import math
+import threading
+import time
+from django.conf import settings
+from django.core.cache import caches
+
+SCOPES = ('ip', 'username')
+
+_bucket_lock = threading.Lock()
+
+_stats_lock = threading.Lock()
+_stats = {'allowed': 0, 'shed': {scope: 0 for scope in SCOPES}}
+
+
+def _cache():
+    return caches[settings.LOGIN_THROTTLE_CACHE_ALIAS]
+
+
+def _bucket_key(scope, identity):
+    # Hashing keeps keys short and free of characters some cache backends reject
+    digest = hashlib.sha256(identity.lower().encode()).hexdigest()
+    return f'login_throttle:{scope}:{digest}'
+
+
+def _current_tokens(state, capacity, refill_rate, now):
+    if state is None:
+        return capacity
+    tokens, updated_at = state
+    return min(capacity, tokens + (now - updated_at) * refill_rate)
+
+
+def throttle_login(ip_address, username):
+    """Take a token for a login attempt from the IP address's and username's buckets.
+
+    Returns None if the attempt may go ahead, or the number of seconds to
+    wait before retrying if it is shed.
+    """
+
+    cache = _cache()
+    buckets = settings.LOGIN_THROTTLE_BUCKETS
+    keys = {'ip': _bucket_key('ip', ip_address or ''), 'username': _bucket_key('username', username or '')}
+    now = time.time()
+    with _bucket_lock:
+        states = cache.get_many(keys.values())
+        tokens = {
+            scope: _current_tokens(states.get(key), buckets[scope]['capacity'], buckets[scope]['refill_rate'], now)
+            for scope, key in keys.items()
+        }
+        empty = [scope for scope in SCOPES if tokens[scope] < 1]
+        if not empty:
+            for scope, key in keys.items():
+                capacity, refill_rate = buckets[scope]['capacity'], buckets[scope]['refill_rate']
+                remaining = tokens[scope] - 1
+                cache.set(key, (remaining, now), math.ceil((capacity - remaining) / refill_rate))
+    if empty:
+        _record_shed(empty)
+        return max(math.ceil((1 - tokens[scope]) / buckets[scope]['refill_rate']) for scope in empty)
+    _record_allowed()
+    return None
+
+
+def reset_login_throttle(ip_address, username):
+    """Refill the IP address's and username's buckets."""
+
+    _cache().delete_many([_bucket_key('ip', ip_address or ''), _bucket_key('username', username or '')])
+
+
+def _record_allowed():
+    with _stats_lock:
+        _stats['allowed'] += 1
+
+
+def _record_shed(scopes):
+    with _stats_lock:
+        for scope in scopes:
+            _stats['shed'][scope] += 1
+
+
+def login_throttle_stats():
+    """Return this process's counts of allowed login attempts and shed ones, per empty bucket."""
+
+    with _stats_lock:
+        return {'allowed': _stats['allowed'], 'shed': dict(_stats['shed'])}
+
+
+def reset_login_throttle_stats():
+    """Reset this process's login throttle counters."""
+
+    with _stats_lock:
+        _stats['allowed'] = 0
+        _stats['shed'] = {scope: 0 for scope in SCOPES}
@@ -1,6 +1,9 @@
+import io
 from django.conf import settings
 from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import login, logout
+from django.contrib.auth.views import redirect_to_login
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.exceptions import ImproperlyConfigured
@@ -10,19 +13,79 @@ from django.views.generic.edit import FormView, UpdateView
 from django.urls import reverse
 from tasks.helpers import login_prohibited
 from django.shortcuts import get_object_or_404
-from django.http import HttpResponseRedirect
-from tasks.models import Invitation, Task, Notification, User, Team
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, HttpResponseRedirect, JsonResponse, StreamingHttpResponse
+from tasks.models import ArchivedTask, Invitation, Task, Notification, User, Team
+from tasks.agenda import (
+    SCOPES, agenda_queryset, calendar_range, day_counts, month_weeks, neighbouring_months, parse_date_range,
+    parse_month, parse_scope, task_payload, tasks_in_range,
+)
+from tasks.db_connections import connection_stats, run_in_database_pool
+from tasks.exports import CONTENT_TYPES, export_tasks, iterate_in_thread, tasks_to_export
+from tasks.imports import ImportFormatError, format_for, import_tasks
+from tasks.fragment_cache import fragment_cache_stats, render_dashboard_fragments
+from tasks.notification_stream import notification_events
+from tasks.request_metrics import request_metrics_summary
 from tasks.forms import LogInForm, PasswordForm, UserForm, SignUpForm, TeamForm, TaskForm
-from django.db.models import Q
+from tasks.pagination import InvalidCursor, KeysetPage, KeysetPaginator
+from tasks.search import search_users
+from tasks.throttle import login_throttle_stats, throttle_login
+from django.db import transaction
+from django.db.models import Prefetch
+
+def _user_tasks_paginator(user):
+    """Return a keyset paginator over the tasks assigned to a user, soonest due first."""
+
+    # Each task's team is joined in by the same query
+    user_tasks = Task.objects.open().filter(assigned_to=user).select_related('team')
+    return KeysetPaginator(user_tasks, 'due_date', settings.FEED_PAGE_SIZE)
+
+def _user_notifications_paginator(user):
+    """Return a keyset paginator over a user's notifications, newest first."""
+
+    user_notifications = Notification.objects.filter(user=user).select_related('invitation__team')
+    return KeysetPaginator(user_notifications, 'created_at', settings.FEED_PAGE_SIZE, descending=True)
+
+def _team_tasks_paginator(team):
+    """Return a keyset paginator over a team's open tasks, soonest due first."""
+
+    team_tasks = Task.objects.open().filter(team=team).prefetch_related(
+        Prefetch('assigned_to', queryset=User.objects.only('id', 'username'))
+    )
+    return KeysetPaginator(team_tasks, 'due_date', settings.FEED_PAGE_SIZE)
+
+def _team_history_page(team, request):
+    """Return the page of a team's completed tasks, archived or not, that follows the request's 'after' cursor.
+
+    Archived tasks keep their ids, so (completed_at, id) orders both tables
+    as one feed. A page is taken from each and the two are merged.
+    """
+
+    assignees = Prefetch('assigned_to', queryset=User.objects.only('id', 'username'))
+    paginators = [
+        KeysetPaginator(tasks.filter(team=team).prefetch_related(assignees), 'completed_at', settings.FEED_PAGE_SIZE, descending=True)
+        for tasks in (Task.objects.completed(), ArchivedTask.objects.all())
+    ]
+    pages = [_keyset_page(paginator, request) for paginator in paginators]
+    items = sorted([*pages[0], *pages[1]], key=lambda task: (task.completed_at, task.pk), reverse=True)
+    next_cursor = None
+    if len(items) > settings.FEED_PAGE_SIZE or any(page.has_next for page in pages):
+        items = items[:settings.FEED_PAGE_SIZE]
+        next_cursor = paginators[0].encode_cursor(items[-1])
+    return KeysetPage(items, next_cursor)
+
+def _keyset_page(paginator, request):
+    """Return the page following the request's 'after' cursor."""
+
+    try:
+        return paginator.page(request.GET.get('after'))
+    except InvalidCursor:
+        raise Http404("Invalid page cursor")
 
 @login_required
 def dashboard(request):
     current_user = request.user
 
-    # Fetching tasks specifically assigned to the current user
-    user_tasks = Task.objects.filter(assigned_to=current_user)
-    print(user_tasks)  # For debugging - you can remove this line
-
     team_form = TeamForm(request.POST or None)
 
     if request.method == 'POST' and team_form.is_valid():
@@ -31,18 +94,92 @@ def dashboard(request):
         new_team.save()
         return redirect('dashboard')
 
-    # Fetching teams associated with the current user
-    user_teams = Team.objects.filter(members=current_user)
-
-    # Fetch notifications associated with the current user directly using Notification model
-    user_notifications = Notification.objects.filter(user=current_user)
+    # Each block is served from the per-user fragment cache when it has not changed.
+    # Only the first page of each feed is rendered; the rest is loaded on demand.
+    fragments = render_dashboard_fragments(request, {
+        'teams': ('partials/dashboard_teams.html', lambda: {
+            'user_teams': Team.objects.filter(members=current_user),
+        }),
+        'tasks': ('partials/dashboard_tasks.html', lambda: {
+            'user_tasks': _user_tasks_paginator(current_user).page(),
+        }),
+        'notifications': ('partials/dashboard_notifications.html', lambda: {
+            'user_notifications': _user_notifications_paginator(current_user).page(),
+        }),
+    })
 
     return render(
         request,
         'dashboard.html',
-        {'user': current_user, 'team_form': team_form, 'user_teams': user_teams, 'user_tasks': user_tasks, 'user_notifications': user_notifications}
+        {
+            'user': current_user, 'team_form': team_form, 'fragments': fragments,
+            # Under WSGI a stream would hold a worker for its whole life, so only the unread badge is polled
+            'notification_stream': isinstance(request, ASGIRequest),
+        }
     )
 
+@login_required
+def dashboard_tasks(request):
+    """Render the next page of the current user's tasks."""
+
+    user_tasks = _keyset_page(_user_tasks_paginator(request.user), request)
+    return render(request, 'partials/user_task_items.html', {'user_tasks': user_tasks})
+
+@login_required
+def dashboard_notifications(request):
+    """Render the next page of the current user's notifications."""
+
+    user_notifications = _keyset_page(_user_notifications_paginator(request.user), request)
+    return render(request, 'partials/notification_items.html', {'user_notifications': user_notifications})
+
+@login_required
+def unread_notifications(request):
+    """Return the current user's number of unread notifications as JSON, for the navbar badge."""
+
+    # The count is stored on the user row, which authentication has already loaded
+    return JsonResponse({'unread': request.user.unread_notification_count})
+
+@login_required
+def mark_notifications_read(request):
+    """Mark all of the current user's notifications as read."""
+
+    if request.method == 'POST':
+        Notification.objects.filter(user=request.user).mark_read()
+    return redirect('dashboard')
+
+async def notification_stream(request):
+    """Stream the current user's new notifications as Server-Sent Events."""
+
+    # login_required cannot wrap an async view, and request.user is loaded lazily from the database
+    user_id = await run_in_database_pool(lambda: request.user.pk if request.user.is_authenticated else None)
+    if user_id is None:
+        return redirect_to_login(request.get_full_path())
+    if not isinstance(request, ASGIRequest):
+        # WSGI reads an async stream to the end before sending any of it; 204 stops EventSource reconnecting
+        return HttpResponse(status=204)
+    cursor = request.headers.get('Last-Event-ID') or request.GET.get('after')
+    response = StreamingHttpResponse(notification_events(user_id, cursor), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+@staff_member_required
+def dashboard_cache_stats(request):
+    """Return this process's dashboard fragment cache hit and miss counters as JSON."""
+
+    return JsonResponse(fragment_cache_stats())
+
+@staff_member_required
+def request_metrics(request):
+    """Return this process's per-view request metrics, and fragment cache, login throttle and connection counters, as JSON."""
+
+    return JsonResponse({
+        'views': request_metrics_summary(),
+        'fragment_cache': fragment_cache_stats(),
+        'login_throttle': login_throttle_stats(),
+        'connections': connection_stats(),
+    })
+
 def team_detail(request, team_id):
     team = get_object_or_404(Team, pk=team_id)
     task_form = TaskForm(request.POST or None)
@@ -56,9 +193,144 @@ def team_detail(request, team_id):
         # Redirect to the team detail page after creating the task
         return HttpResponseRedirect(request.path_info)
         
-    team_tasks = Task.objects.filter(team=team)
-    
-    return render(request, 'team_detail.html', {'team': team, 'team_tasks': team_tasks, 'task_form': task_form})
+    # Members are loaded once and shared by the member list and the assign-to select
+    team_members = list(team.members.all())
+    team_tasks = _team_tasks_paginator(team).page()
+
+    return render(
+        request,
+        'team_detail.html',
+        {'team': team, 'team_members': team_members, 'team_tasks': team_tasks, 'task_form': task_form}
+    )
+
+@login_required
+def agenda(request):
+    """Show a month of the current user's agenda as a calendar of the number of tasks due each day."""
+
+    try:
+        scope = parse_scope(request.GET.get('scope'))
+        month = parse_month(request.GET.get('month'))
+    except ValueError:
+        raise Http404("Invalid agenda month or scope")
+    counts = day_counts(agenda_queryset(request.user, scope), *calendar_range(month))
+    previous_month, next_month = neighbouring_months(month)
+    return render(request, 'agenda.html', {
+        'month': month,
+        'weeks': month_weeks(month, counts),
+        'scope': scope,
+        'scopes': SCOPES,
+        'previous_month': previous_month,
+        'next_month': next_month,
+    })
+
+@login_required
+def agenda_days(request):
+    """Return the number of tasks due on each day of a date range in the current user's agenda, as JSON."""
+
+    try:
+        scope = parse_scope(request.GET.get('scope'))
+        start, end = parse_date_range(request.GET.get('start'), request.GET.get('end'))
+    except ValueError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+    counts = day_counts(agenda_queryset(request.user, scope), start, end)
+    return JsonResponse({
+        'scope': scope,
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'days': {day.isoformat(): count for day, count in sorted(counts.items())},
+    })
+
+@login_required
+def agenda_tasks(request):
+    """Return a page of the tasks due in a date range of the current user's agenda, soonest first, as JSON."""
+
+    try:
+        scope = parse_scope(request.GET.get('scope'))
+        start, end = parse_date_range(request.GET.get('start'), request.GET.get('end'))
+        tasks = tasks_in_range(agenda_queryset(request.user, scope), start, end)
+        page = KeysetPaginator(tasks, 'due_date', settings.FEED_PAGE_SIZE).page(request.GET.get('after'))
+    except ValueError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+    next_url = None
+    if page.has_next:
+        query = request.GET.copy()
+        query['after'] = page.next_cursor
+        next_url = f'{request.path}?{query.urlencode()}'
+    return JsonResponse({'tasks': [task_payload(task) for task in page], 'next': next_url})
+
+@login_required
+def team_tasks(request, team_id):
+    """Render the next page of a team's tasks."""
+
+    team = get_object_or_404(Team, pk=team_id)
+    team_tasks = _keyset_page(_team_tasks_paginator(team), request)
+    return render(request, 'partials/team_task_items.html', {'team': team, 'team_tasks': team_tasks})
+
+@login_required
+def team_history(request, team_id):
+    """Show a team's completed tasks, including archived ones, most recently completed first, to its members."""
+
+    team = get_object_or_404(Team, pk=team_id, members=request.user)
+    return render(request, 'team_history.html', {'team': team, 'completed_tasks': _team_history_page(team, request)})
+
+@login_required
+def team_history_tasks(request, team_id):
+    """Render the next page of a team's completed tasks to its members."""
+
+    team = get_object_or_404(Team, pk=team_id, members=request.user)
+    completed_tasks = _team_history_page(team, request)
+    return render(request, 'partials/completed_task_items.html', {'team': team, 'completed_tasks': completed_tasks})
+
+@login_required
+def complete_task(request, task_id):
+    """Mark a task of one of the current user's teams as completed."""
+
+    task = get_object_or_404(Task, pk=task_id, team__members=request.user)
+    if request.method == 'POST':
+        task.complete()
+    return redirect('team_detail', team_id=task.team_id)
+
+@login_required
+def export_team_tasks(request, team_id):
+    """Stream all of a team's tasks as CSV, or as NDJSON with ?format=ndjson, to its members."""
+
+    team = get_object_or_404(Team, pk=team_id, members=request.user)
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in CONTENT_TYPES:
+        return HttpResponseBadRequest("Unknown export format")
+    chunks = export_tasks(tasks_to_export(team), export_format)
+    if isinstance(request, ASGIRequest):
+        chunks = iterate_in_thread(chunks)
+    response = StreamingHttpResponse(chunks, content_type=CONTENT_TYPES[export_format])
+    response['Content-Disposition'] = f'attachment; filename="team-{team.pk}-tasks.{export_format}"'
+    return response
+
+@login_required
+def import_team_tasks(request, team_id):
+    """Create a team's tasks from an uploaded CSV or NDJSON file, and report the rows that were skipped."""
+
+    team = get_object_or_404(Team, pk=team_id, members=request.user)
+    if request.method != 'POST':
+        return redirect('team_detail', team_id=team.pk)
+    upload = request.FILES.get('file')
+    if upload is None:
+        return JsonResponse({'error': "No file was uploaded."}, status=400)
+    import_format = request.POST.get('format') or format_for(upload.name)
+    # The upload is decoded as it is read, so large files are never held in memory as text
+    lines = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+    try:
+        result = import_tasks(team, lines, import_format)
+    except ImportFormatError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+    return JsonResponse(result.as_dict())
+
+@login_required
+def user_search(request):
+    """Return the users matching a search term as JSON, for the member typeahead."""
+
+    users = search_users(request.GET.get('q', ''))
+    results = [{'id': user.id, 'username': user.username, 'full_name': user.full_name()} for user in users]
+    return JsonResponse({'results': results})
 
 def remove_member(request, team_id, member_id):
     team = get_object_or_404(Team, pk=team_id)
@@ -76,14 +348,9 @@ def send_invitations(request, team_id):
 
     if request.method == 'POST':
         selected_user_ids = request.POST.getlist('selected_users')
-        selected_users = User.objects.filter(pk__in=selected_user_ids)
 
-        for user in selected_users:
-            # Create an invitation for each selected user to join the team
-            invitation = Invitation.objects.create(sender=request.user, receiver=user, team=team)
-    
-            # Create a notification for the invited user and associate it with the invitation
-            notification = Notification.objects.create(user=user, message=f"Click here to join ", invitation=invitation)
+        # Invitations and their notifications are created in bulk, skipping pending invitations
+        Invitation.objects.invite(request.user, team, selected_user_ids)
 
         messages.success(request, 'Invitations sent successfully!')
         return redirect('team_detail', team_id=team_id)
@@ -110,20 +377,22 @@ def confirm_invitation(request, invitation_id):
     invitation = get_object_or_404(Invitation, pk=invitation_id)
 
     if request.method == 'POST':
-        if 'accept' in request.POST:
-            # Accept the invitation
-            invitation.accept()
-        elif 'reject' in request.POST:
-            # Reject the invitation
-            invitation.decline()
-
-        # Delete the associated notification
-        try:
-            notification = Notification.objects.get(invitation=invitation)
-            notification.delete()
-        except Notification.DoesNotExist:
-            # Handle if the notification doesn't exist
-            raise Http404("Notification does not exist")
+        # The answer, the notification's deletion and the receiver's unread counter commit together
+        with transaction.atomic():
+            if 'accept' in request.POST:
+                # Accept the invitation
+                invitation.accept()
+            elif 'reject' in request.POST:
+                # Reject the invitation
+                invitation.decline()
+
+            # Delete the associated notification
+            try:
+                notification = Notification.objects.get(invitation=invitation)
+                notification.delete()
+            except Notification.DoesNotExist:
+                # Handle if the notification doesn't exist
+                raise Http404("Notification does not exist")
 
         return redirect('dashboard')  # Redirect to the dashboard or any appropriate page
 
@@ -177,8 +446,19 @@ class LogInView(LoginProhibitedMixin, View):
     def post(self, request):
         """Handle log in attempt."""
 
-        form = LogInForm(request.POST)
         self.next = request.POST.get('next') or settings.REDIRECT_URL_WHEN_LOGGED_IN
+        # Shed attempts over the limit before the password is hashed
+        retry_after = throttle_login(request.META.get('REMOTE_ADDR'), request.POST.get('username'))
+        if retry_after is not None:
+            messages.add_message(
+                request, messages.ERROR,
+                f"Too many login attempts. Please try again in {retry_after} seconds."
+            )
+            response = self.render()
+            response.status_code = 429
+            response['Retry-After'] = str(retry_after)
+            return response
+        form = LogInForm(request.POST)
         user = form.get_user()
         if user is not None:
             login(request, user)
@@ -268,16 +548,10 @@ class TeamCreateView(LoginRequiredMixin, FormView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        search_term = self.request.GET.get('userSearch')
-        if search_term:
-            users = User.objects.filter(
-                Q(username__icontains=search_term) | 
-                Q(first_name__icontains=search_term) | 
-                Q(last_name__icontains=search_term)
-            )
-        else:
-            users = User.objects.all()
-        context['users'] = users
+        # Only matching users are rendered; the typeahead fetches the rest on demand
+        search_term = self.request.GET.get('userSearch', '')
+        context['search_term'] = search_term
+        context['users'] = search_users(search_term)
         return context
 
     def form_valid(self, form):